@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+UTILS_DIR = REPO_ROOT / "utils"
+sys.path.insert(0, str(UTILS_DIR))
+
+from fast_transliterator import sample_corpus_lines
+from transliterator import get_engine, get_available_systems
+from metrics import levenshtein_distance, LineAlignment, MetricsAccumulator, compute_batch_metrics
+from html_report import ShardedHTMLReport
+from deduplicate_dataset import deduplicate_file
+from duplicate_check import check_duplicates
+from iast_cleaner import check_iast_dataset
+from levenshtein_benchmark import corrupt_line
+
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "raw" / "FinalCorpus"
+DEFAULT_SCRIPTS = ["Devanagari", "Telugu", "Sharada"]
+
+# Benchmark groups that can be selected on the command line
+GROUPS = ["transliteration", "metrics", "report", "corpus"]
+
+# A benchmark counts as regressed when it is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+
+def transliteration_benchmarks(lines, systems, scripts):
+    """
+    Build one benchmark per system, script and direction
+
+    The reverse direction transliterates the forward output of the same system,
+    so every system is timed on the text it would see in a round trip.
+
+    Returns:
+        Dictionary of benchmark name to (function, number of lines, number of characters)
+    """
+    benchmarks = {}
+    for system in systems:
+        for script in scripts:
+            forward = get_engine(system, "IAST", script)
+            reverse = get_engine(system, script, "IAST")
+            if forward is None or reverse is None:
+                print(f"Skipping {system} with {script}: not supported")
+                continue
+            script_lines = [forward(line) for line in lines]
+
+            benchmarks[f"transliteration/{system}/IAST->{script}"] = (
+                lambda forward=forward: [forward(line) for line in lines],
+                len(lines), sum(len(line) for line in lines))
+            benchmarks[f"transliteration/{system}/{script}->IAST"] = (
+                lambda reverse=reverse, script_lines=script_lines: [reverse(line) for line in script_lines],
+                len(script_lines), sum(len(line) for line in script_lines))
+    return benchmarks
+
+
+def metrics_benchmarks(pairs):
+    """Build benchmarks of the round-trip metric functions over (original, round trip) pairs"""
+    chars = sum(len(original) for original, _ in pairs)
+
+    def alignment_metrics():
+        metrics = MetricsAccumulator()
+        for original, converted in pairs:
+            metrics.add_alignment(LineAlignment(original, converted))
+        return metrics.result("", "")
+
+    return {
+        "metrics/levenshtein_distance": (
+            lambda: [levenshtein_distance(original, converted) for original, converted in pairs],
+            len(pairs), chars),
+        "metrics/line_alignment": (alignment_metrics, len(pairs), chars),
+        # Uses NumPy when it is installed, so compare runs made in the same environment
+        "metrics/compute_batch_metrics": (lambda: compute_batch_metrics(pairs), len(pairs), chars),
+    }
+
+
+def report_benchmarks(pairs, work_dir):
+    """Build a benchmark rendering the HTML diff report of all differing pairs"""
+    alignments = [LineAlignment(original, converted) for original, converted in pairs]
+    differing = [alignment for alignment in alignments if not alignment.exact]
+
+    def render_report():
+        with ShardedHTMLReport(Path(work_dir) / "report" / "diff_log.html", "Benchmark") as report:
+            for alignment in differing:
+                report.add(alignment.original, alignment.converted, "", alignment.opcodes)
+
+    return {
+        "report/html_diff": (render_report, len(differing),
+                             sum(len(alignment.original) for alignment in differing)),
+    }
+
+
+def corpus_benchmarks(sample_file, lines):
+    """Build benchmarks of the corpus tools over the sample written to a file"""
+    chars = sum(len(line) for line in lines)
+    output_file = str(sample_file) + ".deduplicated"
+    return {
+        "corpus/deduplicate_file": (lambda: deduplicate_file(str(sample_file), output_file), len(lines), chars),
+        "corpus/check_duplicates": (lambda: check_duplicates(str(sample_file)), len(lines), chars),
+        "corpus/check_iast_dataset": (lambda: check_iast_dataset(str(sample_file)), len(lines), chars),
+    }
+
+
+def run_benchmark(function, repeat):
+    """Run a benchmark several times, returns the fastest and the median time"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times), statistics.median(times)
+
+
+def get_commit():
+    """Return the current git commit of the repository, or None outside a checkout"""
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(REPO_ROOT),
+                                   capture_output=True, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Compare the fastest times of a run with a baseline run
+
+    Args:
+        results: Benchmark results of this run
+        baseline: Benchmark results of the baseline run
+        threshold: Relative slowdown above which a benchmark counts as regressed
+
+    Returns:
+        List of (name, baseline seconds, seconds, relative change, regressed) for benchmarks in both runs
+    """
+    comparison = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        baseline_seconds = baseline[name]["seconds"]
+        change = result["seconds"] / baseline_seconds - 1 if baseline_seconds > 0 else 0.0
+        comparison.append((name, baseline_seconds, result["seconds"], change, change > threshold))
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the backends, metrics, report and corpus tools on a "
+                                                 "seeded sample of the corpus and compare with a baseline")
+    parser.add_argument("--corpus-dir", default=str(DEFAULT_CORPUS_DIR),
+                        help="Directory of corpus texts to draw lines from")
+    parser.add_argument("--lines-per-text", type=int, default=20,
+                        help="Number of lines sampled from every text")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed for sampling and for the corrupted lines of the metric benchmarks")
+    parser.add_argument("--systems", nargs="+", default=None,
+                        help="Transliteration systems to time (all available if not specified)")
+    parser.add_argument("--scripts", nargs="+", default=DEFAULT_SCRIPTS,
+                        help="Scripts to transliterate to and from")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS,
+                        help="Benchmark groups to run (all if not specified)")
+    parser.add_argument("--error-rate", type=float, default=0.05,
+                        help="Probability of an edit at each character of the metric benchmark pairs")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs per benchmark, the fastest is compared")
+    parser.add_argument("--output", help="Write the results as JSON to this file, to be used as a later baseline")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown that counts as a regression (default 0.10 = 10%%)")
+
+    args = parser.parse_args()
+
+    lines = sample_corpus_lines(args.corpus_dir, args.lines_per_text, args.seed)
+    if not lines:
+        print(f"Error: No corpus lines found in {args.corpus_dir}")
+        return 1
+    print(f"Sampled {len(lines)} lines from {args.corpus_dir}")
+
+    rng = random.Random(args.seed)
+    pairs = [(line, line if rng.random() < 0.2 else corrupt_line(line, args.error_rate, rng)) for line in lines]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        sample_file = Path(work_dir) / "sample.txt"
+        with open(sample_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+        benchmarks = {}
+        if "transliteration" in args.groups:
+            benchmarks.update(transliteration_benchmarks(lines, args.systems or get_available_systems(),
+                                                         args.scripts))
+        if "metrics" in args.groups:
+            benchmarks.update(metrics_benchmarks(pairs))
+        if "report" in args.groups:
+            benchmarks.update(report_benchmarks(pairs, work_dir))
+        if "corpus" in args.groups:
+            benchmarks.update(corpus_benchmarks(sample_file, lines))
+
+        results = {}
+        print(f"\n{'Benchmark':<48} {'Best':>10} {'Median':>10} {'Lines/s':>12}")
+        for name, (function, line_count, char_count) in benchmarks.items():
+            best_time, median_time = run_benchmark(function, args.repeat)
+            results[name] = {
+                "seconds": best_time,
+                "median_seconds": median_time,
+                "lines": line_count,
+                "chars": char_count,
+                "lines_per_sec": line_count / best_time if best_time > 0 else 0,
+                "chars_per_sec": char_count / best_time if best_time > 0 else 0,
+            }
+            print(f"{name:<48} {best_time * 1000:>8.1f}ms {median_time * 1000:>8.1f}ms "
+                  f"{results[name]['lines_per_sec']:>12.1f}")
+
+    sample = {
+        "corpus_dir": os.path.relpath(args.corpus_dir, REPO_ROOT),
+        "lines_per_text": args.lines_per_text,
+        "seed": args.seed,
+        "error_rate": args.error_rate,
+        "lines": len(lines),
+    }
+    run = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sample": sample,
+        "results": results,
+    }
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("sample") != sample:
+        print(f"\nWarning: {args.baseline} was run on a different sample, times are not comparable")
+
+    comparison = compare_with_baseline(results, baseline["results"], args.threshold)
+    print(f"\nCompared with {args.baseline} (commit {baseline.get('commit')}), "
+          f"threshold {args.threshold * 100:.0f}%:")
+    for name, baseline_seconds, seconds, change, regressed in comparison:
+        marker = "REGRESSION" if regressed else ""
+        print(f"{name:<48} {baseline_seconds * 1000:>8.1f}ms -> {seconds * 1000:>8.1f}ms "
+              f"{change * 100:>+7.1f}% {marker}")
+
+    regressions = [entry for entry in comparison if entry[4]]
+    if regressions:
+        print(f"\nError: {len(regressions)} benchmarks regressed by more than {args.threshold * 100:.0f}%")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
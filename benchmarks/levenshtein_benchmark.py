@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+UTILS_DIR = REPO_ROOT / "utils"
+sys.path.insert(0, str(UTILS_DIR))
+
+from fast_transliterator import sample_corpus_lines
+from metrics import levenshtein_distance
+
+DEFAULT_CORPUS_DIR = REPO_ROOT / "data" / "raw" / "FinalCorpus"
+
+# Line length buckets as (label, minimum length, maximum length)
+LENGTH_BUCKETS = [
+    ("0-49", 0, 49),
+    ("50-99", 50, 99),
+    ("100-199", 100, 199),
+    ("200-399", 200, 399),
+    ("400+", 400, float("inf")),
+]
+
+# Characters used for substitutions and insertions when corrupting a line
+CORRUPTION_ALPHABET = "aāiīuūṛeokgcjṭḍtdnpbmyrlvśṣsh ṃḥ"
+
+
+def reference_levenshtein_distance(a, b):
+    """Full-matrix implementation the optimized function has to agree with"""
+    dp = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        for j in range(len(b) + 1):
+            if i == 0:
+                dp[i][j] = j
+            elif j == 0:
+                dp[i][j] = i
+            elif a[i - 1] == b[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1]
+            else:
+                dp[i][j] = 1 + min(dp[i - 1][j], dp[i][j - 1], dp[i - 1][j - 1])
+    return dp[len(a)][len(b)]
+
+
+def corrupt_line(line, error_rate, rng):
+    """Apply random substitutions, insertions and deletions like a lossy round trip would"""
+    corrupted = []
+    for char in line:
+        if rng.random() >= error_rate:
+            corrupted.append(char)
+            continue
+        edit = rng.choice(("substitute", "insert", "delete"))
+        if edit == "substitute":
+            corrupted.append(rng.choice(CORRUPTION_ALPHABET))
+        elif edit == "insert":
+            corrupted.append(char)
+            corrupted.append(rng.choice(CORRUPTION_ALPHABET))
+    return "".join(corrupted)
+
+
+def build_pairs(lines, pairs_per_bucket, error_rate, seed):
+    """
+    Group corpus lines into length buckets and pair each line with a corrupted copy
+
+    Returns:
+        Dictionary of bucket label to list of (original, corrupted) pairs
+    """
+    rng = random.Random(seed)
+    pairs = {label: [] for label, _, _ in LENGTH_BUCKETS}
+    for line in lines:
+        for label, minimum, maximum in LENGTH_BUCKETS:
+            if minimum <= len(line) <= maximum and len(pairs[label]) < pairs_per_bucket:
+                # Every fifth pair is left unchanged, as most round-trip lines are exact
+                corrupted = line if rng.random() < 0.2 else corrupt_line(line, error_rate, rng)
+                pairs[label].append((line, corrupted))
+                break
+    return pairs
+
+
+def time_function(function, pairs, repeat):
+    """Return the best total time of computing all pairs and the distances"""
+    best_time = float("inf")
+    distances = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        distances = [function(a, b) for a, b in pairs]
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time, distances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare levenshtein_distance with the full-matrix implementation")
+    parser.add_argument("--corpus-dir", default=str(DEFAULT_CORPUS_DIR),
+                        help="Directory of corpus texts to draw lines from")
+    parser.add_argument("--lines-per-text", type=int, default=20,
+                        help="Number of lines sampled from every text")
+    parser.add_argument("--pairs-per-bucket", type=int, default=50,
+                        help="Number of line pairs per length bucket")
+    parser.add_argument("--error-rate", type=float, default=0.05,
+                        help="Probability of an edit at each character of the corrupted line")
+    parser.add_argument("--max-distance", type=int, default=None,
+                        help="Also time the optimized function with this cutoff")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of timing runs per bucket, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed for sampling and corruption")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+
+    lines = sample_corpus_lines(args.corpus_dir, args.lines_per_text, args.seed)
+    if not lines:
+        print(f"Error: No corpus lines found in {args.corpus_dir}")
+        return 1
+    pairs = build_pairs(lines, args.pairs_per_bucket, args.error_rate, args.seed)
+
+    results = {}
+    mismatches = 0
+    header = f"{'Bucket':>8} {'Pairs':>6} {'Reference':>11} {'Optimized':>11} {'Speedup':>8}"
+    if args.max_distance is not None:
+        header += f" {'Cutoff':>11}"
+    print(header)
+
+    for label, _, _ in LENGTH_BUCKETS:
+        bucket_pairs = pairs[label]
+        if not bucket_pairs:
+            continue
+
+        reference_time, reference_distances = time_function(reference_levenshtein_distance, bucket_pairs,
+                                                            args.repeat)
+        optimized_time, optimized_distances = time_function(levenshtein_distance, bucket_pairs, args.repeat)
+        bucket_mismatches = sum(1 for expected, actual in zip(reference_distances, optimized_distances)
+                                if expected != actual)
+
+        result = {
+            "pairs": len(bucket_pairs),
+            "reference_seconds": reference_time,
+            "optimized_seconds": optimized_time,
+            "speedup": reference_time / optimized_time if optimized_time > 0 else float("inf"),
+            "mismatches": bucket_mismatches,
+        }
+        line = (f"{label:>8} {len(bucket_pairs):>6} {reference_time * 1000:>9.1f}ms "
+                f"{optimized_time * 1000:>9.1f}ms {result['speedup']:>7.1f}x")
+
+        if args.max_distance is not None:
+            cutoff_time, cutoff_distances = time_function(
+                lambda a, b: levenshtein_distance(a, b, args.max_distance), bucket_pairs, args.repeat)
+            bucket_mismatches += sum(1 for expected, actual in zip(reference_distances, cutoff_distances)
+                                     if min(expected, args.max_distance + 1) != actual)
+            result["cutoff_seconds"] = cutoff_time
+            result["mismatches"] = bucket_mismatches
+            line += f" {cutoff_time * 1000:>9.1f}ms"
+
+        mismatches += bucket_mismatches
+        results[label] = result
+        print(line)
+
+    if mismatches:
+        print(f"\nError: {mismatches} distances differ from the reference implementation")
+    else:
+        print("\nAll distances match the reference implementation")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+UTILS_DIR = REPO_ROOT / "utils"
+
+# Entry points and the arguments used to start them without doing any work
+ENTRY_POINTS = {
+    "run_round_trip_test": [str(UTILS_DIR / "run_round_trip_test.py"), "--help"],
+    "transliteration_pipeline": [str(UTILS_DIR / "transliteration_pipeline.py"), "--help"],
+    "test_transliterators": [str(UTILS_DIR / "test_transliterators.py"), "--help"],
+    "fast_transliterator": [str(UTILS_DIR / "fast_transliterator.py"), "--help"],
+    "result_cache": [str(UTILS_DIR / "result_cache.py"), "--help"],
+    "import transliterator": ["-c", "import transliterator"],
+}
+
+# One line of `python -X importtime` output: self and cumulative microseconds, then the module
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_entry_point(arguments):
+    """
+    Start an entry point once with -X importtime
+
+    Returns:
+        Tuple of (wall time in seconds, list of (module, self_us, cumulative_us, depth))
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(UTILS_DIR), env.get("PYTHONPATH")]))
+    # Bytecode is still cached on disk, only the interpreter and imports are cold
+    start_time = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + arguments,
+                               cwd=str(REPO_ROOT), env=env, capture_output=True, text=True)
+    elapsed_time = time.perf_counter() - start_time
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return elapsed_time, imports
+
+
+def benchmark_entry_point(arguments, repeat=5, top=10):
+    """Start an entry point several times and summarize its start-up cost"""
+    wall_times = []
+    imports = []
+    for _ in range(repeat):
+        elapsed_time, imports = run_entry_point(arguments)
+        wall_times.append(elapsed_time)
+
+    # Modules imported directly by the entry point, most expensive first
+    top_level = sorted((entry for entry in imports if entry[3] == 0), key=lambda entry: -entry[2])
+    return {
+        "median_seconds": statistics.median(wall_times),
+        "min_seconds": min(wall_times),
+        "max_seconds": max(wall_times),
+        "modules_imported": len(imports),
+        "import_seconds": sum(entry[2] for entry in imports if entry[3] == 0) / 1e6,
+        "slowest_imports": [
+            {"module": module, "cumulative_ms": cumulative_us / 1000, "self_ms": self_us / 1000}
+            for module, self_us, cumulative_us, _ in top_level[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of each entry point")
+    parser.add_argument("--entry-points", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS),
+                        help="Entry points to measure (all if not specified)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of starts per entry point")
+    parser.add_argument("--top", type=int, default=5,
+                        help="Number of slowest imports to show per entry point")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.entry_points:
+        result = benchmark_entry_point(ENTRY_POINTS[name], args.repeat, args.top)
+        results[name] = result
+
+        print(f"\n{name}: {result['median_seconds'] * 1000:.1f} ms median "
+              f"({result['min_seconds'] * 1000:.1f}-{result['max_seconds'] * 1000:.1f} ms), "
+              f"{result['modules_imported']} modules, {result['import_seconds'] * 1000:.1f} ms in imports")
+        for entry in result["slowest_imports"]:
+            print(f"    {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import threading
+
+import pytest
+
+from compare_texts import compare_files, compare_texts, line_opcodes, _line_hash
+
+
+def _opcodes(original, transliterated, **options):
+    return list(line_opcodes(map(_line_hash, original), map(_line_hash, transliterated), **options))
+
+
+def test_identical_texts_are_one_equal_range():
+    lines = [f"line {i}\n" for i in range(1000)]
+    assert _opcodes(lines, list(lines)) == [("equal", 0, 1000, 0, 1000)]
+
+
+@pytest.mark.parametrize("window", [2, 5, 10_000])
+def test_inserted_and_deleted_lines_keep_the_rest_aligned(window):
+    original = [f"line {i}" for i in range(40)]
+    transliterated = original[:5] + ["new"] + original[5:20] + original[23:35] + ["changed"] + original[36:]
+
+    assert _opcodes(original, transliterated, window=window) == [
+        ("equal", 0, 5, 0, 5),
+        ("insert", 5, 5, 5, 6),
+        ("equal", 5, 20, 6, 21),
+        ("delete", 20, 23, 21, 21),
+        ("equal", 23, 35, 21, 33),
+        ("replace", 35, 36, 33, 34),
+        ("equal", 36, 40, 34, 38),
+    ]
+
+
+def test_insertion_longer_than_the_window():
+    original = [f"line {i}" for i in range(20)]
+    transliterated = original[:3] + ["junk"] * 50 + original[3:]
+
+    assert _opcodes(original, transliterated, window=4) == [
+        ("equal", 0, 3, 0, 3),
+        ("insert", 3, 3, 3, 53),
+        ("equal", 3, 20, 53, 70),
+    ]
+
+
+def test_widest_window_without_common_lines_is_a_differing_region():
+    original = [f"line {i}" for i in range(20)]
+    transliterated = [f"other {i}" for i in range(30)]
+
+    assert _opcodes(original, transliterated, window=2, max_window=8) == [
+        ("replace", 0, 8, 0, 8),
+        ("replace", 8, 16, 8, 16),
+        ("replace", 16, 20, 16, 24),
+        ("insert", 20, 20, 24, 30),
+    ]
+
+
+def test_files_are_read_once_from_streams(tmp_path):
+    original = "".join(f"line {i}\n" for i in range(100))
+    transliterated = original.replace("line 5", "lime 5").replace("line 70\n", "")
+    original_fifo = tmp_path / "original"
+    transliterated_fifo = tmp_path / "transliterated"
+    os.mkfifo(original_fifo)
+    os.mkfifo(transliterated_fifo)
+
+    def write(path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    writers = [threading.Thread(target=write, args=(original_fifo, original)),
+               threading.Thread(target=write, args=(transliterated_fifo, transliterated))]
+    for writer in writers:
+        writer.start()
+    log_file = tmp_path / "compare.log"
+    assert compare_files(original_fifo, transliterated_fifo, log_file)
+    for writer in writers:
+        writer.join()
+
+    expected = compare_texts(original, transliterated)
+    log = log_file.read_text(encoding="utf-8")
+    assert f"Similarity ratio: {expected['similarity_ratio']:.4f}" in log
+    assert f"Differing lines: {expected['differing_lines']} of {expected['lines']}" in log
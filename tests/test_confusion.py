@@ -0,0 +1,49 @@
+import difflib
+import unicodedata
+
+from confusion import ConfusionCounter, tokenize_iast
+
+
+def _add(counter, original, round_trip, line_id=0):
+    opcodes = difflib.SequenceMatcher(None, original, round_trip).get_opcodes()
+    counter.add(original, round_trip, opcodes, line_id)
+
+
+def test_decomposed_digraphs_are_one_letter():
+    assert tokenize_iast(unicodedata.normalize("NFD", "kaṭhina ḍhakkā")) == \
+        ["k", "a", "ṭh", "i", "n", "a", " ", "ḍh", "a", "k", "k", "ā"]
+
+
+def test_edits_are_counted_per_level():
+    counter = ConfusionCounter()
+    _add(counter, "rāmaḥ | kṛṣṇaḥ", "rāmah | kṛṣṇah", line_id=3)
+
+    counts = {(row["level"], row["original"], row["round_trip"]): row["count"] for row in counter.rows()}
+    assert counts == {
+        ("char", "ḥ", "h"): 2,
+        ("letter", "ḥ", "h"): 2,
+        ("bigram", "aḥ", "ah"): 2,
+        ("bigram", "ḥ ", "h "): 1,
+    }
+    assert all(row["example_line"] == 3 for row in counter.rows())
+
+
+def test_merge_adds_counts(tmp_path):
+    first = ConfusionCounter()
+    _add(first, "kṛṣṇaḥ", "kṛṣṇah")
+    second = ConfusionCounter.read_csv(first.write_csv(tmp_path / "first.csv"))
+    second.merge(first)
+
+    assert second.counts[("substitution", "letter", "ḥ", "h")] == 2
+
+
+def test_line_count_survives_the_csv(tmp_path):
+    counter = ConfusionCounter()
+    _add(counter, "rāmaḥ", "rāmah", line_id=1)
+    _add(counter, "kṛṣṇaḥ", "krsnah", line_id=2)
+    other = ConfusionCounter()
+    _add(other, "oṃ", "om")
+
+    loaded = ConfusionCounter.read_csv(counter.write_csv(tmp_path / "confusion.csv"))
+    assert loaded.lines == 2
+    assert loaded.merge(ConfusionCounter.read_csv(other.write_csv(tmp_path / "other.csv"))).lines == 3
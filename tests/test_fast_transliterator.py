@@ -0,0 +1,51 @@
+import pytest
+
+from fast_transliterator import FastTransliterator, validate_against_reference
+
+pytest.importorskip("aksharamukha")
+
+# Fixed sample of corpus-like IAST lines, free of oṃ, which aksharamukha writes as a ligature
+SAMPLE = [
+    "dharmakṣetre kurukṣetre samavetā yuyutsavaḥ",
+    "māmakāḥ pāṇḍavāś caiva kim akurvata sañjaya",
+    "kṛṣṇaḥ",
+    "rāmo vanaṃ gacchati",
+    "tataḥ śaṅkhāś ca bheryaś ca paṇavānakagomukhāḥ",
+    "śrībhagavān uvāca",
+    "yadā yadā hi dharmasya glānir bhavati bhārata",
+    "abhyutthānam adharmasya tadātmānaṃ sṛjāmy aham",
+    "ṛṣibhir bahudhā gītaṃ chandobhir vividhaiḥ pṛthak",
+    "aiśvaryasya samagrasya vīryasya yaśasaḥ śriyaḥ",
+    "kḷptaṃ jñānaṃ ca ḍhakkā ṭīkā ca",
+    "idaṃ śarīraṃ kaunteya kṣetram ity abhidhīyate",
+]
+
+# aksharamukha writes Telugu nasals before a consonant of their own class and word-final m
+# as anusvara, so forward output is only compared on lines that have neither
+TELUGU_FORWARD_SAMPLE = [
+    "kṛṣṇaḥ",
+    "śrībhagavān uvāca",
+    "yadā yadā hi dharmasya glānir bhavati bhārata",
+    "aiśvaryasya samagrasya vīryasya yaśasaḥ śriyaḥ",
+]
+
+
+@pytest.mark.parametrize("script", ["Devanagari", "Sharada"])
+def test_agrees_with_aksharamukha(script):
+    results = validate_against_reference(SAMPLE, script)
+
+    assert results["examples"] == []
+    assert results["forward_matches"] == results["reverse_matches"] == len(SAMPLE)
+
+
+def test_agrees_with_aksharamukha_for_telugu():
+    results = validate_against_reference(SAMPLE, "Telugu")
+    assert results["reverse_matches"] == len(SAMPLE)
+
+    results = validate_against_reference(TELUGU_FORWARD_SAMPLE, "Telugu")
+    assert results["examples"] == []
+
+
+def test_telugu_keeps_nasal_consonants():
+    # aksharamukha gives వనం గచ్ఛతి here
+    assert FastTransliterator("IAST", "Telugu")("vanam gacchati") == "వనమ్ గచ్ఛతి"
@@ -0,0 +1,26 @@
+from html_report import ShardedHTMLReport
+
+
+def _write_report(path, diffs):
+    report = ShardedHTMLReport(path, "Report", page_size=2)
+    for index in range(diffs):
+        report.add(f"line {index}", f"lime {index}")
+    return report.close()
+
+
+def test_shorter_report_removes_stale_pages(tmp_path):
+    path = tmp_path / "diff.html"
+    _write_report(path, 5)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "diff.html", "diff_page_0001.html", "diff_page_0002.html", "diff_page_0003.html"]
+
+    assert _write_report(path, 2) == path
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["diff.html", "diff_page_0001.html"]
+
+
+def test_report_without_diffs_removes_earlier_report(tmp_path):
+    path = tmp_path / "diff.html"
+    _write_report(path, 3)
+
+    assert _write_report(path, 0) is None
+    assert list(tmp_path.iterdir()) == []
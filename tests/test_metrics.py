@@ -0,0 +1,49 @@
+import pytest
+
+import metrics
+from metrics import MetricsAccumulator, compute_batch_metrics
+
+PAIRS = [
+    ("rāmo vanaṃ gacchati", "rāmo vanaṃ gacchati"),
+    ("kṛṣṇaḥ", "krsnah"),
+    ("", ""),
+    ("dharmakṣetre", "dharmakṣetre kurukṣetre"),
+    ("oṃ", "om"),
+]
+WEIGHTS = [3, 1, 1, 2, 5]
+
+
+@pytest.mark.parametrize("numpy_installed", [True, False])
+def test_batch_matches_line_by_line(monkeypatch, numpy_installed):
+    if numpy_installed:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(metrics, "_load_numpy", lambda: None)
+    expected = MetricsAccumulator()
+    alignments = [expected.add(original, converted) for original, converted in PAIRS]
+
+    batch = compute_batch_metrics(PAIRS)
+
+    assert list(batch["exact"]) == [alignment.exact for alignment in alignments]
+    assert list(batch["line_chars"]) == [alignment.total_chars for alignment in alignments]
+    assert list(batch["matching_chars"]) == [alignment.matching_chars for alignment in alignments]
+    assert list(batch["levenshtein"]) == [alignment.levenshtein for alignment in alignments]
+    batch_metrics = MetricsAccumulator()
+    batch_metrics.add_batch(batch)
+    assert batch_metrics.result("Devanagari", "fast") == expected.result("Devanagari", "fast")
+
+
+@pytest.mark.parametrize("numpy_installed", [True, False])
+def test_batch_totals_are_weighted(monkeypatch, numpy_installed):
+    if numpy_installed:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(metrics, "_load_numpy", lambda: None)
+    expected = MetricsAccumulator()
+    for (original, converted), weight in zip(PAIRS, WEIGHTS):
+        expected.add_alignment(metrics.LineAlignment(original, converted), weight)
+
+    batch = compute_batch_metrics(PAIRS, WEIGHTS)
+
+    assert batch["lines"] == sum(WEIGHTS)
+    assert {key: batch[key] for key in expected.totals()} == expected.totals()
@@ -0,0 +1,26 @@
+import sys
+
+import pytest
+
+import result_cache
+from result_cache import TransliterationCache, get_cache_path
+
+
+def _fill_cache(output_dir, lines):
+    with TransliterationCache(get_cache_path(output_dir)) as cache:
+        cache.put_many(lines, [line.upper() for line in lines], "fast", "IAST", "Devanagari")
+
+
+def _run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["result_cache.py", *args])
+    result_cache.main()
+
+
+@pytest.mark.parametrize("command, remaining", [("stats", 5), ("vacuum", 2), ("clear", 0)])
+def test_only_vacuum_evicts(tmp_path, monkeypatch, command, remaining):
+    _fill_cache(tmp_path, [f"line {i}" for i in range(5)])
+
+    _run(monkeypatch, command, str(tmp_path), "--max-entries", "2")
+
+    with TransliterationCache(get_cache_path(tmp_path), None) as cache:
+        assert cache.size() == remaining
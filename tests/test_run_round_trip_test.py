@@ -0,0 +1,89 @@
+import csv
+import gzip
+
+import pytest
+
+import line_results
+import run_round_trip_test
+from run_round_trip_test import run_round_trip_test as run
+
+
+def _write_texts(directory):
+    directory.mkdir()
+    (directory / "clean.txt").write_text("rāmo vanaṃ gacchati\nkṛṣṇaḥ\n", encoding="utf-8")
+    (directory / "other.txt").write_text("dharmakṣetre kurukṣetre\n", encoding="utf-8")
+    return directory
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("fused", [False, True])
+def test_directory_run_without_diffs(tmp_path, jobs, fused):
+    input_dir = _write_texts(tmp_path / "texts")
+    output_dir = tmp_path / "results"
+
+    completed = run(str(input_dir), ["fast"], str(output_dir), scripts=["Devanagari"], fused=fused, jobs=jobs)
+
+    assert completed is not False
+    for name in ("clean", "other"):
+        assert (output_dir / "texts" / name / "logs" / "comparison_fast_Devanagari.log").exists()
+    with open(output_dir / "round_trip_summary.csv", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert rows[0]["Texts"] == "2"
+    assert rows[0]["Lines"] == "3"
+    assert float(rows[0]["Exact Matches (%)"]) == 100.0
+
+
+def test_directory_run_reports_failed_jobs(tmp_path, monkeypatch, capsys):
+    input_dir = _write_texts(tmp_path / "texts")
+
+    def failing_run_pair(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(run_round_trip_test, "run_pair", failing_run_pair)
+    completed = run(str(input_dir), ["fast"], str(tmp_path / "results"), scripts=["Devanagari"])
+
+    output = capsys.readouterr().out
+    assert completed is False
+    assert "Error: 2 text/system/script jobs failed" in output
+    assert "All tests completed" not in output
+
+
+def test_single_file_run_reports_failed_pairs(tmp_path, monkeypatch, capsys):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("rāmo vanaṃ gacchati\nkṛṣṇaḥ\n", encoding="utf-8")
+    run_pair = run_round_trip_test.run_pair
+
+    def run_pair_failing_for_telugu(input_file, system, script, *args, **kwargs):
+        if script == "Telugu":
+            return None
+        return run_pair(input_file, system, script, *args, **kwargs)
+
+    monkeypatch.setattr(run_round_trip_test, "run_pair", run_pair_failing_for_telugu)
+    completed = run(str(input_file), ["fast"], str(tmp_path / "results"), scripts=["Devanagari", "Telugu"])
+
+    output = capsys.readouterr().out
+    assert completed is False
+    assert "Error: 1 system/script pairs failed" in output
+    assert "fast/Telugu" in output
+    assert "All tests completed" not in output
+
+
+@pytest.mark.parametrize("options", [{"dedup": True}, {"sample_size": 3}])
+def test_line_results_point_into_input_file(tmp_path, monkeypatch, options):
+    monkeypatch.setattr(line_results, "_load_pyarrow", lambda: None)
+    input_file = tmp_path / "input.txt"
+    lines = ["kṛṣṇaḥ", "", "rāmo vanaṃ gacchati", "kṛṣṇaḥ", "dharmakṣetre kurukṣetre", "kṛṣṇaḥ"]
+    input_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    output_dir = tmp_path / "results"
+
+    run(str(input_file), ["fast"], str(output_dir), scripts=["Devanagari"], line_results=True, **options)
+
+    with gzip.open(output_dir / "logs" / "lines_fast_Devanagari.csv.gz", "rt", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sum(int(row["count"]) for row in rows) == (5 if "dedup" in options else 3)
+    for row in rows:
+        assert row["source_file"] == str(input_file)
+        assert int(row["original_length"]) == len(lines[int(row["line_id"])])
+    if "dedup" in options:
+        assert {row["line_id"]: row["count"] for row in rows} == {"0": "3", "2": "1", "4": "1"}
@@ -0,0 +1,37 @@
+import math
+
+import pytest
+
+from sampling import SimpleRandomSample, StratifiedEstimator
+
+
+def _estimates(population, lines):
+    estimator = StratifiedEstimator(SimpleRandomSample(population))
+    for index, (exact, matching, total) in enumerate(lines):
+        estimator.add(index, exact, matching, total, total - matching)
+    return estimator.estimates()
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_uniform_sample_keeps_a_margin(exact):
+    line = (True, 40, 40) if exact else (False, 0, 40)
+    estimates = _estimates(100_000, [line] * 1000)
+
+    # Wilson interval of 0 or 1000 successes in 1000: about 0.19 percentage points either way
+    assert estimates["Exact Matches ± (%)"] == pytest.approx(0.19, abs=0.01)
+    assert estimates["Char Accuracy ± (%)"] == pytest.approx(0.19, abs=0.01)
+
+
+def test_mixed_sample_is_close_to_the_normal_interval():
+    lines = [(True, 40, 40)] * 900 + [(False, 38, 40)] * 100
+    estimates = _estimates(1_000_000, lines)
+
+    normal_margin = 1.96 * math.sqrt(0.9 * 0.1 / 1000) * 100
+    assert estimates["Exact Matches ± (%)"] == pytest.approx(normal_margin, rel=0.02)
+
+
+def test_whole_population_has_no_margin():
+    estimates = _estimates(500, [(True, 40, 40)] * 500)
+
+    assert estimates["Exact Matches ± (%)"] == 0
+    assert estimates["Char Accuracy ± (%)"] == 0
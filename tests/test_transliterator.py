@@ -0,0 +1,65 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import transliterator
+from transliterator import verify_word_level
+
+KEY = ("fast", "IAST", "Devanagari")
+
+
+@pytest.fixture(autouse=True)
+def fresh_word_level_checks(monkeypatch):
+    monkeypatch.setattr(transliterator, "_WORD_LEVEL_VERIFIED", {})
+    monkeypatch.setattr(transliterator, "_WORD_LEVEL_CHECKED", {})
+
+
+def test_empty_input_is_not_verified():
+    assert verify_word_level([], "IAST", "Devanagari", "fast") is False
+    assert verify_word_level(["\n", "  \n"], "IAST", "Devanagari", "fast") is False
+    assert KEY not in transliterator._WORD_LEVEL_VERIFIED
+
+
+def test_result_is_kept_once_the_sample_is_complete(monkeypatch):
+    monkeypatch.setattr(transliterator, "WORD_LEVEL_SAMPLE_SIZE", 4)
+    lines = ["rāmo vanaṃ gacchati\n", "kṛṣṇaḥ\n", "dharmakṣetre kurukṣetre\n"]
+
+    assert verify_word_level(lines, "IAST", "Devanagari", "fast") is True
+    assert KEY not in transliterator._WORD_LEVEL_VERIFIED
+    assert verify_word_level(lines, "IAST", "Devanagari", "fast") is True
+    assert transliterator._WORD_LEVEL_VERIFIED[KEY] is True
+
+
+def test_differing_line_is_kept(monkeypatch):
+    # Reversing a whole line differs from reversing it word by word
+    monkeypatch.setattr(transliterator, "transliterate_text", lambda text, *args: text[::-1])
+
+    assert verify_word_level(["rāmo vanaṃ\n"], "IAST", "Devanagari", "fast") is False
+    assert transliterator._WORD_LEVEL_VERIFIED[KEY] is False
+
+
+def test_unavailable_step_fails_before_reading_input(monkeypatch, capsys):
+    class UnreadableInput:
+        def __iter__(self):
+            raise AssertionError("input was read")
+
+    monkeypatch.setattr(sys, "argv", ["transliterator.py", "IAST", "Devanagari", "Telugu", "--system", "fast"])
+    monkeypatch.setattr(sys, "stdin", UnreadableInput())
+
+    with pytest.raises(SystemExit) as exit_info:
+        transliterator.main()
+
+    assert exit_info.value.code == 1
+    assert "not available for Devanagari -> Telugu" in capsys.readouterr().err
+
+
+def test_reader_closing_early_is_not_an_error():
+    script = Path(transliterator.__file__)
+    process = subprocess.Popen([sys.executable, str(script), "IAST", "Devanagari", "--system", "fast"],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.close()
+    _, errors = process.communicate("kṛṣṇaḥ\n".encode("utf-8") * 100_000)
+
+    assert b"Traceback" not in errors
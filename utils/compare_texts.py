@@ -1,141 +1,495 @@
 import os
-import difflib
+import bisect
 import itertools
 from pathlib import Path
 import datetime
-import re
 from collections import Counter
 import random
 import unicodedata
 
-def analyze_transliteration_loss(original_text, transliterated_text):
-    analysis = {
-        "character_categories": {
-            "original": Counter(),
-            "transliterated": Counter()
-        },
-        "potential_losses": [],
-        "ambiguous_mappings": [],
-        "special_characters": {
-            "original": Counter(),
-            "transliterated": Counter()
-        }
-    }
+# Most frequent character substitutions reported as potential losses, with an example each
+DEFAULT_TOP_K = 20
+
+# Differing lines listed in the sample differences
+SAMPLE_DIFFERENCES = 20
+
+# Differing regions with different numbers of lines on both sides are aligned as one text up to
+# this many lines, larger ones line by line
+MAX_REGION_LINES = 200
+
+# Lines of each text aligned at once after a difference, which bounds the memory of the line alignment
+ALIGNMENT_WINDOW_LINES = 10_000
+
+# Widest window, after a difference with no line in common within it, the window is a differing region
+MAX_ALIGNMENT_WINDOW_LINES = 80_000
+
+PUNCTUATION_CATEGORIES = ['Po', 'Ps', 'Pe', 'Pi', 'Pf', 'Pc']
+
+class TextComparison:
+    """
+    Line-aligned comparison of an original and a transliterated text, fed one pair of lines at a time
+
+    Only character counters, the most frequent substitutions and the first differing lines
+    are kept, so memory does not grow with the length of the texts. Characters are compared
+    by position within each pair of lines, and aligned within differing lines, so a changed
+    line does not shift the comparison of all lines after it. Pairs of lines are found with
+    line_opcodes, see compare_texts.
+    """
+
+    def __init__(self, top_k=DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.lines = 0
+        self.differing_lines = 0
+        # Every character, and the characters of the text with whitespace collapsed to single spaces
+        self.chars = {"original": Counter(), "transliterated": Counter()}
+        self.clean_chars = {"original": Counter(), "transliterated": Counter()}
+        self.words = {"original": 0, "transliterated": 0}
+        self.sample_differences = []
+        # Positions where the collapsed lines match, and characters matched by aligning them
+        self.matches = 0
+        self.aligned_matches = 0
+        self.substitutions = Counter()
+        self.first_positions = {}
+        self.char_mappings = {}
+        self.special_characters = {"original": Counter(), "transliterated": Counter()}
+
+    def _add_text(self, side, line):
+        self.chars[side].update(line)
+        words = line.split()
+        if not words:
+            return words
+        clean = self.clean_chars[side]
+        clean.update(''.join(words))
+        # Spaces between the words, and the one joining them to the words of earlier lines
+        separators = len(words) - 1 + (1 if self.words[side] else 0)
+        if separators:
+            clean[' '] += separators
+        self.words[side] += len(words)
+        return words
+
+    def _add_sample_difference(self, prefix, line):
+        if line and len(self.sample_differences) < SAMPLE_DIFFERENCES:
+            self.sample_differences.append(prefix + line.rstrip("\r\n"))
+
+    def add(self, original_line, transliterated_line, line_number=None):
+        """
+        Compare a line of the original text with the line of the transliterated text it is aligned with
+
+        Args:
+            original_line: Line of the original text, empty when the transliterated line was inserted
+            transliterated_line: Line of the transliterated text, empty when the original line was deleted
+            line_number: Line number in the original text, reported with the substitutions found
+        """
+        self.lines += 1
+        if line_number is None:
+            line_number = self.lines
+        original_words = self._add_text("original", original_line)
+        transliterated_words = self._add_text("transliterated", transliterated_line)
 
-    for char in original_text:
-        category = unicodedata.category(char)
-        analysis["character_categories"]["original"][category] += 1
+        if original_line.rstrip("\r\n") == transliterated_line.rstrip("\r\n"):
+            for char in set(original_line):
+                self.char_mappings.setdefault(char, set()).add(char)
+            if original_words:
+                self.matches += sum(len(word) for word in original_words) + len(original_words)
+                self.aligned_matches += sum(len(word) for word in original_words) + len(original_words)
+            return
 
-    for char in transliterated_text:
-        category = unicodedata.category(char)
-        analysis["character_categories"]["transliterated"][category] += 1
+        self.differing_lines += 1
+        self._add_sample_difference("- ", original_line)
+        self._add_sample_difference("+ ", transliterated_line)
+        for column, (orig_char, trans_char) in enumerate(zip(original_line, transliterated_line)):
+            self.char_mappings.setdefault(orig_char, set()).add(trans_char)
+            if orig_char == trans_char:
+                continue
+            if unicodedata.category(orig_char) in PUNCTUATION_CATEGORIES:
+                self.special_characters["original"][orig_char] += 1
+            if unicodedata.category(trans_char) in PUNCTUATION_CATEGORIES:
+                self.special_characters["transliterated"][trans_char] += 1
+            pair = (orig_char, trans_char)
+            self.substitutions[pair] += 1
+            if pair not in self.first_positions:
+                self.first_positions[pair] = (line_number, column)
 
-    for i, (orig_char, trans_char) in enumerate(zip(original_text, transliterated_text)):
-        if orig_char != trans_char:
-            orig_name = unicodedata.name(orig_char, "Unknown")
-            trans_name = unicodedata.name(trans_char, "Unknown")
+        if original_words and transliterated_words:
+            original_clean = ' '.join(original_words)
+            transliterated_clean = ' '.join(transliterated_words)
+            self.matches += sum(1 for a, b in zip(original_clean, transliterated_clean) if a == b) + 1
+            self.aligned_matches += _matching_chars(original_clean, transliterated_clean) + 1
 
-            if unicodedata.category(orig_char) in ['Po', 'Ps', 'Pe', 'Pi', 'Pf', 'Pc']:
-                analysis["special_characters"]["original"][orig_char] += 1
-            if unicodedata.category(trans_char) in ['Po', 'Ps', 'Pe', 'Pi', 'Pf', 'Pc']:
-                analysis["special_characters"]["transliterated"][trans_char] += 1
+    def add_region(self, original_lines, transliterated_lines, line_number=None):
+        """
+        Compare a region of differing lines, with a different number of lines on both sides
 
-            analysis["potential_losses"].append({
-                "position": i,
+        The characters of the whole region are aligned, the lines are counted as deleted and inserted.
+
+        Args:
+            original_lines: Lines of the region in the original text
+            transliterated_lines: Lines of the region in the transliterated text
+            line_number: Line number of the region in the original text
+        """
+        line_number = line_number if line_number is not None else self.lines + 1
+        for offset, original_line in enumerate(original_lines):
+            self.add(original_line, "", line_number + offset)
+        for transliterated_line in transliterated_lines:
+            self.add("", transliterated_line, line_number)
+
+        original_clean = ' '.join(' '.join(line.split()) for line in original_lines if line.split())
+        transliterated_clean = ' '.join(' '.join(line.split()) for line in transliterated_lines if line.split())
+        if original_clean and transliterated_clean:
+            self.aligned_matches += _matching_chars(original_clean, transliterated_clean) + 1
+
+    def loss_analysis(self):
+        """Character categories, most frequent substitutions, ambiguous mappings and special characters"""
+        categories = {}
+        for side, chars in self.chars.items():
+            categories[side] = Counter()
+            for char, count in chars.items():
+                categories[side][unicodedata.category(char)] += count
+
+        potential_losses = []
+        for (orig_char, trans_char), count in self.substitutions.most_common(self.top_k):
+            line, column = self.first_positions[(orig_char, trans_char)]
+            potential_losses.append({
+                "count": count,
+                "line": line,
+                "column": column,
                 "original": {
                     "char": orig_char,
-                    "name": orig_name,
+                    "name": unicodedata.name(orig_char, "Unknown"),
                     "category": unicodedata.category(orig_char)
                 },
                 "transliterated": {
                     "char": trans_char,
-                    "name": trans_name,
+                    "name": unicodedata.name(trans_char, "Unknown"),
                     "category": unicodedata.category(trans_char)
                 }
             })
 
-    char_mappings = {}
-    for orig_char, trans_char in zip(original_text, transliterated_text):
-        if orig_char not in char_mappings:
-            char_mappings[orig_char] = set()
-        char_mappings[orig_char].add(trans_char)
-
-    for orig_char, trans_chars in char_mappings.items():
-        if len(trans_chars) > 1:
-            analysis["ambiguous_mappings"].append({
-                "original_char": orig_char,
-                "possible_transliterations": list(trans_chars)
-            })
+        ambiguous_mappings = [{"original_char": orig_char, "possible_transliterations": list(trans_chars)}
+                              for orig_char, trans_chars in self.char_mappings.items() if len(trans_chars) > 1]
 
-    return analysis
+        return {
+            "character_categories": categories,
+            "potential_losses": potential_losses,
+            "substitution_count": sum(self.substitutions.values()),
+            "ambiguous_mappings": ambiguous_mappings,
+            "special_characters": self.special_characters
+        }
+
+    def result(self):
+        """Summary statistics of all lines added so far, in the format of compare_texts"""
+        orig_char_freq = self.clean_chars["original"]
+        trans_char_freq = self.clean_chars["transliterated"]
+        orig_chars = sum(orig_char_freq.values())
+        trans_chars = sum(trans_char_freq.values())
+        if not orig_chars or not trans_chars:
+            return {
+                "error": "One or both texts are empty or None"
+            }
+
+        char_set_similarity = len(orig_char_freq.keys() & trans_char_freq.keys()) / max(len(orig_char_freq),
+                                                                                      len(trans_char_freq))
+
+        lost_chars = {c: orig_char_freq[c] for c in orig_char_freq if c not in trans_char_freq or orig_char_freq[c] > trans_char_freq[c]}
+        added_chars = {c: trans_char_freq[c] for c in trans_char_freq if c not in orig_char_freq or trans_char_freq[c] > orig_char_freq[c]}
+
+        # The last line has no separator after it
+        char_match_similarity = min(1.0, max(self.matches - 1, 0) / min(orig_chars, trans_chars))
+
+        # Like difflib.SequenceMatcher.ratio, with characters only aligned within aligned lines
+        difflib_similarity = min(1.0, 2.0 * max(self.aligned_matches - 1, 0) / (orig_chars + trans_chars))
+
+        similarity_ratio = (0.7 * char_match_similarity) + (0.3 * difflib_similarity)
 
-def compare_texts(original_text, transliterated_text, sample_size=5000, sample_count=3):
-    if not original_text or not transliterated_text:
         return {
-            "error": "One or both texts are empty or None"
+            "original_length": orig_chars,
+            "transliterated_length": trans_chars,
+            "character_difference": abs(orig_chars - trans_chars),
+            "similarity_ratio": similarity_ratio,
+            "character_set_similarity": char_set_similarity,
+            "lost_characters": dict(itertools.islice(lost_chars.items(), 20)),
+            "added_characters": dict(itertools.islice(added_chars.items(), 20)),
+            "sample_differences": self.sample_differences,
+            "lines": self.lines,
+            "differing_lines": self.differing_lines,
+            "transliteration_analysis": self.loss_analysis()
         }
 
-    original_clean = re.sub(r'\s+', ' ', original_text).strip()
-    transliterated_clean = re.sub(r'\s+', ' ', transliterated_text).strip()
+def _matching_chars(a, b):
+    """
+    Length of the longest common subsequence of two strings, the characters an alignment can match
+
+    Computed with Hyyro's bit-parallel algorithm, one Python int holding a row of the DP matrix,
+    after stripping the common prefix and suffix.
+    """
+    prefix = 0
+    shorter = min(len(a), len(b))
+    while prefix < shorter and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shorter - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a = a[prefix:len(a) - suffix]
+    b = b[prefix:len(b) - suffix]
+    if not a or not b:
+        return prefix + suffix
+
+    match_masks = {}
+    for i, char in enumerate(a):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+    all_bits = (1 << len(a)) - 1
+    row = all_bits
+    for char in b:
+        matched = row & match_masks.get(char, 0)
+        row = ((row + matched) | (row - matched)) & all_bits
+    return prefix + suffix + len(a) - bin(row).count("1")
+
+def _line_hash(line):
+    # Python string hashes are only stable within a process, which is all the alignment needs
+    return hash(line.rstrip("\r\n"))
+
+class _LineWindow:
+    """Lines of one text read ahead of the alignment, with their hashes"""
+
+    def __init__(self, lines, key=None):
+        self._lines = iter(lines)
+        self._key = key
+        self.lines = []
+        self.hashes = []
+        # Position in the text of the first buffered line
+        self.start = 0
+        self.exhausted = False
+
+    def fill(self, count):
+        """Read lines until count are buffered or the text ends, returns the number buffered"""
+        while len(self.lines) < count and not self.exhausted:
+            line = next(self._lines, None)
+            if line is None:
+                self.exhausted = True
+                break
+            self.lines.append(line)
+            self.hashes.append(self._key(line) if self._key is not None else line)
+        return len(self.lines)
+
+    def take(self, count):
+        """Remove the first count buffered lines and return them"""
+        lines = self.lines[:count]
+        del self.lines[:count]
+        del self.hashes[:count]
+        self.start += count
+        return lines
+
+def _unique_positions(hashes, lo, hi):
+    counts = Counter(hashes[lo:hi])
+    return {line_hash: i for i, line_hash in enumerate(hashes[lo:hi], lo) if counts[line_hash] == 1}
+
+def _longest_increasing(pairs):
+    """Longest chain of (i, j) pairs, given in increasing i, that also increases in j, by patience sorting"""
+    tails = []
+    tail_positions = []
+    previous = []
+    for position, (_, j) in enumerate(pairs):
+        length = bisect.bisect_left(tails, j)
+        if length == len(tails):
+            tails.append(j)
+            tail_positions.append(position)
+        else:
+            tails[length] = j
+            tail_positions[length] = position
+        previous.append(tail_positions[length - 1] if length else None)
+
+    chain = []
+    position = tail_positions[-1] if tail_positions else None
+    while position is not None:
+        chain.append(pairs[position])
+        position = previous[position]
+    return chain[::-1]
 
-    loss_analysis = analyze_transliteration_loss(original_text, transliterated_text)
+def _matched_runs(a, alo, ahi, b, blo, bhi):
+    """
+    Match the lines of a[alo:ahi] and b[blo:bhi] in the style of patience diff
 
-    orig_chars = len(original_clean)
-    trans_chars = len(transliterated_clean)
-    char_diff = abs(orig_chars - trans_chars)
+    Returns:
+        List of matched runs as (i, j, length), sorted by i
+    """
+    runs = []
+    regions = [(alo, ahi, blo, bhi)]
+    while regions:
+        alo, ahi, blo, bhi = regions.pop()
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            runs.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if ahi < end:
+            runs.append((ahi, bhi, end - ahi))
+        if alo == ahi or blo == bhi:
+            continue
 
-    orig_char_set = set(original_clean)
-    trans_char_set = set(transliterated_clean)
-    common_chars = orig_char_set.intersection(trans_char_set)
-    char_set_similarity = len(common_chars) / max(len(orig_char_set), len(trans_char_set))
+        unique_transliterated = _unique_positions(b, blo, bhi)
+        anchors = _longest_increasing([(i, unique_transliterated[line_hash])
+                                       for line_hash, i in _unique_positions(a, alo, ahi).items()
+                                       if line_hash in unique_transliterated])
+        for i, j in anchors:
+            runs.append((i, j, 1))
+            regions.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        if anchors:
+            regions.append((alo, ahi, blo, bhi))
+    runs.sort()
+    return runs
 
-    # Always perform full character comparison
-    orig_char_freq = Counter(original_clean)
-    trans_char_freq = Counter(transliterated_clean)
+def _unmatched_opcode(i1, i2, j1, j2):
+    if i1 < i2 and j1 < j2:
+        return ('replace', i1, i2, j1, j2)
+    if i1 < i2:
+        return ('delete', i1, i2, j1, j1)
+    if j1 < j2:
+        return ('insert', i1, i1, j1, j2)
+    return None
 
-    lost_chars = {c: orig_char_freq[c] for c in orig_char_freq if c not in trans_char_freq or orig_char_freq[c] > trans_char_freq[c]}
-    added_chars = {c: trans_char_freq[c] for c in trans_char_freq if c not in orig_char_freq or trans_char_freq[c] > orig_char_freq[c]}
+def _aligned_blocks(original_lines, transliterated_lines, key=None, window=ALIGNMENT_WINDOW_LINES,
+                    max_window=MAX_ALIGNMENT_WINDOW_LINES):
+    """
+    Align two texts in one pass, see line_opcodes
 
-    match_count = sum(1 for a, b in zip(original_clean, transliterated_clean) if a == b)
-    char_match_similarity = match_count / min(len(original_clean), len(transliterated_clean))
+    Args:
+        original_lines: Iterable of the lines of the original text
+        transliterated_lines: Iterable of the lines of the transliterated text
+        key: Function giving the hash a line is matched by, None if the lines are hashes already
+        window: Lines of each text aligned at once after a difference
+        max_window: Widest window, see line_opcodes
 
-    sequence_matcher = difflib.SequenceMatcher(None, original_clean, transliterated_clean)
-    difflib_similarity = sequence_matcher.quick_ratio()
+    Yields:
+        ((tag, i1, i2, j1, j2), original_block, transliterated_block), the opcodes of line_opcodes
+        with the lines they cover, split into blocks of at most max_window lines
+    """
+    a = _LineWindow(original_lines, key)
+    b = _LineWindow(transliterated_lines, key)
+    while True:
+        # Equal lines are matched as they come, without building any index
+        count = 0
+        while (count < window and a.fill(count + 1) > count and b.fill(count + 1) > count
+               and a.hashes[count] == b.hashes[count]):
+            count += 1
+        if count:
+            yield ('equal', a.start, a.start + count, b.start, b.start + count), a.take(count), b.take(count)
+            continue
 
-    similarity_ratio = (0.7 * char_match_similarity) + (0.3 * difflib_similarity)
+        if not a.fill(1) or not b.fill(1):
+            # One text has ended, the rest of the other is deleted or inserted max_window lines at a time
+            if not a.fill(max_window) and not b.fill(max_window):
+                return
+            opcode = _unmatched_opcode(a.start, a.start + len(a.lines), b.start, b.start + len(b.lines))
+            yield opcode, a.take(len(a.lines)), b.take(len(b.lines))
+            continue
 
-    orig_words = original_clean.split()[:200]
-    trans_words = transliterated_clean.split()[:200]
+        # Nothing in common within the window, such as after a long insertion, widens it
+        size = min(window, max_window)
+        while True:
+            ahi = min(a.fill(size), size)
+            bhi = min(b.fill(size), size)
+            runs = _matched_runs(a.hashes, 0, ahi, b.hashes, 0, bhi)
+            ended = a.exhausted and b.exhausted and ahi == len(a.lines) and bhi == len(b.lines)
+            if runs or ended or size == max_window:
+                break
+            size = min(size * 2, max_window)
+        if not runs:
+            # Not even the widest window has a line in common
+            opcode = _unmatched_opcode(a.start, a.start + ahi, b.start, b.start + bhi)
+            yield opcode, a.take(ahi), b.take(bhi)
+            continue
 
-    differ = difflib.Differ()
-    diff_list = list(differ.compare(orig_words, trans_words))
+        i = j = 0
+        for run_i, run_j, length in runs:
+            opcode = _unmatched_opcode(a.start + i, a.start + run_i, b.start + j, b.start + run_j)
+            if opcode:
+                yield opcode, a.lines[i:run_i], b.lines[j:run_j]
+            yield (('equal', a.start + run_i, a.start + run_i + length, b.start + run_j, b.start + run_j + length),
+                   a.lines[run_i:run_i + length], b.lines[run_j:run_j + length])
+            i, j = run_i + length, run_j + length
+        # Lines after the last match are aligned again with the next window
+        a.take(i)
+        b.take(j)
 
-    sample_differences = [d for d in diff_list if d.startswith('+ ') or d.startswith('- ')][:20]
+def line_opcodes(original_hashes, transliterated_hashes, window=ALIGNMENT_WINDOW_LINES,
+                 max_window=MAX_ALIGNMENT_WINDOW_LINES):
+    """
+    Align the lines of two texts, given as iterables of line hashes, in the style of patience diff
 
-    return {
-        "original_length": orig_chars,
-        "transliterated_length": trans_chars,
-        "character_difference": char_diff,
-        "similarity_ratio": similarity_ratio,
-        "character_set_similarity": char_set_similarity,
-        "lost_characters": dict(itertools.islice(lost_chars.items(), 20)),
-        "added_characters": dict(itertools.islice(added_chars.items(), 20)),
-        "sample_differences": sample_differences,
-        "transliteration_analysis": loss_analysis
-    }
+    The texts are walked from the start, matching equal lines as they come. At a difference,
+    the next window lines of both texts are read and aligned: identical leading and trailing
+    lines are matched first, then lines occurring exactly once on both sides are used as
+    anchors, keeping the longest run of them that appears in the same order on both sides,
+    and the lines between consecutive anchors are aligned the same way. The walk resumes
+    after the last match. A window with no line in common is doubled, up to max_window
+    lines, and if even that has no line in common, its lines form one differing region.
+    The texts are read once and memory is bounded by max_window, not by the length of the
+    texts. Lines left over form the differing regions.
+
+    Yields:
+        (tag, i1, i2, j1, j2) line ranges, as returned by difflib.SequenceMatcher.get_opcodes
+    """
+    pending = None
+    for opcode, _, _ in _aligned_blocks(original_hashes, transliterated_hashes, None, window, max_window):
+        # Equal, deleted and inserted blocks that continue each other are one range
+        if pending is not None and pending[0] == opcode[0] != 'replace':
+            pending = (opcode[0], pending[1], opcode[2], pending[3], opcode[4])
+            continue
+        if pending is not None:
+            yield pending
+        pending = opcode
+    if pending is not None:
+        yield pending
+
+def _compare_sources(original_lines, transliterated_lines):
+    """
+    Compare two texts, each given as an iterable of its lines, read once
+
+    Lines are hashed as they are read for the alignment, and only its window and the
+    aligned blocks are held in memory, however long the texts are, so pipes and other
+    streams can be compared as well.
+    """
+    comparison = TextComparison()
+    for (tag, i1, i2, j1, j2), originals, transliterated in _aligned_blocks(original_lines, transliterated_lines,
+                                                                             _line_hash):
+        if tag == 'replace' and i2 - i1 != j2 - j1 and max(i2 - i1, j2 - j1) <= MAX_REGION_LINES:
+            comparison.add_region(originals, transliterated, i1 + 1)
+            continue
+        # Equal lines, and differing regions compared line by line
+        for line_number, (original_line, transliterated_line) in enumerate(
+                itertools.zip_longest(originals, transliterated, fillvalue=""), i1 + 1):
+            comparison.add(original_line, transliterated_line, line_number)
+    return comparison
+
+def analyze_transliteration_loss(original_text, transliterated_text):
+    return _compare_sources(original_text.splitlines(True), transliterated_text.splitlines(True)).loss_analysis()
+
+def compare_texts(original_text, transliterated_text, sample_size=5000, sample_count=3):
+    if not original_text or not transliterated_text:
+        return {
+            "error": "One or both texts are empty or None"
+        }
+
+    return _compare_sources(original_text.splitlines(True), transliterated_text.splitlines(True)).result()
 
 def compare_files(original_file, transliterated_file, log_file):
     try:
         log_path = Path(log_file).parent
         os.makedirs(log_path, exist_ok=True)
 
-        with open(original_file, 'r', encoding='utf-8') as f:
-            original_text = f.read()
-
-        with open(transliterated_file, 'r', encoding='utf-8') as f:
-            transliterated_text = f.read()
+        with open(original_file, 'r', encoding='utf-8') as original_f, \
+             open(transliterated_file, 'r', encoding='utf-8') as transliterated_f:
+            comparison_results = _compare_sources(original_f, transliterated_f).result()
 
-        comparison_results = compare_texts(original_text, transliterated_text)
+        if "error" in comparison_results:
+            print(f"Error comparing files: {comparison_results['error']}")
+            return False
 
         with open(log_file, 'w', encoding='utf-8') as f:
             f.write(f"Transliteration Comparison Log - {datetime.datetime.now()}\n")
@@ -149,6 +503,7 @@ def compare_files(original_file, transliterated_file, log_file):
             f.write(f"Transliterated length: {comparison_results['transliterated_length']} characters\n")
             f.write(f"Character difference: {comparison_results['character_difference']} characters\n")
             f.write(f"Similarity ratio: {comparison_results['similarity_ratio']:.4f}\n")
+            f.write(f"Differing lines: {comparison_results['differing_lines']} of {comparison_results['lines']}\n")
             if 'character_set_similarity' in comparison_results:
                 f.write(f"Character set similarity: {comparison_results['character_set_similarity']:.4f}\n")
 
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import csv
+import difflib
+import unicodedata
+from collections import Counter
+
+# Distinct confusions counted exactly before the least frequent ones are pruned
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Letters IAST writes with two characters
+IAST_DIGRAPHS = {
+    "kh", "gh", "ch", "jh", "ṭh", "ḍh", "th", "dh", "ph", "bh", "ai", "au",
+}
+
+COLUMNS = ["kind", "level", "original", "round_trip", "count", "max_undercount", "differing_lines", "example_line"]
+
+
+def tokenize_iast(text):
+    """
+    Split IAST text into letters, keeping digraphs such as kh or ai and combining marks together
+
+    The text is brought to NFC first, so letters written with decomposed diacritics, such
+    as t followed by a combining dot below, are found as well.
+
+    Returns:
+        List of letters, which joined give back the NFC form of text
+    """
+    text = unicodedata.normalize("NFC", text)
+    tokens = []
+    i = 0
+    while i < len(text):
+        end = i + 2 if text[i:i + 2] in IAST_DIGRAPHS else i + 1
+        while end < len(text) and unicodedata.combining(text[end]):
+            end += 1
+        tokens.append(text[i:end])
+        i = end
+    return tokens
+
+
+def _bigrams(letters):
+    return [a + b for a, b in zip(letters, letters[1:])]
+
+
+def _edit_kind(tag):
+    return {"replace": "substitution", "insert": "insertion", "delete": "deletion"}[tag]
+
+
+class ConfusionCounter:
+    """
+    Counts of the substitutions, insertions and deletions of round trips
+
+    Edits are counted at the character level, from the opcodes of the line
+    alignment, and at the level of IAST letters, from an alignment of the
+    letters of both lines. At the bigram level, every edited stretch of
+    letters is widened by one letter on each side and the letter bigrams of
+    both sides are aligned, which shows the contexts edits occur in.
+    Substitutions of as many characters, letters or bigrams as they replace
+    are counted per pair, other edits per edited segment.
+
+    Counts are exact up to max_entries distinct edits. Beyond that, the least
+    frequent edits are pruned as in the Misra-Gries frequent items summary:
+    every count is lowered by the same amount, and that total is reported as the
+    maximum undercount of every edit. Frequent edits are always kept. Counters of several
+    workers or texts can be combined with merge().
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self.examples = {}
+        self.lines = 0
+        # Amount any count may be below its true value after pruning
+        self.undercount = 0
+
+    def _count(self, key, weight, line_id):
+        if key not in self.counts:
+            self.examples[key] = line_id
+        self.counts[key] += weight
+
+    def _count_edits(self, original, converted, opcodes, level, weight, line_id):
+        """Count the edits of one alignment, given as sequences of characters or letters"""
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                continue
+            kind = _edit_kind(tag)
+            if tag == "replace" and i2 - i1 == j2 - j1:
+                for a, b in zip(original[i1:i2], converted[j1:j2]):
+                    self._count((kind, level, a, b), weight, line_id)
+            else:
+                self._count((kind, level, "".join(original[i1:i2]), "".join(converted[j1:j2])), weight, line_id)
+
+    def add(self, original, converted, opcodes, line_id=None, weight=1):
+        """
+        Count the edits of a differing line
+
+        Args:
+            original: Original line
+            converted: Round-trip line
+            opcodes: Character alignment opcodes of original and converted
+            line_id: Position of the line in its input, kept as an example for every edit
+            weight: Number of times the line occurs
+        """
+        self.lines += weight
+        self._count_edits(original, converted, opcodes, "char", weight, line_id)
+        original_letters = tokenize_iast(original)
+        converted_letters = tokenize_iast(converted)
+        letter_opcodes = difflib.SequenceMatcher(None, original_letters, converted_letters).get_opcodes()
+        self._count_edits(original_letters, converted_letters, letter_opcodes, "letter", weight, line_id)
+        for tag, i1, i2, j1, j2 in letter_opcodes:
+            if tag == "equal":
+                continue
+            original_bigrams = _bigrams(original_letters[max(i1 - 1, 0):i2 + 1])
+            converted_bigrams = _bigrams(converted_letters[max(j1 - 1, 0):j2 + 1])
+            bigram_opcodes = difflib.SequenceMatcher(None, original_bigrams, converted_bigrams).get_opcodes()
+            self._count_edits(original_bigrams, converted_bigrams, bigram_opcodes, "bigram", weight, line_id)
+
+        if len(self.counts) > 2 * self.max_entries:
+            self._prune()
+
+    def _prune(self):
+        """Keep the max_entries most frequent edits, lowering every count by the next one"""
+        if len(self.counts) <= self.max_entries:
+            return
+        ranked = self.counts.most_common()
+        threshold = ranked[self.max_entries][1]
+        self.undercount += threshold
+        self.counts = Counter({key: count - threshold for key, count in ranked[:self.max_entries]
+                               if count > threshold})
+        self.examples = {key: self.examples[key] for key in self.counts}
+
+    def merge(self, other):
+        """Add the counts of another counter, pruning back to max_entries"""
+        self.lines += other.lines
+        for key, count in other.counts.items():
+            if key not in self.counts:
+                self.examples[key] = other.examples.get(key)
+            self.counts[key] += count
+        self.undercount += other.undercount
+        self._prune()
+        return self
+
+    def rows(self):
+        """
+        Return the counted edits, most frequent first
+
+        Returns:
+            List of dictionaries with the COLUMNS fields, the undercount and the number of
+            differing lines repeated on every row
+        """
+        rows = []
+        for (kind, level, original, round_trip), count in self.counts.most_common():
+            rows.append({
+                "kind": kind,
+                "level": level,
+                "original": original,
+                "round_trip": round_trip,
+                "count": count,
+                "max_undercount": self.undercount,
+                "differing_lines": self.lines,
+                "example_line": self.examples[(kind, level, original, round_trip)],
+            })
+        return rows
+
+    def format_top(self, count=10, level="letter"):
+        """Format the most frequent edits of one level as one line each for printing"""
+        lines = []
+        for row in self.rows():
+            if row["level"] != level:
+                continue
+            lines.append(f"  {row['kind']:<12} {row['original'] or '∅':>6} -> {row['round_trip'] or '∅':<6} "
+                         f"{row['count']:>10}")
+            if len(lines) == count:
+                break
+        return "\n".join(lines)
+
+    def write_csv(self, path):
+        """Write the table of edits, most frequent first, as CSV, with the number of differing lines on every row"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+        return path
+
+    @classmethod
+    def read_csv(cls, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """Load a table written by write_csv, so counters of separate runs can be merged"""
+        counter = cls(max_entries)
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                key = (row["kind"], row["level"], row["original"], row["round_trip"])
+                counter.counts[key] = int(row["count"])
+                example = row["example_line"]
+                counter.examples[key] = int(example) if example.isdigit() else example or None
+                counter.undercount = max(counter.undercount, int(row["max_undercount"]))
+                # Tables written before the column was added
+                counter.lines = max(counter.lines, int(row.get("differing_lines") or 0))
+        return counter
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 
+import hashlib
+
+
 def deduplicate_file(input_file_path, output_file_path=None):
     """
     Remove duplicate entries from a text file and create a new.txt deduplicated file.
@@ -65,6 +68,69 @@ def deduplicate_file(input_file_path, output_file_path=None):
         return False, str(e), None
 
 
+def write_distinct_lines(input_file_path, output_file_path):
+    """
+    Stream a text file and write every distinct non-empty line once, in order of first occurrence.
+
+    Lines are compared by a hash of their content, so memory grows with the number
+    of distinct lines but not with their length.
+
+    Args:
+        input_file_path (str): Path to the input text file
+        output_file_path (str): Path to save the distinct lines
+
+    Returns:
+        tuple: (counts, first_positions) with, for every distinct line in output order,
+               how often it occurs and the 0-based line number of its first occurrence
+    """
+    # Hash of each distinct line -> its position in the output file
+    distinct = {}
+    counts = []
+    first_positions = []
+
+    with open(input_file_path, 'r', encoding='utf-8') as infile, \
+            open(output_file_path, 'w', encoding='utf-8') as outfile:
+        for line_num, line in enumerate(infile):
+            # Empty lines are never evaluated
+            if not line.strip():
+                continue
+
+            if not line.endswith('\n'):
+                line += '\n'
+            key = hashlib.blake2b(line.encode('utf-8'), digest_size=16).digest()
+
+            index = distinct.get(key)
+            if index is None:
+                distinct[key] = len(counts)
+                counts.append(1)
+                first_positions.append(line_num)
+                outfile.write(line)
+            else:
+                counts[index] += 1
+
+    return counts, first_positions
+
+
+def dedup_summary(counts, seconds):
+    """
+    Summarize how much a run over the distinct lines saved compared to a full run.
+
+    Args:
+        counts (list): Number of occurrences of every distinct line
+        seconds (float): Time spent on the distinct lines
+
+    Returns:
+        dict: Distinct lines, share of lines skipped and the estimated seconds saved
+    """
+    total_lines = sum(counts)
+    distinct_lines = len(counts)
+    return {
+        'Distinct Lines': distinct_lines,
+        'Dedup Ratio (%)': (1 - distinct_lines / total_lines) * 100 if total_lines else 0,
+        'Est. Time Saved (s)': seconds * (total_lines / distinct_lines - 1) if distinct_lines else 0,
+    }
+
+
 def main():
     # Get file paths from user
     input_file = input("Enter the path to your IAST dataset file: ")
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+
+import os
+import glob
+import time
+import random
+import argparse
+import unicodedata
+
+# IAST letters in the order used by the tables below
+VOWEL_KEYS = ["a", "ā", "i", "ī", "u", "ū", "ṛ", "ṝ", "ḷ", "ḹ", "e", "ai", "o", "au"]
+CONSONANT_KEYS = ["k", "kh", "g", "gh", "ṅ",
+                  "c", "ch", "j", "jh", "ñ",
+                  "ṭ", "ṭh", "ḍ", "ḍh", "ṇ",
+                  "t", "th", "d", "dh", "n",
+                  "p", "ph", "b", "bh", "m",
+                  "y", "r", "l", "ḻ", "v",
+                  "ś", "ṣ", "s", "h"]
+DIGIT_KEYS = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+
+
+def _devanagari_table(offset=0):
+    """Code points of the Devanagari block, shifted by offset for scripts sharing its layout"""
+    def chars(code_points):
+        return [chr(cp + offset) if cp is not None else "" for cp in code_points]
+
+    return {
+        "vowels": chars([0x0905, 0x0906, 0x0907, 0x0908, 0x0909, 0x090A, 0x090B, 0x0960, 0x090C, 0x0961,
+                         0x090F, 0x0910, 0x0913, 0x0914]),
+        "vowel_signs": chars([None, 0x093E, 0x093F, 0x0940, 0x0941, 0x0942, 0x0943, 0x0944, 0x0962, 0x0963,
+                              0x0947, 0x0948, 0x094B, 0x094C]),
+        "consonants": chars([0x0915, 0x0916, 0x0917, 0x0918, 0x0919,
+                             0x091A, 0x091B, 0x091C, 0x091D, 0x091E,
+                             0x091F, 0x0920, 0x0921, 0x0922, 0x0923,
+                             0x0924, 0x0925, 0x0926, 0x0927, 0x0928,
+                             0x092A, 0x092B, 0x092C, 0x092D, 0x092E,
+                             0x092F, 0x0930, 0x0932, 0x0933, 0x0935,
+                             0x0936, 0x0937, 0x0938, 0x0939]),
+        "digits": chars(range(0x0966, 0x0970)),
+        "virama": chr(0x094D + offset),
+        "anusvara": chr(0x0902 + offset),
+        "visarga": chr(0x0903 + offset),
+        "candrabindu": chr(0x0901 + offset),
+        "avagraha": chr(0x093D + offset),
+        # Telugu has no dandas of its own and uses the Devanagari ones
+        "danda": "।",
+        "double_danda": "॥",
+    }
+
+
+def _sharada_table():
+    """Code points of the Sharada block"""
+    def chars(code_points):
+        return [chr(cp) if cp is not None else "" for cp in code_points]
+
+    return {
+        "vowels": chars(range(0x11183, 0x11191)),
+        "vowel_signs": chars([None] + list(range(0x111B3, 0x111C0))),
+        "consonants": chars(range(0x11191, 0x111B3)),
+        "digits": chars(range(0x111D0, 0x111DA)),
+        "virama": "\U000111C0",
+        "anusvara": "\U00011181",
+        "visarga": "\U00011182",
+        "candrabindu": "\U00011180",
+        "avagraha": "\U000111C1",
+        "danda": "\U000111C5",
+        "double_danda": "\U000111C6",
+    }
+
+
+SCRIPT_TABLES = {
+    "Devanagari": _devanagari_table(),
+    "Telugu": _devanagari_table(0x0300),
+    "Sharada": _sharada_table(),
+}
+
+# Token kinds stored in the tries
+CONSONANT = 0
+VOWEL = 1
+VOWEL_SIGN = 2
+VIRAMA = 3
+OTHER = 4
+
+
+def _add_to_trie(trie, key, value):
+    """Insert key into a nested-dict trie, the value is stored under the None key"""
+    node = trie
+    for char in key:
+        node = node.setdefault(char, {})
+    node[None] = value
+
+
+def _longest_match(trie, text, start):
+    """Return (value, end) for the longest key of the trie found at text[start:], or (None, start)"""
+    node = trie
+    value = None
+    end = start
+    i = start
+    length = len(text)
+    while i < length:
+        node = node.get(text[i])
+        if node is None:
+            break
+        i += 1
+        if None in node:
+            value = node[None]
+            end = i
+    return value, end
+
+
+def _other_symbols(table):
+    """IAST marks and punctuation that map to a single script character"""
+    symbols = {
+        "ṃ": table["anusvara"],
+        "ṁ": table["anusvara"],
+        "ḥ": table["visarga"],
+        "m̐": table["candrabindu"],
+        "'": table["avagraha"],
+        "|": table["danda"],
+        "||": table["double_danda"],
+    }
+    symbols.update(zip(DIGIT_KEYS, table["digits"]))
+    return symbols
+
+
+def compile_forward_trie(script):
+    """Compile the IAST -> script trie"""
+    table = SCRIPT_TABLES[script]
+    entries = []
+    for key, letter, sign in zip(VOWEL_KEYS, table["vowels"], table["vowel_signs"]):
+        entries.append((key, (VOWEL, letter, sign)))
+    for key, letter in zip(CONSONANT_KEYS, table["consonants"]):
+        entries.append((key, (CONSONANT, letter, None)))
+    for key, symbol in _other_symbols(table).items():
+        entries.append((key, (OTHER, symbol, None)))
+
+    trie = {}
+    for key, value in entries:
+        _add_to_trie(trie, key, value)
+        # Accept decomposed input as well, e.g. "a" + COMBINING MACRON for "ā"
+        decomposed = unicodedata.normalize("NFD", key)
+        if decomposed != key:
+            _add_to_trie(trie, decomposed, value)
+    return trie
+
+
+def compile_reverse_trie(script):
+    """Compile the script -> IAST trie"""
+    table = SCRIPT_TABLES[script]
+    trie = {}
+    for key, letter, sign in zip(VOWEL_KEYS, table["vowels"], table["vowel_signs"]):
+        _add_to_trie(trie, letter, (VOWEL, key, None))
+        if sign:
+            _add_to_trie(trie, sign, (VOWEL_SIGN, key, None))
+    for key, letter in zip(CONSONANT_KEYS, table["consonants"]):
+        _add_to_trie(trie, letter, (CONSONANT, key, None))
+    _add_to_trie(trie, table["virama"], (VIRAMA, "", None))
+
+    # Several IAST spellings map to the same mark, the first one is the standard one
+    for key, symbol in _other_symbols(table).items():
+        if not _longest_match(trie, symbol, 0)[0]:
+            _add_to_trie(trie, symbol, (OTHER, key, None))
+    return trie
+
+
+def transliterate_from_iast(text, trie, virama):
+    """Transliterate IAST text to a Brahmic script in a single pass"""
+    output = []
+    pending_consonant = False
+    i = 0
+    length = len(text)
+    while i < length:
+        value, end = _longest_match(trie, text, i)
+        if value is None:
+            # Characters without a mapping (spaces, punctuation) end the cluster
+            if pending_consonant:
+                output.append(virama)
+                pending_consonant = False
+            output.append(text[i])
+            i += 1
+            continue
+
+        kind, letter, sign = value
+        if kind == CONSONANT:
+            if pending_consonant:
+                output.append(virama)
+            output.append(letter)
+            pending_consonant = True
+        elif kind == VOWEL:
+            if pending_consonant:
+                output.append(sign)
+                pending_consonant = False
+            else:
+                output.append(letter)
+        else:
+            if pending_consonant:
+                output.append(virama)
+                pending_consonant = False
+            output.append(letter)
+        i = end
+
+    if pending_consonant:
+        output.append(virama)
+    return "".join(output)
+
+
+def transliterate_to_iast(text, trie):
+    """Transliterate Brahmic script text to IAST in a single pass"""
+    output = []
+    inherent_vowel = False
+    i = 0
+    length = len(text)
+    while i < length:
+        value, end = _longest_match(trie, text, i)
+        kind = value[0] if value is not None else None
+
+        if inherent_vowel:
+            # A consonant keeps its inherent "a" unless a vowel sign or virama follows
+            if kind == VOWEL_SIGN:
+                output.append(value[1])
+                inherent_vowel = False
+                i = end
+                continue
+            if kind == VIRAMA:
+                inherent_vowel = False
+                i = end
+                continue
+            output.append("a")
+            inherent_vowel = False
+
+        if value is None:
+            output.append(text[i])
+            i += 1
+            continue
+
+        if kind == CONSONANT:
+            inherent_vowel = True
+        if kind != VIRAMA:
+            output.append(value[1])
+        i = end
+
+    if inherent_vowel:
+        output.append("a")
+    return "".join(output)
+
+
+class FastTransliterator:
+    """Transliterates between IAST and one Brahmic script with compiled longest-match tries"""
+
+    def __init__(self, source_script, target_script):
+        if source_script == "IAST" and target_script in SCRIPT_TABLES:
+            self.trie = compile_forward_trie(target_script)
+            self.virama = SCRIPT_TABLES[target_script]["virama"]
+            self.to_iast = False
+        elif target_script == "IAST" and source_script in SCRIPT_TABLES:
+            self.trie = compile_reverse_trie(source_script)
+            self.virama = None
+            self.to_iast = True
+        else:
+            raise ValueError(f"Unsupported script pair for fast transliteration: {source_script} -> {target_script}")
+
+    def __call__(self, text):
+        if self.to_iast:
+            return transliterate_to_iast(text, self.trie)
+        return transliterate_from_iast(text, self.trie, self.virama)
+
+
+def is_supported(source_script, target_script):
+    """Check whether the fast engine handles a script pair"""
+    return (source_script == "IAST" and target_script in SCRIPT_TABLES) or \
+        (target_script == "IAST" and source_script in SCRIPT_TABLES)
+
+
+def get_supported_scripts():
+    """Return the scripts the fast engine can transliterate IAST to and from"""
+    return ["IAST"] + sorted(SCRIPT_TABLES)
+
+
+def sample_corpus_lines(corpus_dir, lines_per_text=50, seed=42):
+    """Draw a seeded sample of non-empty lines from every text of a corpus directory"""
+    rng = random.Random(seed)
+    sample = []
+    for file_path in sorted(glob.glob(os.path.join(corpus_dir, "*.txt"))):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        sample.extend(rng.sample(lines, min(lines_per_text, len(lines))))
+    return sample
+
+
+def validate_against_reference(lines, script, reference_system="aksharamukha", max_examples=10):
+    """
+    Compare fast engine output with a reference system in both directions
+
+    Args:
+        lines: IAST lines to check
+        script: Brahmic script to transliterate to and from
+        reference_system: System whose output is treated as correct
+        max_examples: Number of mismatching lines to keep
+
+    Returns:
+        Dictionary with agreement counts and example mismatches
+    """
+    from transliterator import get_engine
+
+    reference_forward = get_engine(reference_system, "IAST", script)
+    reference_reverse = get_engine(reference_system, script, "IAST")
+    fast_forward = FastTransliterator("IAST", script)
+    fast_reverse = FastTransliterator(script, "IAST")
+
+    results = {
+        "script": script,
+        "reference": reference_system,
+        "lines": len(lines),
+        "forward_matches": 0,
+        "reverse_matches": 0,
+        "examples": [],
+    }
+    for line in lines:
+        expected_script = reference_forward(line)
+        fast_script = fast_forward(line)
+        if fast_script == expected_script:
+            results["forward_matches"] += 1
+        elif len(results["examples"]) < max_examples:
+            results["examples"].append(("IAST -> " + script, line, expected_script, fast_script))
+
+        expected_iast = reference_reverse(expected_script)
+        fast_iast = fast_reverse(expected_script)
+        if fast_iast == expected_iast:
+            results["reverse_matches"] += 1
+        elif len(results["examples"]) < max_examples:
+            results["examples"].append((script + " -> IAST", expected_script, expected_iast, fast_iast))
+
+    return results
+
+
+def benchmark_systems(lines, script, systems):
+    """Time a full IAST -> script -> IAST pass over the lines for each system"""
+    from transliterator import get_engine
+
+    timings = {}
+    for system in systems:
+        forward = get_engine(system, "IAST", script)
+        reverse = get_engine(system, script, "IAST")
+        if forward is None or reverse is None:
+            continue
+        start_time = time.perf_counter()
+        for line in lines:
+            reverse(forward(line))
+        elapsed_time = time.perf_counter() - start_time
+        timings[system] = {
+            "seconds": elapsed_time,
+            "lines_per_sec": len(lines) / elapsed_time if elapsed_time > 0 else 0,
+        }
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and benchmark the fast IAST transliteration engine")
+    parser.add_argument("--corpus-dir", default="data/raw/FinalCorpus",
+                        help="Directory with IAST source texts")
+    parser.add_argument("--scripts", nargs="+", default=sorted(SCRIPT_TABLES),
+                        choices=sorted(SCRIPT_TABLES),
+                        help="Scripts to validate")
+    parser.add_argument("--lines-per-text", type=int, default=50,
+                        help="Number of lines sampled from every text")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed for sampling")
+    parser.add_argument("--no-benchmark", action="store_true",
+                        help="Only validate, do not time the systems")
+
+    args = parser.parse_args()
+
+    from transliterator import get_available_systems
+
+    lines = sample_corpus_lines(args.corpus_dir, args.lines_per_text, args.seed)
+    print(f"Sampled {len(lines)} lines from {args.corpus_dir}")
+
+    for script in args.scripts:
+        results = validate_against_reference(lines, script)
+        print(f"\n=== {script} ===")
+        print(f"IAST -> {script} agreement with {results['reference']}: "
+              f"{results['forward_matches']}/{results['lines']} "
+              f"({results['forward_matches'] / results['lines'] * 100 if results['lines'] else 0:.2f}%)")
+        print(f"{script} -> IAST agreement with {results['reference']}: "
+              f"{results['reverse_matches']}/{results['lines']} "
+              f"({results['reverse_matches'] / results['lines'] * 100 if results['lines'] else 0:.2f}%)")
+        for direction, source, expected, actual in results["examples"]:
+            print(f"  [{direction}] {source}")
+            print(f"    expected: {expected}")
+            print(f"    fast    : {actual}")
+
+        if not args.no_benchmark:
+            timings = benchmark_systems(lines, script, get_available_systems())
+            for system, timing in sorted(timings.items(), key=lambda item: item[1]["seconds"]):
+                print(f"  {system:<22} {timing['seconds']:.3f}s ({timing['lines_per_sec']:.1f} lines/sec)")
+
+
+if __name__ == "__main__":
+    main()
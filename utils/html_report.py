@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+
+import html
+from pathlib import Path
+from typing import List
+
+from metrics import LineAlignment
+
+# Number of diffs written to one page of a report
+DEFAULT_PAGE_SIZE = 500
+
+# Compact style used by the round-trip test logs
+ROUND_TRIP_STYLE = """
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .diff-row { display: flex; margin-bottom: 20px; border: 1px solid #ddd; border-radius: 5px; overflow: hidden; }
+        .diff-cell { flex: 1; padding: 10px; }
+        .diff-label { font-weight: bold; margin-bottom: 5px; background: #f0f0f0; padding: 5px; }
+        .diff-content { padding: 10px; }
+        .equal { color: black; }
+        .delete { color: red; background-color: #ffeeee; }
+        .insert { color: green; background-color: #eeffee; }
+        .script-text { font-size: 1.2em; }
+        h1 { color: #333; }
+"""
+
+# Full style used by the test_transliterators reports
+REPORT_STYLE = """
+        :root {
+            --primary-color: #2563eb;
+            --secondary-color: #f3f4f6;
+            --success-color: #10b981;
+            --danger-color: #ef4444;
+            --warning-color: #f59e0b;
+            --text-dark: #1f2937;
+            --text-light: #6b7280;
+            --border-color: #e5e7eb;
+        }
+
+        * {
+            box-sizing: border-box;
+            margin: 0;
+            padding: 0;
+        }
+
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif;
+            line-height: 1.6;
+            color: var(--text-dark);
+            background-color: #f9fafb;
+            padding: 2rem;
+        }
+
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 1.5rem;
+            background-color: white;
+            border-radius: 0.5rem;
+            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+        }
+
+        h1, h2, h3 {
+            color: var(--primary-color);
+            margin-bottom: 1rem;
+        }
+
+        h1 {
+            font-size: 1.875rem;
+            border-bottom: 2px solid var(--border-color);
+            padding-bottom: 0.75rem;
+            margin-bottom: 1.5rem;
+        }
+
+        h2 {
+            font-size: 1.5rem;
+            margin-top: 2rem;
+            border-bottom: 1px solid var(--border-color);
+            padding-bottom: 0.5rem;
+        }
+
+        h3 {
+            font-size: 1.25rem;
+            margin-top: 1.5rem;
+        }
+
+        p {
+            margin-bottom: 1rem;
+        }
+
+        .summary {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 1rem;
+            margin-bottom: 2rem;
+        }
+
+        .stat-card {
+            flex: 1;
+            min-width: 200px;
+            padding: 1rem;
+            background-color: white;
+            border-radius: 0.5rem;
+            box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06);
+            border-left: 4px solid var(--primary-color);
+        }
+
+        .stat-card.success {
+            border-left-color: var(--success-color);
+        }
+
+        .stat-card.warning {
+            border-left-color: var(--warning-color);
+        }
+
+        .stat-card.danger {
+            border-left-color: var(--danger-color);
+        }
+
+        .stat-value {
+            font-size: 1.5rem;
+            font-weight: bold;
+            margin-bottom: 0.25rem;
+        }
+
+        .stat-label {
+            color: var(--text-light);
+            font-size: 0.875rem;
+        }
+
+        .diff-container {
+            margin-bottom: 2rem;
+            border: 1px solid var(--border-color);
+            border-radius: 0.5rem;
+            overflow: hidden;
+        }
+
+        .diff-row {
+            display: flex;
+            flex-wrap: wrap;
+            border-bottom: 1px solid var(--border-color);
+            background-color: white;
+        }
+
+        .diff-row:last-child {
+            border-bottom: none;
+        }
+
+        .diff-cell {
+            flex: 1;
+            min-width: 250px;
+            padding: 1rem;
+            border-right: 1px solid var(--border-color);
+        }
+
+        .diff-cell:last-child {
+            border-right: none;
+        }
+
+        .diff-label {
+            font-weight: bold;
+            margin-bottom: 0.5rem;
+            color: var(--text-light);
+            font-size: 0.875rem;
+        }
+
+        .diff-content {
+            font-family: 'Courier New', monospace;
+            white-space: pre-wrap;
+            word-break: break-word;
+            padding: 0.75rem;
+            background-color: #f9fafb;
+            border-radius: 0.25rem;
+            font-size: 0.875rem;
+            overflow-x: auto;
+        }
+
+        .script-text {
+            font-size: 1.25rem;
+            font-family: Arial, sans-serif;
+        }
+
+        /* Highlighting for diffs */
+        .equal {
+            color: var(--text-dark);
+        }
+
+        .delete {
+            background-color: #fee2e2;
+            color: var(--danger-color);
+            text-decoration: line-through;
+            padding: 0 2px;
+            border-radius: 2px;
+        }
+
+        .insert {
+            background-color: #d1fae5;
+            color: var(--success-color);
+            padding: 0 2px;
+            border-radius: 2px;
+        }
+
+        .empty-result {
+            padding: 2rem;
+            text-align: center;
+            color: var(--text-light);
+            font-style: italic;
+        }
+
+        .navigation {
+            display: flex;
+            justify-content: space-between;
+            margin-top: 2rem;
+            padding-top: 1rem;
+            border-top: 1px solid var(--border-color);
+        }
+
+        .filters {
+            margin-bottom: 1.5rem;
+            padding: 1rem;
+            background-color: var(--secondary-color);
+            border-radius: 0.5rem;
+        }
+
+        /* Responsive adjustments */
+        @media (max-width: 768px) {
+            .diff-row {
+                flex-direction: column;
+            }
+
+            .diff-cell {
+                border-right: none;
+                border-bottom: 1px solid var(--border-color);
+            }
+
+            .diff-cell:last-child {
+                border-bottom: none;
+            }
+
+            .stat-card {
+                min-width: 100%;
+            }
+        }
+"""
+
+# Summary table and page navigation, added to either style
+INDEX_STYLE = """
+        .metrics { border-collapse: collapse; margin: 1rem 0; }
+        .metrics th, .metrics td { border: 1px solid #ddd; padding: 6px 12px; text-align: left; }
+        .metrics th { background: #f0f0f0; }
+        .pages li { margin: 4px 0; }
+        .page-nav { display: flex; gap: 1.5rem; margin: 1rem 0; }
+"""
+
+
+# Generate improved HTML diff
+def generate_html_diff(original: str, converted: str, script_text: str = "", opcodes: List = None) -> str:
+    """Create a properly formatted HTML diff with improved highlighting for changes."""
+    if opcodes is None:
+        opcodes = LineAlignment(original, converted).opcodes
+
+    # Create an HTML fragment for the diff
+    html_output = f"""
+    <div class="diff-row">
+        <div class="diff-cell">
+            <div class="diff-label">Original IAST</div>
+            <div class="diff-content original-text">
+    """
+
+    # Process original text with word-level diff highlighting
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            html_output += f'<span class="equal">{html.escape(original[i1:i2])}</span>'
+        elif tag == 'delete':
+            html_output += f'<span class="delete">{html.escape(original[i1:i2])}</span>'
+        elif tag == 'replace':
+            html_output += f'<span class="delete">{html.escape(original[i1:i2])}</span>'
+        # We ignore 'insert' in the original text
+
+    html_output += """
+            </div>
+        </div>
+    """
+
+    # Only add script text if provided
+    if script_text:
+        html_output += f"""
+        <div class="diff-cell">
+            <div class="diff-label">Script Text</div>
+            <div class="diff-content script-text">
+                {html.escape(script_text)}
+            </div>
+        </div>
+        """
+
+    html_output += f"""
+        <div class="diff-cell">
+            <div class="diff-label">Back-Converted IAST</div>
+            <div class="diff-content converted-text">
+    """
+
+    # Process converted text
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            html_output += f'<span class="equal">{html.escape(converted[j1:j2])}</span>'
+        elif tag == 'insert':
+            html_output += f'<span class="insert">{html.escape(converted[j1:j2])}</span>'
+        elif tag == 'replace':
+            html_output += f'<span class="insert">{html.escape(converted[j1:j2])}</span>'
+        # We ignore 'delete' in the converted text
+
+    html_output += """
+            </div>
+        </div>
+    </div>
+    """
+
+    return html_output
+
+
+def _page_header(title, style):
+    """Start of an HTML page"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>{style}{INDEX_STYLE}    </style>
+</head>
+<body>
+"""
+
+
+class ShardedHTMLReport:
+    """
+    HTML diff report streamed to disk page by page
+
+    Diffs are written to the current page as soon as they are added, and a new
+    page is started every page_size diffs. close() writes a small index page at
+    path with the summary metrics and links to all pages. Only the diff being
+    written is held in memory, however many diffs the report gets.
+    """
+
+    def __init__(self, path, title, page_size=DEFAULT_PAGE_SIZE, style=ROUND_TRIP_STYLE):
+        self.path = Path(path)
+        self.title = title
+        self.page_size = page_size
+        self.style = style
+        self.diff_count = 0
+        self.page_count = 0
+        self._page_file = None
+
+    def page_path(self, number):
+        """Return the path of a page, numbered from 1"""
+        return self.path.with_name(f"{self.path.stem}_page_{number:04d}{self.path.suffix}")
+
+    def _page_links(self, number, has_next):
+        """Navigation links between the pages and the index"""
+        links = [f'<a href="{html.escape(self.path.name)}">Index</a>']
+        if number > 1:
+            links.append(f'<a href="{html.escape(self.page_path(number - 1).name)}">Previous page</a>')
+        if has_next:
+            links.append(f'<a href="{html.escape(self.page_path(number + 1).name)}">Next page</a>')
+        return f'    <div class="page-nav">{" ".join(links)}</div>\n'
+
+    def _start_page(self):
+        """Close the current page and open the next one"""
+        self._finish_page(has_next=True)
+        self.page_count += 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._page_file = open(self.page_path(self.page_count), 'w', encoding='utf-8')
+        self._page_file.write(_page_header(f"{self.title} - page {self.page_count}", self.style))
+        self._page_file.write(f"    <h1>{html.escape(self.title)}</h1>\n")
+        self._page_file.write(f"    <p>Page {self.page_count}, starting at diff {self.diff_count + 1}</p>\n")
+        self._page_file.write(self._page_links(self.page_count, has_next=False))
+
+    def _finish_page(self, has_next):
+        """Write the footer of the current page"""
+        if self._page_file is None:
+            return
+        self._page_file.write(self._page_links(self.page_count, has_next))
+        self._page_file.write("</body>\n</html>\n")
+        self._page_file.close()
+        self._page_file = None
+
+    def add(self, original, converted, script_text="", opcodes=None):
+        """Write one diff to the current page"""
+        if self.diff_count % self.page_size == 0:
+            self._start_page()
+        self._page_file.write(generate_html_diff(original, converted, script_text, opcodes))
+        self.diff_count += 1
+
+    def close(self, summary=None):
+        """
+        Finish the last page and write the index page
+
+        Args:
+            summary: Optional dictionary of metrics shown on the index page
+
+        Returns:
+            Path of the index page, or None if no diffs were added, in which case no report
+            is left at the path
+        """
+        self._finish_page(has_next=False)
+
+        # Drop pages left over from an earlier, longer report at the same path
+        stale_page = self.page_count + 1
+        while self.page_path(stale_page).exists():
+            self.page_path(stale_page).unlink()
+            stale_page += 1
+
+        if not self.diff_count:
+            # An index left by an earlier run would link to the pages just removed
+            if self.path.exists():
+                self.path.unlink()
+            return None
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(_page_header(self.title, self.style))
+            f.write(f"    <h1>{html.escape(self.title)}</h1>\n")
+            if summary:
+                f.write('    <table class="metrics">\n')
+                for name, value in summary.items():
+                    if isinstance(value, float):
+                        value = f"{value:.4f}"
+                    f.write(f"        <tr><th>{html.escape(str(name))}</th><td>{html.escape(str(value))}</td></tr>\n")
+                f.write("    </table>\n")
+            f.write(f"    <p>{self.diff_count} differing lines on {self.page_count} pages "
+                    f"of up to {self.page_size} diffs</p>\n")
+            f.write('    <ul class="pages">\n')
+            for number in range(1, self.page_count + 1):
+                first = (number - 1) * self.page_size + 1
+                last = min(number * self.page_size, self.diff_count)
+                f.write(f'        <li><a href="{html.escape(self.page_path(number).name)}">'
+                        f"Page {number}</a>: diffs {first} to {last}</li>\n")
+            f.write("    </ul>\n</body>\n</html>\n")
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._finish_page(has_next=False)
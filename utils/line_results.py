@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import csv
+import gzip
+import functools
+from pathlib import Path
+
+# Number of lines buffered before they are written out as one Parquet row group
+DEFAULT_ROW_GROUP_SIZE = 50_000
+
+# Columns of the per-line table, in order
+COLUMNS = [
+    "line_id",
+    "source_file",
+    "system",
+    "script",
+    "original_length",
+    "round_trip_length",
+    "exact",
+    "levenshtein",
+    "char_accuracy",
+    "seconds",
+    "count",
+]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pyarrow():
+    """Import pyarrow and its Parquet module if they are installed, returns None otherwise"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _schema(pa):
+    """Arrow schema of the per-line table"""
+    return pa.schema([
+        ("line_id", pa.int64()),
+        ("source_file", pa.string()),
+        ("system", pa.string()),
+        ("script", pa.string()),
+        ("original_length", pa.int32()),
+        ("round_trip_length", pa.int32()),
+        ("exact", pa.bool_()),
+        ("levenshtein", pa.int32()),
+        ("char_accuracy", pa.float64()),
+        ("seconds", pa.float64()),
+        ("count", pa.int32()),
+    ])
+
+
+class LineResultsWriter:
+    """
+    Per-line round-trip results written as a columnar table
+
+    Rows are written as Parquet row groups of row_group_size lines when pyarrow is
+    installed, and to a gzip-compressed CSV file otherwise, so only one row group
+    is ever held in memory. The file name is the given path with a .parquet or
+    .csv.gz suffix.
+    """
+
+    def __init__(self, path, source_file, system, script, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        self.pyarrow = _load_pyarrow()
+        suffix = ".parquet" if self.pyarrow is not None else ".csv.gz"
+        self.path = Path(str(path) + suffix)
+        self.source_file = str(source_file)
+        self.system = system
+        self.script = script
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._columns = {column: [] for column in COLUMNS}
+        if self.pyarrow is not None:
+            self._schema = _schema(self.pyarrow)
+            self._writer = self.pyarrow.parquet.ParquetWriter(str(self.path), self._schema, compression="zstd")
+        else:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(COLUMNS)
+
+    def add(self, line_id, original_length, round_trip_length, exact, levenshtein, matching_chars, seconds,
+            count=1, source_file=None):
+        """
+        Add the results of one line
+
+        Args:
+            line_id: Position of the line in its source file
+            original_length: Number of characters of the original line
+            round_trip_length: Number of characters of the round-trip line
+            exact: Whether the round trip reproduced the line exactly
+            levenshtein: Edit distance between the original and round-trip line
+            matching_chars: Number of characters matched by the alignment
+            seconds: Time spent producing and scoring the line
+            count: Number of times the line occurs in the input, when only distinct lines are scored
+            source_file: Source file of this line, if it differs from the one of the writer
+        """
+        total_chars = max(original_length, round_trip_length)
+        char_accuracy = (matching_chars / total_chars) * 100 if total_chars else 100.0
+        row = (line_id, self.source_file if source_file is None else str(source_file), self.system, self.script,
+               original_length, round_trip_length, bool(exact), levenshtein, char_accuracy, seconds, count)
+        self.rows += 1
+
+        if self.pyarrow is None:
+            self._writer.writerow(row)
+            return
+        for column, value in zip(COLUMNS, row):
+            self._columns[column].append(value)
+        if len(self._columns["line_id"]) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        """Write the buffered rows as one row group"""
+        if not self._columns["line_id"]:
+            return
+        table = self.pyarrow.Table.from_pydict(self._columns, schema=self._schema)
+        self._writer.write_table(table)
+        self._columns = {column: [] for column in COLUMNS}
+
+    def close(self):
+        """Write the remaining rows and close the file, returns its path"""
+        if self._writer is None:
+            return self.path
+        if self.pyarrow is not None:
+            self._flush()
+            self._writer.close()
+        else:
+            self._file.close()
+        self._writer = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_line_results(path):
+    """
+    Load a per-line results file written by LineResultsWriter into a pandas DataFrame
+
+    Args:
+        path: Path of a .parquet or .csv.gz results file
+
+    Returns:
+        DataFrame with one row per line
+    """
+    import pandas as pd
+
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, compression="gzip")
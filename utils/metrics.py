@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+import functools
+import heapq
+import random
+import difflib
+from collections import Counter
+from typing import Optional
+
+# Defaults of DiffSampler: random diffs kept for reports and worst lines kept by edit distance
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_TOP_K = 50
+
+
+@functools.lru_cache(maxsize=None)
+def _load_numpy():
+    """Import NumPy if it is installed, returns None otherwise"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def levenshtein_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Compute the Levenshtein distance between two strings
+
+    The common prefix and suffix are stripped first, then the distance is computed
+    with Myers' bit-parallel algorithm: every column of the DP matrix is one Python
+    int, so memory is linear and each character of b costs a few big-int operations.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Optional cutoff, once the distance is known to exceed it
+            max_distance + 1 is returned instead of the exact distance
+
+    Returns:
+        Edit distance between a and b
+    """
+    if a == b:
+        return 0
+
+    # Strip the common prefix and suffix, they never change the distance
+    prefix = 0
+    shorter = min(len(a), len(b))
+    while prefix < shorter and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shorter - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a = a[prefix:len(a) - suffix]
+    b = b[prefix:len(b) - suffix]
+
+    # Keep the shorter string as the bit vector
+    if len(a) > len(b):
+        a, b = b, a
+    if max_distance is not None and len(b) - len(a) > max_distance:
+        return max_distance + 1
+    if not a:
+        return len(b)
+
+    # Bit i of match_masks[c] is set where a[i] == c
+    match_masks = {}
+    for i, char in enumerate(a):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+
+    all_bits = (1 << len(a)) - 1
+    last_bit = 1 << (len(a) - 1)
+    positive = all_bits
+    negative = 0
+    distance = len(a)
+    remaining = len(b)
+
+    for char in b:
+        match = match_masks.get(char, 0)
+        vertical = match | negative
+        horizontal = (((match & positive) + positive) ^ positive) | match
+        horizontal_positive = negative | (~(horizontal | positive) & all_bits)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+
+        remaining -= 1
+        # The distance can drop by at most one per remaining character of b
+        if max_distance is not None and distance - remaining > max_distance:
+            return max_distance + 1
+
+        horizontal_positive = ((horizontal_positive << 1) | 1) & all_bits
+        horizontal_negative = (horizontal_negative << 1) & all_bits
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & all_bits)
+        negative = horizontal_positive & vertical
+
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+class LineAlignment:
+    """
+    Character alignment of an original line with its round-trip result
+
+    The alignment is computed once and every per-line metric, as well as the
+    opcodes used to render diffs, is derived from it.
+    """
+
+    __slots__ = ("original", "converted", "exact", "opcodes", "matching_chars", "total_chars", "levenshtein")
+
+    def __init__(self, original, converted):
+        self.original = original
+        self.converted = converted
+        self.exact = original == converted
+        self.total_chars = max(len(original), len(converted))
+
+        if self.exact:
+            # Identical lines need no alignment at all
+            self.opcodes = [("equal", 0, len(original), 0, len(converted))] if original else []
+            self.matching_chars = len(original)
+            self.levenshtein = 0
+        else:
+            matcher = difflib.SequenceMatcher(None, original, converted)
+            self.opcodes = matcher.get_opcodes()
+            self.matching_chars = sum(i2 - i1 for tag, i1, i2, _, _ in self.opcodes if tag == "equal")
+            self.levenshtein = levenshtein_distance(original, converted)
+
+
+class MetricsAccumulator:
+    """Running totals of the round-trip metrics over many lines"""
+
+    def __init__(self):
+        self.lines = 0
+        self.exact_matches = 0
+        self.correct_chars = 0
+        self.total_chars = 0
+        self.levenshtein_sum = 0
+
+    def add(self, original, converted):
+        """
+        Align a line pair and add it to the totals
+
+        Returns:
+            LineAlignment of the pair
+        """
+        alignment = LineAlignment(original, converted)
+        self.add_alignment(alignment)
+        return alignment
+
+    def add_alignment(self, alignment, weight=1):
+        """Add an already computed alignment to the totals, counted weight times"""
+        self.lines += weight
+        if alignment.exact:
+            self.exact_matches += weight
+        self.correct_chars += alignment.matching_chars * weight
+        self.total_chars += alignment.total_chars * weight
+        self.levenshtein_sum += alignment.levenshtein * weight
+
+    def result(self, script, system):
+        """
+        Summarize the totals
+
+        Returns:
+            Dictionary with the script, system, line count and averaged metrics
+        """
+        return {
+            "Script": script,
+            "System": system,
+            "Lines": self.lines,
+            "Exact Matches (%)": (self.exact_matches / self.lines) * 100 if self.lines else 0,
+            "Char Accuracy (%)": (self.correct_chars / self.total_chars) * 100 if self.total_chars else 0,
+            "Avg. Levenshtein": self.levenshtein_sum / self.lines if self.lines else 0,
+        }
+
+    def totals(self):
+        """
+        Return the raw totals, which unlike the averaged metrics can be added up over several inputs
+
+        Returns:
+            Dictionary of exact lines, matching characters, characters and Levenshtein distance sum
+        """
+        return {
+            "Exact Lines": self.exact_matches,
+            "Matching Chars": self.correct_chars,
+            "Chars": self.total_chars,
+            "Levenshtein Sum": self.levenshtein_sum,
+        }
+
+    def add_totals(self, lines, totals):
+        """Add the totals() of another accumulator covering the given number of lines"""
+        self.lines += lines
+        self.exact_matches += totals["Exact Lines"]
+        self.correct_chars += totals["Matching Chars"]
+        self.total_chars += totals["Chars"]
+        self.levenshtein_sum += totals["Levenshtein Sum"]
+
+    def add_batch(self, batch):
+        """Add the totals of a compute_batch_metrics result"""
+        self.add_totals(batch["lines"], batch)
+
+
+def compute_batch_metrics(pairs, weights=None):
+    """
+    Compute round-trip metrics for many line pairs at once
+
+    Line lengths, the exact match mask and the totals are computed in bulk with
+    NumPy when it is installed. Only the differing pairs are aligned, one at a
+    time, for their matching characters, opcodes and Levenshtein distance: the
+    bit-parallel levenshtein_distance beats a vectorized DP on round-trip lines.
+
+    Args:
+        pairs: Sequence of (original, converted) line pairs
+        weights: Optional number of times every pair occurs, the totals are weighted by it
+
+    Returns:
+        Dictionary with the per-line sequences exact, line_chars, matching_chars and
+        levenshtein, NumPy arrays when NumPy is installed, the LineAlignment of every
+        pair as alignments, the number of lines and the totals in the format of
+        MetricsAccumulator.totals(), so it can be passed to MetricsAccumulator.add_batch
+    """
+    np = _load_numpy()
+    originals = [original for original, _ in pairs]
+    converted = [converted for _, converted in pairs]
+    if weights is None:
+        weights = [1] * len(pairs)
+
+    if np is not None:
+        original_lengths = np.fromiter(map(len, originals), dtype=np.int64, count=len(pairs))
+        converted_lengths = np.fromiter(map(len, converted), dtype=np.int64, count=len(pairs))
+        # Strings of different lengths are never compared
+        exact = original_lengths == converted_lengths
+        exact[exact] = [originals[index] == converted[index] for index in np.flatnonzero(exact).tolist()]
+        line_chars = np.maximum(original_lengths, converted_lengths)
+        matching_chars = original_lengths.copy()
+        levenshtein = np.zeros(len(pairs), dtype=np.int64)
+        different = np.flatnonzero(~exact).tolist()
+    else:
+        exact = [a == b for a, b in zip(originals, converted)]
+        line_chars = [max(len(a), len(b)) for a, b in zip(originals, converted)]
+        matching_chars = [len(a) for a in originals]
+        levenshtein = [0] * len(pairs)
+        different = [index for index, same in enumerate(exact) if not same]
+
+    alignments = [LineAlignment(a, b) for a, b in zip(originals, converted)]
+    for index in different:
+        matching_chars[index] = alignments[index].matching_chars
+        levenshtein[index] = alignments[index].levenshtein
+
+    if np is not None:
+        weights = np.asarray(weights, dtype=np.int64)
+        lines = int(weights.sum())
+        totals = [int(np.dot(values, weights)) for values in (exact, matching_chars, line_chars, levenshtein)]
+    else:
+        lines = sum(weights)
+        totals = [sum(value * weight for value, weight in zip(values, weights))
+                  for values in (exact, matching_chars, line_chars, levenshtein)]
+
+    return {
+        "exact": exact,
+        "line_chars": line_chars,
+        "matching_chars": matching_chars,
+        "levenshtein": levenshtein,
+        "alignments": alignments,
+        "lines": lines,
+        "Exact Lines": totals[0],
+        "Matching Chars": totals[1],
+        "Chars": totals[2],
+        "Levenshtein Sum": totals[3],
+    }
+
+
+def diff_category(opcodes):
+    """
+    Classify a differing line by the kinds of edits in its alignment
+
+    Returns:
+        "substitution", "insertion" or "deletion" when the line has only edits of
+        that kind, "mixed" otherwise
+    """
+    tags = {tag for tag, _, _, _, _ in opcodes if tag != "equal"}
+    if len(tags) != 1:
+        return "mixed"
+    return {"replace": "substitution", "insert": "insertion", "delete": "deletion"}[tags.pop()]
+
+
+class DiffSampler:
+    """
+    Bounded sample of differing lines for reports
+
+    Keeps a uniform reservoir sample of sample_size diffs and the top_k diffs with
+    the largest edit distance, so memory stays flat however many lines differ.
+    The number of differing lines, lines per category and edited characters per
+    edit kind are still counted over every line.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, top_k=DEFAULT_TOP_K, seed=None):
+        self.sample_size = sample_size
+        self.top_k = top_k
+        self.rng = random.Random(seed)
+        self.seen = 0
+        self.distinct = 0
+        self.category_counts = Counter()
+        self.edited_chars = Counter()
+        self._reservoir = []
+        self._worst = []
+
+    def add(self, index, original, converted, script_text, opcodes, distance, weight=1):
+        """
+        Count a differing line and maybe keep it
+
+        Args:
+            index: Position of the line in the input
+            original: Original line
+            converted: Round-trip line
+            script_text: Line in the intermediate script
+            opcodes: Alignment opcodes of original and converted
+            distance: Levenshtein distance of original and converted
+            weight: Number of times the line occurs, counted in the totals but sampled once
+        """
+        self.seen += weight
+        self.distinct += 1
+        self.category_counts[diff_category(opcodes)] += weight
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "replace":
+                self.edited_chars["substituted"] += max(i2 - i1, j2 - j1) * weight
+            elif tag == "delete":
+                self.edited_chars["deleted"] += (i2 - i1) * weight
+            elif tag == "insert":
+                self.edited_chars["inserted"] += (j2 - j1) * weight
+
+        diff = (index, original, converted, script_text, opcodes, distance)
+
+        # Reservoir sampling (algorithm R): every line ends up in the sample with equal probability
+        if len(self._reservoir) < self.sample_size:
+            self._reservoir.append(diff)
+        else:
+            slot = self.rng.randrange(self.distinct)
+            if slot < self.sample_size:
+                self._reservoir[slot] = diff
+
+        # Min-heap of the largest distances, earlier lines win ties
+        if self.top_k:
+            entry = (distance, -index, diff)
+            if len(self._worst) < self.top_k:
+                heapq.heappush(self._worst, entry)
+            elif entry[:2] > self._worst[0][:2]:
+                heapq.heapreplace(self._worst, entry)
+
+    def worst(self):
+        """Return the kept diffs with the largest edit distance, largest first"""
+        return [entry[2] for entry in sorted(self._worst, key=lambda entry: entry[:2], reverse=True)]
+
+    def sample(self):
+        """Return the reservoir sample in input order, without the diffs already in worst()"""
+        worst_indices = {entry[2][0] for entry in self._worst}
+        return sorted((diff for diff in self._reservoir if diff[0] not in worst_indices), key=lambda diff: diff[0])
+
+    def diffs(self):
+        """Return the worst diffs followed by the random sample"""
+        return self.worst() + self.sample()
+
+    def summary(self):
+        """
+        Summarize the counts over all differing lines
+
+        Returns:
+            Dictionary of counts, suitable as extra rows of a report summary
+        """
+        summary = {
+            "Differing lines": self.seen,
+            "Diffs shown (largest edit distance)": len(self._worst),
+            "Diffs shown (random sample)": len(self.sample()),
+        }
+        summary["Lines with substitutions only"] = self.category_counts["substitution"]
+        summary["Lines with insertions only"] = self.category_counts["insertion"]
+        summary["Lines with deletions only"] = self.category_counts["deletion"]
+        summary["Lines with mixed edits"] = self.category_counts["mixed"]
+        for kind in ("substituted", "inserted", "deleted"):
+            summary[f"Characters {kind}"] = self.edited_chars[kind]
+        return summary
+
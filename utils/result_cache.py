@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+import functools
+from pathlib import Path
+
+CACHE_FILENAME = "transliteration_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+# Installed distributions whose version is part of the cache key
+LIBRARY_DISTRIBUTIONS = {
+    "aksharamukha": ["aksharamukha-python", "aksharamukha"],
+    "indic_transliteration": ["indic-transliteration", "indic_transliteration"],
+}
+
+# SQLite limits the number of parameters of a single statement
+_QUERY_CHUNK_SIZE = 500
+
+# Single-line writes are committed together once this many are pending
+_COMMIT_INTERVAL = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def get_library_version(system):
+    """
+    Get a version string for the library behind a transliteration system
+
+    The fast engine has no package version, so a hash of its tables is used instead.
+    """
+    if system == "fast":
+        source_file = Path(__file__).parent / "fast_transliterator.py"
+        return "fast-" + hashlib.sha1(source_file.read_bytes()).hexdigest()[:12]
+
+    from importlib import metadata
+
+    for distribution in LIBRARY_DISTRIBUTIONS.get(system, []):
+        try:
+            return f"{distribution}-{metadata.version(distribution)}"
+        except metadata.PackageNotFoundError:
+            continue
+    return "unknown"
+
+
+def get_cache_path(output_dir):
+    """Return the path of the cache database inside an output directory"""
+    return Path(output_dir) / "cache" / CACHE_FILENAME
+
+
+class TransliterationCache:
+    """
+    Persistent cache of transliterated lines stored in SQLite
+
+    Entries are keyed by a hash of the line content, system, source and target
+    script and the installed library version, so upgrading a backend never
+    serves stale results. Once the cache holds more than max_entries lines,
+    the least recently used ones are dropped when it is closed. With max_entries
+    None nothing is ever dropped.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        os.makedirs(self.path.parent, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key BLOB PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(line, system, source_script, target_script):
+        """Hash a line together with everything that determines its transliteration"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (system, source_script, target_script, get_library_version(system), line):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\x1f")
+        return digest.digest()
+
+    def get_many(self, lines, system, source_script, target_script):
+        """
+        Look up several lines at once
+
+        Returns:
+            List with the cached result for every line, or None where the line is not cached
+        """
+        keys = [self.make_key(line, system, source_script, target_script) for line in lines]
+        found = {}
+        for start in range(0, len(keys), _QUERY_CHUNK_SIZE):
+            chunk = keys[start:start + _QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, result FROM results WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update(rows)
+            if rows:
+                self.connection.execute(
+                    f"UPDATE results SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                    [time.time()] + [key for key, _ in rows]
+                )
+
+        results = [found.get(key) for key in keys]
+        hits = sum(1 for result in results if result is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def get(self, line, system, source_script, target_script):
+        """Look up a single line, returns None if it is not cached"""
+        return self.get_many([line], system, source_script, target_script)[0]
+
+    def put_many(self, lines, results, system, source_script, target_script):
+        """Store the transliterations of several lines"""
+        now = time.time()
+        rows = [(self.make_key(line, system, source_script, target_script), result, now)
+                for line, result in zip(lines, results) if result is not None]
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results (key, result, last_used) VALUES (?, ?, ?)", rows
+        )
+        self._pending_writes += len(rows)
+        if self._pending_writes >= _COMMIT_INTERVAL or len(lines) > 1:
+            self.connection.commit()
+            self._pending_writes = 0
+
+    def put(self, line, result, system, source_script, target_script):
+        """Store the transliteration of a single line"""
+        self.put_many([line], [result], system, source_script, target_script)
+
+    def size(self):
+        """Return the number of cached lines"""
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def enforce_limit(self):
+        """Drop the least recently used entries above max_entries, returns how many were dropped"""
+        if self.max_entries is None:
+            return 0
+        excess = self.size() - self.max_entries
+        if excess <= 0:
+            return 0
+        self.connection.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.connection.commit()
+        return excess
+
+    def vacuum(self):
+        """Enforce the size limit and reclaim unused space in the database file"""
+        dropped = self.enforce_limit()
+        self.connection.execute("VACUUM")
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return dropped
+
+    def stats(self):
+        """Return hit/miss counters of this session"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) * 100 if lookups else 0,
+        }
+
+    def format_stats(self):
+        """Format the hit/miss counters for printing"""
+        stats = self.stats()
+        return f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1f}% hit rate)"
+
+    def close(self):
+        """Enforce the size limit and close the database"""
+        self.connection.commit()
+        self.enforce_limit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the persistent transliteration cache")
+    parser.add_argument("command", choices=["stats", "vacuum", "clear"],
+                        help="stats: show cache size, vacuum: trim and compact, clear: delete all entries")
+    parser.add_argument("output_dir", nargs="?", default="results",
+                        help="Output directory holding the cache (default: results)")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Maximum number of cached lines kept by vacuum")
+
+    args = parser.parse_args()
+
+    cache_path = get_cache_path(args.output_dir)
+    if not cache_path.exists():
+        print(f"No cache found at {cache_path}")
+        return
+
+    # Only vacuum trims the cache, looking at it or clearing it never evicts anything
+    max_entries = args.max_entries if args.command == "vacuum" else None
+    with TransliterationCache(cache_path, max_entries) as cache:
+        if args.command == "stats":
+            print(f"Cache: {cache_path}")
+            print(f"Cached lines: {cache.size()}")
+            print(f"File size: {cache_path.stat().st_size / (1024 * 1024):.2f} MB")
+        elif args.command == "vacuum":
+            dropped = cache.vacuum()
+            print(f"Dropped {dropped} least recently used lines, {cache.size()} lines remain")
+            print(f"File size: {cache_path.stat().st_size / (1024 * 1024):.2f} MB")
+        elif args.command == "clear":
+            cache.connection.execute("DELETE FROM results")
+            cache.connection.commit()
+            cache.connection.execute("VACUUM")
+            print(f"Cleared {cache_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,541 @@
 #!/usr/bin/env python3
 
+import io
 import os
+import sys
+import csv
+import glob
+import json
+import hashlib
 import argparse
+import contextlib
 from pathlib import Path
 import time
-from transliterator import transliterate_file, get_available_systems
-from test_transliterators import evaluate_system, read_file_to_list
+from result_cache import TransliterationCache, get_cache_path, get_library_version, DEFAULT_MAX_ENTRIES
+from transliterator import (transliterate_file, round_trip_stream, get_available_systems, SUPPORTED_SYSTEMS,
+                            TransliterationError)
+from metrics import LineAlignment, MetricsAccumulator, DiffSampler, DEFAULT_TOP_K
+from html_report import ShardedHTMLReport, DEFAULT_PAGE_SIZE
+from line_results import LineResultsWriter
+from stage_timer import StageTimer
+from deduplicate_dataset import write_distinct_lines, dedup_summary
+from sampling import StratifiedSample, StratifiedEstimator, DEFAULT_BLOCK_LINES, DEFAULT_CONFIDENCE
+from confusion import ConfusionCounter
+
+# Results of the texts of a directory run, used to skip texts that did not change
+TEXTS_MANIFEST = "texts_manifest.json"
+
+
+def _not_timed(name, lines=0, chars=0):
+    """Stand-in for StageTimer.measure when no timer is used"""
+    return contextlib.nullcontext()
+
+
+def score_round_trip(triples, script, system, report=None, sampler=None, line_results=None, timer=None,
+                     estimator=None, distinct=None, totals=False, confusion=None, origins=None):
+    """
+    Compute round-trip metrics over (original, script text, round-trip) line triples
+
+    Args:
+        triples: Iterable of (original, script text, round-trip) lines
+        script: Script name for the result
+        system: System name for the result
+        report: Optional ShardedHTMLReport, differing lines are written to it instead of being kept
+        sampler: Optional DiffSampler, differing lines are counted and sampled by it instead
+        line_results: Optional LineResultsWriter receiving the metrics of every scored line
+        timer: Optional StageTimer, scoring, report rendering and per-line writes are timed
+            as the "metrics", "report" and "write" stages
+        estimator: Optional StratifiedEstimator, the metrics of the result are replaced by its
+            corpus-level estimates when the triples are a stratified sample
+        distinct: Optional (counts, first_positions) from write_distinct_lines when the triples are
+            the distinct lines of the input, every line is then weighted by its number of occurrences
+        totals: Also include the raw totals of MetricsAccumulator.totals() in the result
+        confusion: Optional ConfusionCounter receiving the edits of every differing line
+        origins: Optional (source file, line number) of every triple, stored in the per-line
+            results instead of its position when the triples are a sample of other files
+
+    Returns:
+        Tuple of (result dictionary, list of (index, original, round-trip, script text, opcodes)
+        for differing lines, empty when a report or sampler is given)
+    """
+    metrics = MetricsAccumulator()
+    diffs = []
+
+    measure = timer.measure if timer is not None else _not_timed
+    line_start_time = time.perf_counter()
+    for i, (orig, script_text, conv) in enumerate(triples):
+        orig = orig.strip()
+        conv = conv.strip()
+        weight, line_id = (distinct[0][i], distinct[1][i]) if distinct is not None else (1, i)
+
+        with measure("metrics", 1, len(orig)):
+            alignment = LineAlignment(orig, conv)
+            if orig:
+                metrics.add_alignment(alignment, weight)
+                if estimator is not None:
+                    estimator.add(i, alignment.exact, alignment.matching_chars, alignment.total_chars,
+                                  alignment.levenshtein)
+            if not alignment.exact and sampler is not None:
+                sampler.add(line_id, orig, conv, script_text.strip(), alignment.opcodes, alignment.levenshtein,
+                            weight)
+            if not alignment.exact and confusion is not None:
+                confusion.add(orig, conv, alignment.opcodes, line_id, weight)
+
+        if not alignment.exact and sampler is None:
+            if report is not None:
+                with measure("report", 1, len(orig)):
+                    report.add(orig, conv, script_text.strip(), alignment.opcodes)
+            else:
+                diffs.append((line_id, orig, conv, script_text.strip(), alignment.opcodes))
+
+        if orig and line_results is not None:
+            # Time since the previous line, including waiting for a streamed round trip
+            now = time.perf_counter()
+            source_file, row_id = origins[i] if origins is not None else (None, line_id)
+            with measure("write", 1, len(orig)):
+                line_results.add(row_id, len(orig), len(conv), alignment.exact, alignment.levenshtein,
+                                 alignment.matching_chars, now - line_start_time, weight, source_file)
+            line_start_time = now
+
+    result = metrics.result(script, system)
+    if estimator is not None:
+        result.update(estimator.estimates())
+    if totals:
+        result.update(metrics.totals())
+    return result, diffs
+
+
+def _write_intermediate_files(triples, script_file, iast_file, timer=None):
+    """Pass triples through while writing the script and round-trip lines to disk"""
+    measure = timer.measure if timer is not None else _not_timed
+    with open(script_file, 'w', encoding='utf-8') as script_f, \
+            open(iast_file, 'w', encoding='utf-8') as iast_f:
+        for orig, script_text, conv in triples:
+            with measure("write", 1, len(script_text) + len(conv)):
+                script_f.write(script_text)
+                iast_f.write(conv)
+            yield orig, script_text, conv
+
+
+def _open_line_results(line_results, log_dir, input_file, system, script):
+    """Open the per-line results table of a pair if requested"""
+    if not line_results:
+        return None
+    return LineResultsWriter(log_dir / f"lines_{system}_{script}", input_file, system, script)
+
+
+def run_pair(input_file, system, script, output_dir, transliteration_options, fused=False,
+             write_intermediate=False, page_size=DEFAULT_PAGE_SIZE, diff_sample_size=None,
+             diff_top_k=DEFAULT_TOP_K, line_results=False, timing=False, sample=None,
+             confidence=DEFAULT_CONFIDENCE, distinct=None, totals=False, confusion=False, source_file=None):
+    """
+    Run the round-trip test for one system and script
+
+    Args:
+        input_file: Path to the IAST input file
+        system: Transliteration system to test
+        script: Script to transliterate through
+        output_dir: Directory for the intermediate files and logs
+        transliteration_options: Keyword arguments passed on to transliterate_file / round_trip_stream
+        fused: Transliterate both ways and evaluate in a single streaming pass
+        write_intermediate: With fused, still write the intermediate files
+        page_size: Number of diffs per page of the HTML diff log
+        diff_sample_size: Only keep a random sample of this many diffs, plus the diff_top_k
+            diffs with the largest edit distance, for the HTML diff log
+        diff_top_k: Number of worst diffs kept when sampling
+        line_results: Write a columnar table with the metrics of every line to the log directory
+        timing: Time every stage and write throughput and latency percentiles as JSON to the log directory
+        sample: StratifiedSample the input file was drawn with, to estimate the corpus-level metrics
+        confidence: Confidence level of the estimates from a sample
+        distinct: (counts, first_positions) from write_distinct_lines when input_file holds the
+            distinct lines of the input, the metrics are then weighted to equal a full run
+        totals: Also include the raw metric totals in the result, so results of several inputs can be combined
+        confusion: Count the substituted, inserted and deleted characters and IAST letters of all
+            differing lines and write them as CSV to the log directory
+        source_file: File input_file was derived from by --max-lines or --dedup, stored in the
+            per-line table (input_file itself if None)
+
+    Returns:
+        Result dictionary, or None if transliteration failed
+    """
+    print(f"\nTesting system: {system} with script: {script}")
+    pair_start_time = time.perf_counter()
+
+    script_file = Path(output_dir) / f"iast_to_{script.lower()}_{system}.txt"
+    iast_file = Path(output_dir) / f"{script.lower()}_to_iast_{system}.txt"
+    log_dir = Path(output_dir) / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"comparison_{system}_{script}.log"
+    report = ShardedHTMLReport(log_dir / f"diff_log_{system}_{script}.html",
+                               f"Transliteration Comparison: {system} ({script})", page_size)
+    sampler = DiffSampler(diff_sample_size, diff_top_k, seed=0) if diff_sample_size is not None else None
+    timer = StageTimer() if timing else None
+    measure = timer.measure if timer is not None else _not_timed
+    estimator = StratifiedEstimator(sample, confidence) if sample is not None else None
+    confusion_counter = ConfusionCounter() if confusion else None
+    # Sampled lines are stored in the per-line table with their place in the corpus
+    origins = sample.origins() if sample is not None and line_results else None
+
+    if fused:
+        print(f"Transliterating IAST -> {script} -> IAST using {system} and evaluating in one pass...")
+        line_writer = _open_line_results(line_results, log_dir, source_file or input_file, system, script)
+        try:
+            with open(input_file, 'r', encoding='utf-8') as input_f:
+                triples = round_trip_stream(input_f, script, system, timer=timer, **transliteration_options)
+                if write_intermediate:
+                    triples = _write_intermediate_files(triples, script_file, iast_file, timer)
+                with report:
+                    result, _ = score_round_trip(triples, script, system, report, sampler, line_writer, timer,
+                                                 estimator, distinct, totals, confusion_counter, origins)
+        except TransliterationError as e:
+            print(f"Failed to transliterate with {system} for {script}: {e}")
+            return None
+        finally:
+            if line_writer is not None:
+                line_writer.close()
+    else:
+        print(f"Step 1: Transliterating IAST -> {script} using {system}...")
+        success = transliterate_file(input_file, script_file, "IAST", script, system,
+                                     timer=timer, stage="forward", **transliteration_options)
+        if not success:
+            print(f"Failed to transliterate with {system} to {script}")
+            return None
+
+        print(f"Step 2: Transliterating {script} -> IAST using {system}...")
+        success = transliterate_file(script_file, iast_file, script, "IAST", system,
+                                     timer=timer, stage="reverse", **transliteration_options)
+        if not success:
+            print(f"Failed to transliterate with {system} from {script}")
+            return None
+
+        print(f"Step 3: Evaluating round-trip accuracy...")
+        line_writer = _open_line_results(line_results, log_dir, source_file or input_file, system, script)
+        with open(input_file, 'r', encoding='utf-8') as input_f, \
+                open(script_file, 'r', encoding='utf-8') as script_f, \
+                open(iast_file, 'r', encoding='utf-8') as iast_f, report:
+            triples = zip(input_f, script_f, iast_f)
+            if timer is not None:
+                triples = timer.timed(triples, "read")
+            result, _ = score_round_trip(triples, script, system, report, sampler, line_writer, timer,
+                                         estimator, distinct, totals, confusion_counter, origins)
+        if line_writer is not None:
+            line_writer.close()
+
+    if line_writer is not None:
+        print(f"Per-line results written to {line_writer.path}")
+    if distinct is not None:
+        result.update(dedup_summary(distinct[0], time.perf_counter() - pair_start_time))
+
+    summary = result
+    with measure("report"):
+        if sampler is not None:
+            for index, orig, conv, script_text, opcodes, _ in sampler.diffs():
+                report.add(orig, conv, script_text, opcodes)
+            summary = dict(result, **sampler.summary())
+        html_file = report.close(summary)
+    if html_file:
+        print(f"HTML diff log written to {html_file} ({report.page_count} pages)")
+
+    with measure("write"), open(log_file, 'w', encoding='utf-8') as f:
+        f.write(f"Evaluation results for {system} with {script}:\n")
+        f.write(f"Exact Matches: {result['Exact Matches (%)']}%\n")
+        f.write(f"Character Accuracy: {result['Char Accuracy (%)']}%\n")
+        f.write(f"Average Levenshtein Distance: {result['Avg. Levenshtein']}\n")
+        if estimator is not None:
+            f.write(f"Estimated from a sample of {result['Lines']} of {result['Corpus Lines']} lines, "
+                    f"{result['Confidence (%)']:g}% confidence margins: "
+                    f"exact matches ±{result['Exact Matches ± (%)']}%, "
+                    f"char accuracy ±{result['Char Accuracy ± (%)']}%, "
+                    f"Levenshtein ±{result['Avg. Levenshtein ±']}\n")
+        if distinct is not None:
+            f.write(f"Evaluated {result['Distinct Lines']} distinct lines, "
+                    f"{result['Dedup Ratio (%)']:.2f}% of the lines are repeats, "
+                    f"estimated {result['Est. Time Saved (s)']:.2f} seconds saved\n")
+        if sampler is not None:
+            for name, value in sampler.summary().items():
+                f.write(f"{name}: {value}\n")
+
+    if confusion_counter is not None:
+        with measure("write"):
+            confusion_file = confusion_counter.write_csv(log_dir / f"confusion_{system}_{script}.csv")
+        print(f"Most frequent edits:\n{confusion_counter.format_top()}")
+        print(f"Edit counts written to {confusion_file}")
+
+    if timer is not None:
+        timing_file = timer.write_json(log_dir / f"timing_{system}_{script}.json", system=system, script=script,
+                                       mode="fused" if fused else "files", lines=result["Lines"],
+                                       **{name: value for name, value in transliteration_options.items()
+                                          if name != "cache"})
+        print(f"Stage timings:\n{timer.format_summary()}")
+        print(f"Stage timings written to {timing_file}")
+
+    print(f"Round-trip test for {system} with {script} completed. Results saved to {log_file}")
+
+    return result
+
+
+def _run_pair_job(input_file, system, script, output_dir, transliteration_options, fused, write_intermediate,
+                  cache_path=None, cache_max_entries=DEFAULT_MAX_ENTRIES, page_size=DEFAULT_PAGE_SIZE,
+                  diff_sample_size=None, diff_top_k=DEFAULT_TOP_K, line_results=False, timing=False, sample=None,
+                  confidence=DEFAULT_CONFIDENCE, distinct=None, totals=False, confusion=False, source_file=None):
+    """
+    Run one pair in a scheduler worker process
+
+    The output of the pair is captured so it can be printed in one piece instead of
+    interleaving with the pairs running next to it.
+
+    Returns:
+        Tuple of (result dictionary or None, captured output, seconds spent on the pair)
+    """
+    start_time = time.time()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        cache = None
+        try:
+            if cache_path is not None:
+                cache = TransliterationCache(cache_path, cache_max_entries)
+            result = run_pair(input_file, system, script, output_dir,
+                              dict(transliteration_options, cache=cache), fused, write_intermediate, page_size,
+                              diff_sample_size, diff_top_k, line_results, timing, sample, confidence, distinct,
+                              totals, confusion, source_file)
+        except Exception as e:
+            print(f"Error testing {system} with {script}: {e}")
+            result = None
+        finally:
+            if cache is not None:
+                print(f"Result cache: {cache.format_stats()}")
+                cache.close()
+    return result, output.getvalue(), time.time() - start_time
+
+
+def _format_duration(seconds):
+    """Format a number of seconds as h:mm:ss"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def _print_progress(completed, total, system, script, pair_seconds, start_time, text=None):
+    """Print how many pairs are done and estimate the time left from the average wall time per pair"""
+    elapsed_time = time.time() - start_time
+    eta = elapsed_time / completed * (total - completed)
+    label = f"{text}: {system} / {script}" if text is not None else f"{system} / {script}"
+    print(f"[{completed}/{total}] {label} finished in {_format_duration(pair_seconds)} "
+          f"- elapsed {_format_duration(elapsed_time)}, ETA {_format_duration(eta)}")
+
 
+def print_summary(results, output_dir, filename="round_trip_summary.csv", title="Round-Trip Summary",
+                  show_table=True):
+    """Print one table with the results of all pairs and save it as CSV"""
+    if not results:
+        return
 
-def run_round_trip_test(input_file, systems=None, output_dir="results", max_lines=None, scripts=None):
+    csv_file = Path(output_dir) / filename
+    print(f"\n--- {title} ---")
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        results_df = pd.DataFrame(results)
+        if show_table:
+            print(results_df.to_string(index=False))
+        results_df.to_csv(csv_file, index=False)
+    else:
+        columns = list(results[0])
+        if show_table:
+            print("  ".join(columns))
+            for result in results:
+                print("  ".join(str(result[column]) for column in columns))
+        with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(results)
+    print(f"Summary results saved to {csv_file}")
+
+
+def _file_digest(file_path):
+    """Hash the content of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(manifest_file):
+    """Load the recorded results of earlier directory runs, empty if there are none"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest_file, manifest):
+    """Write the manifest atomically, so an interrupted run never leaves it half written"""
+    temp_file = Path(str(manifest_file) + ".tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temp_file, manifest_file)
+
+
+def combine_text_results(text_results, pairs):
+    """
+    Combine per-text results into one result per system and script
+
+    Args:
+        text_results: Per-text results, including the raw totals of MetricsAccumulator.totals()
+        pairs: (system, script) pairs in output order
+
+    Returns:
+        List of combined results, with the number of texts each covers
+    """
+    combined = []
+    for system, script in pairs:
+        metrics = MetricsAccumulator()
+        texts = 0
+        for result in text_results:
+            if result["System"] == system and result["Script"] == script:
+                metrics.add_totals(result["Lines"], result)
+                texts += 1
+        if texts:
+            combined.append(dict(metrics.result(script, system), Texts=texts))
+    return combined
+
+
+def combine_text_confusions(text_results, pairs, output_dir):
+    """
+    Merge the edit counts of all texts into one table per system and script
+
+    Example lines of the merged tables are given as TEXT:LINE.
+
+    Args:
+        text_results: Per-text results, with the name of their text
+        pairs: (system, script) pairs to merge
+        output_dir: Directory holding the per-text outputs, the merged tables go to its log directory
+
+    Returns:
+        List of the merged CSV files
+    """
+    log_dir = Path(output_dir) / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for system, script in pairs:
+        merged = None
+        for result in text_results:
+            if result["System"] != system or result["Script"] != script:
+                continue
+            confusion_file = (Path(output_dir) / "texts" / result["Text"] / "logs" /
+                              f"confusion_{system}_{script}.csv")
+            if not confusion_file.exists():
+                continue
+            counter = ConfusionCounter.read_csv(confusion_file)
+            counter.examples = {key: f"{result['Text']}:{line_id}" for key, line_id in counter.examples.items()}
+            merged = counter if merged is None else merged.merge(counter)
+        if merged is not None:
+            written.append(merged.write_csv(log_dir / f"confusion_{system}_{script}.csv"))
+    return written
+
+
+def run_texts(input_dir, pairs, output_dir, transliteration_options, pair_options, cache_path=None,
+              cache_max_entries=DEFAULT_MAX_ENTRIES, jobs=1):
+    """
+    Test every system/script pair on every text of a directory, each as a separate job
+
+    The outputs of a text are written to output_dir/texts/NAME. Jobs whose text,
+    backend version and settings did not change since the last run are skipped,
+    and the results recorded in the manifest are used instead.
+
+    Args:
+        input_dir: Directory of .txt files, such as data/raw/FinalCorpus
+        pairs: (system, script) pairs to test
+        output_dir: Directory for the per-text outputs, the manifest and the summaries
+        transliteration_options: Keyword arguments passed on to transliterate_file / round_trip_stream
+        pair_options: Keyword arguments passed on to run_pair
+        cache_path: Optional path of the transliteration cache, opened by every job
+        cache_max_entries: Maximum number of lines kept in the cache
+        jobs: Number of jobs run in parallel
+
+    Returns:
+        Tuple of (per-text results, combined results per system and script,
+        TEXT/SYSTEM/SCRIPT keys of the jobs that failed)
+    """
+    start_time = time.time()
+    texts = sorted(glob.glob(os.path.join(input_dir, "*.txt")))
+    manifest_file = Path(output_dir) / TEXTS_MANIFEST
+    manifest = _load_manifest(manifest_file)
+    settings = json.dumps(pair_options, sort_keys=True)
+
+    results = {}
+    failed = []
+    pending = []
+    for text_file in texts:
+        name = Path(text_file).stem
+        text_dir = Path(output_dir) / "texts" / name
+        content_digest = _file_digest(text_file)
+        for system, script in pairs:
+            key = f"{name}/{system}/{script}"
+            fingerprint = f"{content_digest}/{get_library_version(system)}/{settings}"
+            entry = manifest.get(key)
+            log_file = text_dir / "logs" / f"comparison_{system}_{script}.log"
+            if entry is not None and entry["fingerprint"] == fingerprint and log_file.exists():
+                results[key] = entry["result"]
+            else:
+                pending.append((key, text_file, name, system, script, text_dir, fingerprint))
+
+    total_jobs = len(texts) * len(pairs)
+    print(f"Found {len(texts)} texts in {input_dir}: {len(pending)} of {total_jobs} text/system/script jobs "
+          f"to run, {total_jobs - len(pending)} unchanged since the last run")
+
+    def record(job, result, output, job_seconds, completed):
+        key, _, name, system, script, _, fingerprint = job
+        print(output, end="")
+        _print_progress(completed, len(pending), system, script, job_seconds, start_time, name)
+        if result is None:
+            failed.append(key)
+            return
+        results[key] = result
+        manifest[key] = {"fingerprint": fingerprint, "result": result}
+        _save_manifest(manifest_file, manifest)
+
+    def job_arguments(job):
+        _, text_file, _, system, script, text_dir, _ = job
+        return text_file, system, script, text_dir, transliteration_options
+
+    job_options = dict(pair_options, cache_path=cache_path, cache_max_entries=cache_max_entries, totals=True)
+    if jobs > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        jobs = min(jobs, len(pending))
+        print(f"Running {len(pending)} jobs on {jobs} parallel jobs")
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(_run_pair_job, *job_arguments(job), **job_options): job for job in pending}
+            for completed, future in enumerate(as_completed(futures), 1):
+                record(futures[future], *future.result(), completed)
+    else:
+        for completed, job in enumerate(pending, 1):
+            record(job, *_run_pair_job(*job_arguments(job), **job_options), completed)
+
+    # Texts in directory order, pairs in matrix order
+    text_results = []
+    for text_file in texts:
+        name = Path(text_file).stem
+        for system, script in pairs:
+            key = f"{name}/{system}/{script}"
+            if key in results:
+                text_results.append(dict(Text=name, **results[key]))
+    return text_results, combine_text_results(text_results, pairs), sorted(failed)
+
+
+def run_round_trip_test(input_file, systems=None, output_dir="results", max_lines=None, scripts=None,
+                        batch_size=1, batch_bytes=None, workers=1, word_cache_size=None,
+                        use_cache=False, cache_max_entries=DEFAULT_MAX_ENTRIES, fused=False,
+                        write_intermediate=False, jobs=1, page_size=DEFAULT_PAGE_SIZE, diff_sample_size=None,
+                        diff_top_k=DEFAULT_TOP_K, line_results=False, timing=False, sample_size=None,
+                        sample_fraction=None, sample_seed=0, sample_block_lines=DEFAULT_BLOCK_LINES,
+                        confidence=DEFAULT_CONFIDENCE, dedup=False, confusion=False):
     if not os.path.exists(input_file):
         print(f"Error: Input file {input_file} does not exist")
         return
@@ -25,6 +552,14 @@ def run_round_trip_test(input_file, systems=None, output_dir="results", max_line
             print("Please use 'aksharamukha' or 'indic_transliteration' instead")
             return
 
+        available_systems = get_available_systems()
+        for system in systems:
+            if system not in available_systems:
+                print(f"Warning: {system} is not installed, skipping it")
+        systems = [system for system in systems if system in available_systems]
+        if not systems:
+            return
+
     if not scripts:
         scripts = ["Devanagari"]
 
@@ -35,7 +570,57 @@ def run_round_trip_test(input_file, systems=None, output_dir="results", max_line
     log_dir = Path(output_dir) / "logs"
     os.makedirs(log_dir, exist_ok=True)
 
-    if max_lines:
+    cache = None
+    if use_cache:
+        cache = TransliterationCache(get_cache_path(output_dir), cache_max_entries)
+        print(f"Using transliteration cache {cache.path}")
+
+    transliteration_options = {
+        "batch_size": batch_size,
+        "batch_bytes": batch_bytes,
+        "workers": workers,
+        "word_cache_size": word_cache_size,
+    }
+    pairs = [(system, script) for system in systems for script in scripts]
+
+    sample = None
+    source_file = input_file
+    if sample_size or sample_fraction:
+        if max_lines:
+            print("Warning: --max-lines is ignored when sampling")
+        sample = StratifiedSample(input_file, sample_size, sample_fraction, sample_seed, sample_block_lines)
+        print(sample.describe())
+        input_file = sample.write(Path(output_dir) / "temp_input.txt")
+    elif os.path.isdir(input_file):
+        if max_lines or dedup:
+            print("Warning: --max-lines and --dedup are ignored for a directory of texts")
+        if cache is not None:
+            # Every job opens its own connection to the same database
+            cache.close()
+        pair_options = {
+            "fused": fused,
+            "write_intermediate": write_intermediate,
+            "page_size": page_size,
+            "diff_sample_size": diff_sample_size,
+            "diff_top_k": diff_top_k,
+            "line_results": line_results,
+            "timing": timing,
+            "confusion": confusion,
+        }
+        text_results, results, failed = run_texts(input_file, pairs, output_dir, transliteration_options, pair_options,
+                                          cache.path if cache is not None else None, cache_max_entries, jobs)
+        print_summary(text_results, output_dir, "round_trip_texts.csv", "Per-Text Results", show_table=False)
+        print_summary(results, output_dir)
+        if confusion:
+            for confusion_file in combine_text_confusions(text_results, pairs, output_dir):
+                print(f"Edit counts of all texts written to {confusion_file}")
+        if failed:
+            print(f"\nError: {len(failed)} text/system/script jobs failed after {time.time() - start_time:.2f} "
+                  f"seconds: {', '.join(failed)}")
+            return False
+        print(f"\nAll tests completed in {time.time() - start_time:.2f} seconds")
+        return
+    elif max_lines:
         with open(input_file, 'r', encoding='utf-8') as f:
             lines = f.readlines()[:max_lines]
         temp_input = Path(output_dir) / "temp_input.txt"
@@ -43,130 +628,92 @@ def run_round_trip_test(input_file, systems=None, output_dir="results", max_line
             f.writelines(lines)
         input_file = temp_input
 
-    for system in systems:
-        for script in scripts:
-            print(f"\nTesting system: {system} with script: {script}")
-
-            script_file = Path(output_dir) / f"iast_to_{script.lower()}_{system}.txt"
-            print(f"Step 1: Transliterating IAST -> {script} using {system}...")
-            success = transliterate_file(input_file, script_file, "IAST", script, system)
-            if not success:
-                print(f"Failed to transliterate with {system} to {script}")
-                continue
-
-            iast_file = Path(output_dir) / f"{script.lower()}_to_iast_{system}.txt"
-            print(f"Step 2: Transliterating {script} -> IAST using {system}...")
-            success = transliterate_file(script_file, iast_file, script, "IAST", system)
-            if not success:
-                print(f"Failed to transliterate with {system} from {script}")
-                continue
-
-            log_file = log_dir / f"comparison_{system}_{script}.log"
-            print(f"Step 3: Evaluating round-trip accuracy...")
-
-            original_lines = read_file_to_list(input_file)
-            converted_lines = read_file_to_list(iast_file)
-
-            exact_matches = 0
-            total_chars = 0
-            correct_chars = 0
-            levenshtein_sum = 0
-
-            import difflib
-            from test_transliterators import levenshtein_distance
-
-            for i, (orig, conv) in enumerate(zip(original_lines, converted_lines)):
-                orig = orig.strip()
-                conv = conv.strip()
-
-                if not orig:
-                    continue
-
-                if orig == conv:
-                    exact_matches += 1
-
-                sm = difflib.SequenceMatcher(None, orig, conv)
-                correct_chars += sum(match.size for match in sm.get_matching_blocks())
-                total_chars += max(len(orig), len(conv))
-
-                lev = levenshtein_distance(orig, conv)
-                levenshtein_sum += lev
-
-            num_lines = len([line for line in original_lines if line.strip()])
-
-            result = {
-                "Script": script,
-                "System": system,
-                "Lines": num_lines,
-                "Exact Matches (%)": (exact_matches / num_lines) * 100 if num_lines else 0,
-                "Char Accuracy (%)": (correct_chars / total_chars) * 100 if total_chars else 0,
-                "Avg. Levenshtein": levenshtein_sum / num_lines if num_lines else 0,
-            }
-
-            diffs = []
-            for i, (orig, conv) in enumerate(zip(original_lines, converted_lines)):
-                orig = orig.strip()
-                conv = conv.strip()
-                if orig != conv:
-                    diffs.append((i, orig, conv))
-
-            if diffs:
-                from test_transliterators import generate_html_diff
-
-                script_lines = read_file_to_list(script_file)
-
-                html_content = f"""
-<html>
-<head>
-    <meta charset='UTF-8'>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .diff-row {{ display: flex; margin-bottom: 20px; border: 1px solid #ddd; border-radius: 5px; overflow: hidden; }}
-        .diff-cell {{ flex: 1; padding: 10px; }}
-        .diff-label {{ font-weight: bold; margin-bottom: 5px; background: #f0f0f0; padding: 5px; }}
-        .diff-content {{ padding: 10px; }}
-        .equal {{ color: black; }}
-        .delete {{ color: red; background-color: #ffeeee; }}
-        .insert {{ color: green; background-color: #eeffee; }}
-        .script-text {{ font-size: 1.2em; }}
-        h1 {{ color: #333; }}
-    </style>
-    <title>Transliteration Comparison</title>
-</head>
-<body>
-    <h1>Transliteration Comparison: {system} ({script})</h1>
-"""
-                for index, orig, conv in diffs:
-                    if index < len(script_lines):
-                        script_text = script_lines[index].strip()
-                        html_content += generate_html_diff(orig, conv, script_text)
-                    else:
-                        html_content += generate_html_diff(orig, conv)
-
-                html_content += "</body></html>"
-
-                html_file = log_dir / f"diff_log_{system}_{script}.html"
-                with open(html_file, "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                print(f"HTML diff log written to {html_file}")
-
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write(f"Evaluation results for {system} with {script}:\n")
-                f.write(f"Exact Matches: {result['Exact Matches (%)']}%\n")
-                f.write(f"Character Accuracy: {result['Char Accuracy (%)']}%\n")
-                f.write(f"Average Levenshtein Distance: {result['Avg. Levenshtein']}\n")
-
-            print(f"Round-trip test for {system} with {script} completed. Results saved to {log_file}")
+    distinct = None
+    if dedup and sample is not None:
+        print("Warning: --dedup is ignored when sampling")
+    elif dedup:
+        distinct_input = Path(output_dir) / "distinct_input.txt"
+        distinct = write_distinct_lines(input_file, distinct_input)
+        input_file = distinct_input
+        total_lines = sum(distinct[0])
+        print(f"Evaluating {len(distinct[0])} distinct lines of {total_lines} "
+              f"({len(distinct[0]) / total_lines * 100 if total_lines else 0:.2f}%)")
+
+    results = []
+    failed = []
+    completed = 0
+
+    if jobs > 1 and len(pairs) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        jobs = min(jobs, len(pairs))
+        print(f"Running {len(pairs)} system/script pairs on {jobs} parallel jobs")
+        cache_path = None
+        if cache is not None:
+            # Every job opens its own connection to the same database
+            cache_path = cache.path
+            cache.close()
+            cache = None
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {}
+            for system, script in pairs:
+                future = executor.submit(_run_pair_job, input_file, system, script, output_dir,
+                                         transliteration_options, fused, write_intermediate, cache_path,
+                                         cache_max_entries, page_size, diff_sample_size, diff_top_k,
+                                         line_results, timing, sample, confidence, distinct, False,
+                                         confusion, source_file)
+                futures[future] = (system, script)
+
+            pair_results = {}
+            for future in as_completed(futures):
+                system, script = futures[future]
+                result, output, pair_seconds = future.result()
+                print(output, end="")
+                completed += 1
+                _print_progress(completed, len(pairs), system, script, pair_seconds, start_time)
+                if result is None:
+                    failed.append((system, script))
+                else:
+                    pair_results[(system, script)] = result
+
+        # Keep the summary in matrix order rather than completion order
+        results = [pair_results[pair] for pair in pairs if pair in pair_results]
+    else:
+        for system, script in pairs:
+            pair_start_time = time.time()
+            result = run_pair(input_file, system, script, output_dir, dict(transliteration_options, cache=cache),
+                              fused, write_intermediate, page_size, diff_sample_size, diff_top_k, line_results,
+                              timing, sample, confidence, distinct, False, confusion, source_file)
+            completed += 1
+            _print_progress(completed, len(pairs), system, script, time.time() - pair_start_time, start_time)
+            if result is None:
+                failed.append((system, script))
+            else:
+                results.append(result)
+
+    if cache is not None:
+        print(f"\nResult cache: {cache.format_stats()}")
+        cache.close()
+
+    print_summary(results, output_dir)
 
     elapsed_time = time.time() - start_time
+    if failed:
+        # Report failures in matrix order, also when pairs finished out of order
+        failed = [f"{system}/{script}" for system, script in pairs if (system, script) in failed]
+        print(f"\nError: {len(failed)} system/script pairs failed after {elapsed_time:.2f} seconds: "
+              f"{', '.join(failed)}")
+        return False
     print(f"\nAll tests completed in {elapsed_time:.2f} seconds")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run IAST->Script->IAST round-trip test")
-    parser.add_argument("input_file", help="Input file containing IAST text")
+    parser.add_argument("input_file", help="Input file containing IAST text, or a directory of texts such as "
+                                           "data/raw/FinalCorpus to test each text separately")
     parser.add_argument("--systems", nargs="+",
-                        choices=get_available_systems() + ["google"],
+                        choices=SUPPORTED_SYSTEMS + ["google"],
                         help="Transliteration systems to test (tests all if not specified)")
     parser.add_argument("--scripts", nargs="+",
                         default=["Devanagari"],
@@ -177,6 +724,52 @@ def main():
                         help="Directory to save output files")
     parser.add_argument("--max-lines", type=int, default=None,
                         help="Maximum number of lines to process")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Number of lines sent to the transliteration backend in one call")
+    parser.add_argument("--batch-bytes", type=int, default=None,
+                        help="Maximum number of bytes sent to the transliteration backend in one call")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes used for transliteration")
+    parser.add_argument("--word-cache-size", type=int, default=None,
+                        help="Transliterate word by word with an LRU cache of this many words")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse transliterations from earlier runs stored under the output directory")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Maximum number of lines kept in the cache")
+    parser.add_argument("--fused", action="store_true",
+                        help="Transliterate both ways and evaluate in a single streaming pass")
+    parser.add_argument("--write-intermediate", action="store_true",
+                        help="With --fused, also write the script and round-trip files")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="Number of diffs per page of the HTML diff logs")
+    parser.add_argument("--diff-sample-size", type=int, default=None,
+                        help="Only show a random sample of this many diffs in the HTML logs (all if not specified)")
+    parser.add_argument("--diff-top-k", type=int, default=DEFAULT_TOP_K,
+                        help="With --diff-sample-size, also show this many diffs with the largest edit distance")
+    parser.add_argument("--line-results", action="store_true",
+                        help="Write the metrics of every line as a Parquet (or gzipped CSV) table to the log directory")
+    parser.add_argument("--timing", action="store_true",
+                        help="Time every stage and write throughput and latency percentiles as JSON to the "
+                             "log directory")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Test a stratified random sample of this many lines and estimate the corpus-level "
+                             "metrics with confidence intervals")
+    parser.add_argument("--sample-fraction", type=float, default=None,
+                        help="Test a stratified random sample of this fraction of the lines")
+    parser.add_argument("--sample-seed", type=int, default=0,
+                        help="Random seed for sampling")
+    parser.add_argument("--sample-block-lines", type=int, default=DEFAULT_BLOCK_LINES,
+                        help="Lines per stratum when sampling a single file, a directory is stratified by text")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help="Confidence level of the intervals of sampled runs (default 0.95)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Transliterate and score every distinct line once, weighting the metrics by how "
+                             "often it occurs")
+    parser.add_argument("--confusion", action="store_true",
+                        help="Count the substituted, inserted and deleted characters and IAST letters of all "
+                             "differing lines and write them as a CSV table to the log directory")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of system/script pairs tested in parallel")
 
     args = parser.parse_args()
 
@@ -189,13 +782,36 @@ def main():
             print("Continuing with other selected systems...")
             args.systems = [s for s in args.systems if s != "google"]
 
-    run_round_trip_test(
+    completed = run_round_trip_test(
         args.input_file,
         args.systems,
         args.output_dir,
         args.max_lines,
-        args.scripts
+        args.scripts,
+        args.batch_size,
+        args.batch_bytes,
+        args.workers,
+        args.word_cache_size,
+        args.cache,
+        args.cache_max_entries,
+        args.fused,
+        args.write_intermediate,
+        args.jobs,
+        args.page_size,
+        args.diff_sample_size,
+        args.diff_top_k,
+        args.line_results,
+        args.timing,
+        args.sample_size,
+        args.sample_fraction,
+        args.sample_seed,
+        args.sample_block_lines,
+        args.confidence,
+        args.dedup,
+        args.confusion
     )
+    if completed is False:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+
+import os
+import glob
+import math
+import bisect
+import random
+import statistics
+
+# Consecutive lines of a single input file that form one stratum. The merged
+# corpus keeps every source text together, so blocks follow the source texts.
+DEFAULT_BLOCK_LINES = 1000
+
+DEFAULT_CONFIDENCE = 0.95
+
+# Early stopping: lines always evaluated before stopping, and lines between two checks
+DEFAULT_MIN_LINES = 1000
+DEFAULT_CHECK_INTERVAL = 500
+
+
+def _iter_sources(path):
+    """Yield the files a sample is drawn from, the texts of a directory or the file itself"""
+    if os.path.isdir(path):
+        yield from sorted(glob.glob(os.path.join(path, "*.txt")))
+    else:
+        yield path
+
+
+def _allocate(sample_size, population_sizes):
+    """Split a sample size over strata in proportion to their size, by largest remainder"""
+    population = sum(population_sizes)
+    if not population:
+        return [0] * len(population_sizes)
+    quotas = [sample_size * size / population for size in population_sizes]
+    allocation = [int(quota) for quota in quotas]
+    remaining = sample_size - sum(allocation)
+    by_remainder = sorted(range(len(quotas)), key=lambda h: allocation[h] - quotas[h])
+    for h in by_remainder[:remaining]:
+        allocation[h] += 1
+    return allocation
+
+
+class StratifiedSample:
+    """
+    Seeded stratified random sample of the non-empty lines of a corpus
+
+    The strata are the .txt files of a directory, or blocks of block_lines
+    consecutive lines of a single file. Lines are allocated to the strata in
+    proportion to their size and drawn without replacement. The corpus is
+    streamed twice, once to count the lines of every stratum and once to
+    yield the sampled lines, so only the chosen line numbers are held in memory.
+    """
+
+    def __init__(self, path, size=None, fraction=None, seed=0, block_lines=DEFAULT_BLOCK_LINES):
+        """
+        Args:
+            path: Input file or directory of .txt files
+            size: Number of lines to sample
+            fraction: Fraction of the lines to sample, used when size is not given
+            seed: Random seed
+            block_lines: Lines per stratum when path is a single file
+        """
+        self.path = path
+        self.by_file = os.path.isdir(path)
+        self.block_lines = block_lines
+
+        counts = []
+        for file_path in _iter_sources(path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                counts.append((os.path.basename(file_path), sum(1 for line in f if line.strip())))
+
+        if self.by_file:
+            self.strata = counts
+        else:
+            total = counts[0][1]
+            self.strata = [(f"lines {start + 1}-{min(start + block_lines, total)}",
+                            min(block_lines, total - start))
+                           for start in range(0, total, block_lines)]
+
+        population = self.population
+        if size is None:
+            size = round(population * fraction) if fraction is not None else population
+        self.allocation = _allocate(min(size, population), [stratum_size for _, stratum_size in self.strata])
+
+        rng = random.Random(seed)
+        self._chosen = [set(rng.sample(range(stratum_size), n))
+                        for (_, stratum_size), n in zip(self.strata, self.allocation)]
+        self._origins = None
+        self._offsets = []
+        offset = 0
+        for n in self.allocation:
+            self._offsets.append(offset)
+            offset += n
+
+    @property
+    def population(self):
+        """Number of non-empty lines in the corpus"""
+        return sum(stratum_size for _, stratum_size in self.strata)
+
+    def __len__(self):
+        return sum(self.allocation)
+
+    def stratum_of(self, index):
+        """Return the stratum of the line at this position of the sample"""
+        return bisect.bisect_right(self._offsets, index) - 1
+
+    def iter_sampled(self):
+        """
+        Stream the sampled lines with their origin, stratum by stratum and in corpus order within a stratum
+
+        Yields:
+            Tuples of (file path, 0-based line number in that file, line)
+        """
+        stratum = 0
+        position = 0
+        for file_path in _iter_sources(self.path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f):
+                    if not line.strip():
+                        continue
+                    if not self.by_file and position == self.block_lines:
+                        stratum += 1
+                        position = 0
+                    if position in self._chosen[stratum]:
+                        yield file_path, line_number, line
+                    position += 1
+            if self.by_file:
+                stratum += 1
+                position = 0
+
+    def iter_lines(self):
+        """
+        Stream the sampled lines, stratum by stratum and in corpus order within a stratum
+
+        Yields:
+            Sampled lines, each ending with a newline
+        """
+        for _, _, line in self.iter_sampled():
+            yield line if line.endswith("\n") else line + "\n"
+
+    def origins(self):
+        """
+        Return where every sampled line comes from, computed on first use
+
+        Returns:
+            List of (file path, 0-based line number in that file), one per position of the sample
+        """
+        if self._origins is None:
+            self._origins = [(file_path, line_number) for file_path, line_number, _ in self.iter_sampled()]
+        return self._origins
+
+    def write(self, output_file):
+        """Write the sampled lines to a file, recording their origins on the way"""
+        origins = []
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for file_path, line_number, line in self.iter_sampled():
+                origins.append((file_path, line_number))
+                f.write(line if line.endswith("\n") else line + "\n")
+        self._origins = origins
+        return output_file
+
+    def describe(self):
+        """One-line description of the sample for printing"""
+        kind = "texts" if self.by_file else f"blocks of {self.block_lines} lines"
+        return (f"Sampled {len(self)} of {self.population} lines "
+                f"({len(self) / self.population * 100 if self.population else 0:.2f}%) "
+                f"from {len(self.strata)} {kind}")
+
+
+class SimpleRandomSample:
+    """
+    A single stratum covering a whole corpus, for estimates from lines drawn in random order
+
+    Has the attributes of StratifiedSample used by StratifiedEstimator.
+    """
+
+    def __init__(self, population):
+        self.strata = [("all lines", population)]
+        self.population = population
+
+    def stratum_of(self, index):
+        return 0
+
+
+def _wilson_margin(proportion, lines, z):
+    """Half the width of the Wilson score interval of a proportion observed over this many lines"""
+    if math.isinf(lines):
+        return 0.0
+    if lines <= 0:
+        return 0.5
+    return (z / (1 + z * z / lines)
+            * math.sqrt(proportion * (1 - proportion) / lines + z * z / (4 * lines * lines)))
+
+
+class StratifiedEstimator:
+    """
+    Corpus-level metric estimates with confidence intervals from a stratified sample
+
+    Exact matches and the average Levenshtein distance are estimated as
+    stratified means, character accuracy as a stratified ratio of matching to
+    total characters. Intervals use the normal approximation with the finite
+    population correction of every stratum. Strata with a single sampled line
+    borrow the variance of the whole sample, and strata without sampled lines
+    are left out of the weights.
+
+    The margin of exact matches is half the width of a Wilson score interval
+    for the effective sample size of the stratified design, so it stays above
+    zero when every sampled line matches or none does. Character accuracy gets
+    the same margin when all sampled lines have the same accuracy, such as when
+    they are all exact.
+    """
+
+    def __init__(self, sample, confidence=DEFAULT_CONFIDENCE):
+        self.sample = sample
+        self.confidence = confidence
+        # Per stratum: lines, then sums of exact, matching, total, levenshtein,
+        # exact^2, levenshtein^2, matching^2, total^2 and matching * total
+        self._sums = [[0] * 10 for _ in sample.strata]
+
+    def add(self, index, exact, matching_chars, total_chars, levenshtein):
+        """
+        Add the metrics of one line
+
+        Args:
+            index: Position of the line in the sample
+            exact: Whether the round trip reproduced the line exactly
+            matching_chars: Number of characters matched by the alignment
+            total_chars: Length of the longer of the original and round-trip line
+            levenshtein: Edit distance between the original and round-trip line
+        """
+        exact = 1 if exact else 0
+        sums = self._sums[self.sample.stratum_of(index)]
+        sums[0] += 1
+        for position, value in enumerate((exact, matching_chars, total_chars, levenshtein,
+                                          exact * exact, levenshtein * levenshtein,
+                                          matching_chars * matching_chars, total_chars * total_chars,
+                                          matching_chars * total_chars), 1):
+            sums[position] += value
+
+    def _weights(self):
+        """Population share of every sampled stratum, renormalized over the sampled strata"""
+        sampled = [(h, stratum_size) for h, (_, stratum_size) in enumerate(self.sample.strata)
+                   if self._sums[h][0]]
+        population = sum(stratum_size for _, stratum_size in sampled)
+        return [(h, stratum_size / population, stratum_size) for h, stratum_size in sampled]
+
+    def _stratified_variance(self, weights, variance_of):
+        """Sum of the stratum variances of a mean, weighted and with finite population correction"""
+        lines = sum(self._sums[h][0] for h, _, _ in weights)
+        total = [sum(self._sums[h][position] for h, _, _ in weights) for position in range(10)]
+        pooled = variance_of(total) if lines > 1 else 0.0
+
+        variance = 0.0
+        for h, weight, stratum_size in weights:
+            n = self._sums[h][0]
+            stratum_variance = variance_of(self._sums[h]) if n > 1 else pooled
+            variance += weight * weight * (1 - n / stratum_size) * stratum_variance / n
+        return variance
+
+    def _effective_lines(self, weights, proportion, variance):
+        """
+        Number of lines of a simple random sample giving a proportion the stratified variance
+
+        Without variation in the sample, the number of sampled lines with the finite
+        population correction is used, which is infinite once every line was sampled.
+        """
+        if variance > 0:
+            return proportion * (1 - proportion) / variance
+        lines = sum(self._sums[h][0] for h, _, _ in weights)
+        sampled_population = sum(stratum_size for _, _, stratum_size in weights)
+        if lines >= sampled_population:
+            return math.inf
+        return lines / (1 - lines / sampled_population)
+
+    def estimates(self):
+        """
+        Estimate the corpus-level metrics
+
+        Returns:
+            Dictionary with the estimated Exact Matches (%), Char Accuracy (%) and
+            Avg. Levenshtein, the margin of error of each, the confidence level and
+            the number of lines in the corpus
+        """
+        weights = self._weights()
+        if not weights:
+            return {}
+        z = statistics.NormalDist().inv_cdf((1 + self.confidence) / 2)
+
+        def mean(position):
+            return sum(weight * self._sums[h][position] / self._sums[h][0] for h, weight, _ in weights)
+
+        def variance_of(sum_position, square_position):
+            def variance(sums):
+                n = sums[0]
+                return max(0.0, (sums[square_position] - sums[sum_position] ** 2 / n) / (n - 1))
+            return variance
+
+        exact = mean(1)
+        levenshtein = mean(4)
+        matching = mean(2)
+        total = mean(3)
+        ratio = matching / total if total else 0.0
+
+        def ratio_residual_variance(sums):
+            # Variance of matching - ratio * total, the linearization of the ratio estimator
+            n = sums[0]
+            residual_sum = sums[2] - ratio * sums[3]
+            residual_squares = sums[7] - 2 * ratio * sums[9] + ratio * ratio * sums[8]
+            return max(0.0, (residual_squares - residual_sum ** 2 / n) / (n - 1))
+
+        exact_variance = self._stratified_variance(weights, variance_of(1, 5))
+        exact_margin = _wilson_margin(exact, self._effective_lines(weights, exact, exact_variance), z)
+        levenshtein_margin = z * math.sqrt(self._stratified_variance(weights, variance_of(4, 6)))
+        ratio_variance = self._stratified_variance(weights, ratio_residual_variance)
+        ratio_margin = z * math.sqrt(ratio_variance) / total if total else 0.0
+        if total and not ratio_variance:
+            # Every sampled line has the same accuracy, which the normal approximation takes as certain
+            ratio_margin = _wilson_margin(ratio, self._effective_lines(weights, ratio, 0.0), z)
+
+        return {
+            "Exact Matches (%)": exact * 100,
+            "Exact Matches ± (%)": exact_margin * 100,
+            "Char Accuracy (%)": ratio * 100,
+            "Char Accuracy ± (%)": ratio_margin * 100,
+            "Avg. Levenshtein": levenshtein,
+            "Avg. Levenshtein ±": levenshtein_margin,
+            "Confidence (%)": self.confidence * 100,
+            "Corpus Lines": self.sample.population,
+        }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import random
+import contextlib
+from pathlib import Path
+
+# Per-line latencies kept per stage for percentiles, exact up to this many lines
+LATENCY_SAMPLE_SIZE = 100_000
+
+PERCENTILES = (50, 95, 99)
+
+
+class _Stage:
+    """Totals and a bounded latency sample of one stage"""
+
+    def __init__(self, rng):
+        self.seconds = 0.0
+        self.lines = 0
+        self.chars = 0
+        self.measurements = 0
+        self.latencies = []
+        self._rng = rng
+
+    def add(self, seconds, lines, chars):
+        self.seconds += seconds
+        self.lines += lines
+        self.chars += chars
+        if not lines:
+            return
+        # Reservoir sample of per-line latencies, a measurement covering several lines counts as their average
+        latency = seconds / lines
+        self.measurements += 1
+        if len(self.latencies) < LATENCY_SAMPLE_SIZE:
+            self.latencies.append(latency)
+        else:
+            slot = self._rng.randrange(self.measurements)
+            if slot < LATENCY_SAMPLE_SIZE:
+                self.latencies[slot] = latency
+
+
+def _percentile(sorted_values, percentile):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-percentile * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class StageTimer:
+    """
+    Wall time, throughput and per-line latency of the stages of a run
+
+    Stages may be nested, e.g. reading input while transliteration pulls from a
+    stream. Time spent in an inner stage is only counted for that stage, so the
+    seconds of all stages add up to the time measured.
+    """
+
+    def __init__(self, seed=0):
+        self.stages = {}
+        self.start_time = time.perf_counter()
+        self._rng = random.Random(seed)
+        self._open = []
+
+    def _stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = _Stage(self._rng)
+        return self.stages[name]
+
+    def _begin(self):
+        self._open.append(0.0)
+        return time.perf_counter()
+
+    def _end(self, name, start, lines, chars):
+        elapsed = time.perf_counter() - start
+        nested = self._open.pop()
+        if self._open:
+            self._open[-1] += elapsed
+        self._stage(name).add(elapsed - nested, lines, chars)
+
+    @contextlib.contextmanager
+    def measure(self, name, lines=0, chars=0):
+        """Time a block of work covering the given number of lines and characters"""
+        start = self._begin()
+        try:
+            yield
+        finally:
+            self._end(name, start, lines, chars)
+
+    def timed(self, iterable, name):
+        """
+        Wrap an iterable so that producing each item is timed as one line of a stage
+
+        Yields:
+            The items of iterable
+        """
+        iterator = iter(iterable)
+        while True:
+            start = self._begin()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._end(name, start, 0, 0)
+                return
+            except BaseException:
+                self._end(name, start, 0, 0)
+                raise
+            self._end(name, start, 1, len(item) if isinstance(item, str) else 0)
+            yield item
+
+    def summary(self):
+        """
+        Summarize all stages
+
+        Returns:
+            Dictionary of stage name to seconds, lines, chars, lines/sec, chars/sec
+            and per-line latency percentiles in milliseconds
+        """
+        summary = {}
+        for name, stage in self.stages.items():
+            latencies = sorted(stage.latencies)
+            summary[name] = {
+                "seconds": stage.seconds,
+                "lines": stage.lines,
+                "chars": stage.chars,
+                "lines_per_sec": stage.lines / stage.seconds if stage.seconds > 0 else 0,
+                "chars_per_sec": stage.chars / stage.seconds if stage.seconds > 0 else 0,
+                "latency_ms": {f"p{percentile}": _percentile(latencies, percentile) * 1000
+                               for percentile in PERCENTILES},
+            }
+        return summary
+
+    def format_summary(self):
+        """Format the summary as one line per stage for printing"""
+        lines = []
+        for name, stage in self.summary().items():
+            latency = stage["latency_ms"]
+            lines.append(f"  {name:<10} {stage['seconds']:8.2f} s  {stage['lines_per_sec']:10.1f} lines/s  "
+                         f"{stage['chars_per_sec']:12.1f} chars/s  p50 {latency['p50']:.3f} ms  "
+                         f"p95 {latency['p95']:.3f} ms  p99 {latency['p99']:.3f} ms")
+        return "\n".join(lines)
+
+    def write_json(self, path, **context):
+        """
+        Write the summary as JSON
+
+        Args:
+            path: Output file
+            **context: Extra top-level fields, such as system and script
+        """
+        data = dict(context)
+        data["total_seconds"] = time.perf_counter() - self.start_time
+        data["stages"] = self.summary()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return path
@@ -1,50 +1,28 @@
-import difflib
 from typing import List, Tuple, Dict
 import unicodedata
-import pandas as pd
-import requests
 import argparse
 import sys
 from pathlib import Path
 import os
+import time
 import re
 import html
-
-# Attempt to import transliteration libraries
-try:
-    from indic_transliteration import sanscript
-    # Import the constants directly from sanscript
-    from indic_transliteration.sanscript import SCHEMES as SANSCRIPT_SCHEMES
-
-    # Define the constants we need
-    IAST = sanscript.IAST
-    DEVANAGARI = sanscript.DEVANAGARI
-    TELUGU = sanscript.TELUGU
-    indic_transliterate = sanscript.transliterate
-except ImportError:
-    indic_transliterate = None
-
-try:
-    from aksharamukha.transliterate import AksharamukhaTransliterator
-except ImportError:
-    AksharamukhaTransliterator = None
-
-
-# Levenshtein distance (custom implementation to avoid dependencies)
-def levenshtein_distance(a: str, b: str) -> int:
-    dp = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
-    for i in range(len(a) + 1):
-        for j in range(len(b) + 1):
-            if i == 0:
-                dp[i][j] = j
-            elif j == 0:
-                dp[i][j] = i
-            elif a[i - 1] == b[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1]
-            else:
-                dp[i][j] = 1 + min(dp[i - 1][j], dp[i][j - 1], dp[i - 1][j - 1])
-    return dp[len(a)][len(b)]
-
+import random
+from collections import Counter
+
+from transliterator import get_engine
+from result_cache import TransliterationCache, get_cache_path, DEFAULT_MAX_ENTRIES
+from metrics import (LineAlignment, MetricsAccumulator, DiffSampler, compute_batch_metrics, levenshtein_distance,
+                     DEFAULT_TOP_K)
+from html_report import ShardedHTMLReport, generate_html_diff, DEFAULT_PAGE_SIZE, REPORT_STYLE
+from line_results import LineResultsWriter
+from deduplicate_dataset import dedup_summary
+from sampling import (StratifiedSample, SimpleRandomSample, StratifiedEstimator, DEFAULT_BLOCK_LINES,
+                      DEFAULT_CONFIDENCE, DEFAULT_MIN_LINES, DEFAULT_CHECK_INTERVAL)
+from confusion import ConfusionCounter
+
+# Number of lines transliterated before they are scored and reported together
+EVALUATION_CHUNK_SIZE = 1000
 
 # Unicode blocks for validation
 UNICODE_BLOCKS = {
@@ -62,6 +40,7 @@ def is_valid_unicode_block(text: str, block_range: Tuple[int, int]) -> bool:
 # Wrapper for Google Transliterate API (requires internet)
 def google_transliterate(text: str, lang_code: str) -> str:
     try:
+        import requests
         url = "https://inputtools.google.com/request?itc=" + lang_code + "-t-iast"
         payload = {"text": [text]}
         response = requests.post(url, json=payload)
@@ -76,17 +55,23 @@ def google_transliterate(text: str, lang_code: str) -> str:
 # Transliteration dispatcher
 def transliterate_text(text: str, src: str, tgt: str, system: str) -> str:
     try:
-        if system == "indic_transliteration" and indic_transliterate is not None:
-            if tgt == "Devanagari":
-                return indic_transliterate(text, IAST, DEVANAGARI)
-            elif tgt == "Telugu":
-                return indic_transliterate(text, IAST, TELUGU)
-            else:
+        if system == "indic_transliteration":
+            if tgt not in ("Devanagari", "Telugu"):
                 return text  # Sharada not supported
+            engine = get_engine(system, "IAST", tgt)
+            if engine is not None:
+                return engine(text)
 
-        elif system == "aksharamukha" and AksharamukhaTransliterator:
-            transliterator = AksharamukhaTransliterator("IAST", tgt)
-            return transliterator.transliterate(text)
+        elif system == "aksharamukha":
+            engine = get_engine(system, "IAST", tgt)
+            if engine is not None:
+                return engine(text)
+
+        elif system == "fast":
+            engine = get_engine(system, "IAST", tgt)
+            if engine is None:
+                return text  # Only Devanagari, Telugu and Sharada are supported
+            return engine(text)
 
         elif system == "google":
             lang_map = {"Devanagari": "hi", "Telugu": "te"}
@@ -101,17 +86,23 @@ def transliterate_text(text: str, src: str, tgt: str, system: str) -> str:
 # Reverse transliteration dispatcher
 def reverse_transliterate_text(text: str, src: str, tgt: str, system: str) -> str:
     try:
-        if system == "indic_transliteration" and indic_transliterate is not None:
-            if src == "Devanagari":
-                return indic_transliterate(text, DEVANAGARI, IAST)
-            elif src == "Telugu":
-                return indic_transliterate(text, TELUGU, IAST)
-            else:
+        if system == "indic_transliteration":
+            if src not in ("Devanagari", "Telugu"):
                 return text
-
-        elif system == "aksharamukha" and AksharamukhaTransliterator:
-            transliterator = AksharamukhaTransliterator(src, "IAST")
-            return transliterator.transliterate(text)
+            engine = get_engine(system, src, "IAST")
+            if engine is not None:
+                return engine(text)
+
+        elif system == "aksharamukha":
+            engine = get_engine(system, src, "IAST")
+            if engine is not None:
+                return engine(text)
+
+        elif system == "fast":
+            engine = get_engine(system, src, "IAST")
+            if engine is None:
+                return text
+            return engine(text)
 
         elif system == "google":
             return text  # Google API does not support reverse transliteration
@@ -121,17 +112,41 @@ def reverse_transliterate_text(text: str, src: str, tgt: str, system: str) -> st
         return text
 
 
+# Whether the dispatchers above hand a script pair to a shared engine
+def _is_cacheable(system: str, script: str) -> bool:
+    if system == "indic_transliteration":
+        return script in ("Devanagari", "Telugu")
+    if system in ("aksharamukha", "fast"):
+        return get_engine(system, "IAST", script) is not None
+    return False
+
+
+# Run a dispatcher, serving results from the persistent cache when possible
+def cached_transliterate(dispatcher, cache, text: str, src: str, tgt: str, system: str) -> str:
+    script = tgt if src == "IAST" else src
+    if cache is None or not _is_cacheable(system, script):
+        return dispatcher(text, src, tgt, system)
+
+    result = cache.get(text, system, src, tgt)
+    if result is None:
+        result = dispatcher(text, src, tgt, system)
+        if result is not None:
+            cache.put(text, result, system, src, tgt)
+    return result
+
+
 # Enhanced diff generator for console output
-def print_console_diff(original: str, converted: str, script_text: str = ""):
+def print_console_diff(original: str, converted: str, script_text: str = "", opcodes: List = None):
     """Print a formatted diff to the console with improved readability."""
-    # Find differences at character level
-    matcher = difflib.SequenceMatcher(None, original, converted)
+    # Find differences at character level, unless the alignment is already known
+    if opcodes is None:
+        opcodes = LineAlignment(original, converted).opcodes
 
     # Format strings for console display
     original_formatted = ""
     converted_formatted = ""
 
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in opcodes:
         if tag == 'equal':
             original_formatted += original[i1:i2]
             converted_formatted += converted[j1:j2]
@@ -154,71 +169,6 @@ def print_console_diff(original: str, converted: str, script_text: str = ""):
     print("=" * 80)
 
 
-# Generate improved HTML diff
-def generate_html_diff(original: str, converted: str, script_text: str = "") -> str:
-    """Create a properly formatted HTML diff with improved highlighting for changes."""
-    import html as html_module  # Import with different name to avoid conflict
-    matcher = difflib.SequenceMatcher(None, original, converted)
-
-    # Create an HTML fragment for the diff
-    html_output = f"""
-    <div class="diff-row">
-        <div class="diff-cell">
-            <div class="diff-label">Original IAST</div>
-            <div class="diff-content original-text">
-    """
-
-    # Process original text with word-level diff highlighting
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        if tag == 'equal':
-            html_output += f'<span class="equal">{html_module.escape(original[i1:i2])}</span>'
-        elif tag == 'delete':
-            html_output += f'<span class="delete">{html_module.escape(original[i1:i2])}</span>'
-        elif tag == 'replace':
-            html_output += f'<span class="delete">{html_module.escape(original[i1:i2])}</span>'
-        # We ignore 'insert' in the original text
-
-    html_output += """
-            </div>
-        </div>
-    """
-
-    # Only add script text if provided
-    if script_text:
-        html_output += f"""
-        <div class="diff-cell">
-            <div class="diff-label">Script Text</div>
-            <div class="diff-content script-text">
-                {html_module.escape(script_text)}
-            </div>
-        </div>
-        """
-
-    html_output += f"""
-        <div class="diff-cell">
-            <div class="diff-label">Back-Converted IAST</div>
-            <div class="diff-content converted-text">
-    """
-
-    # Process converted text
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        if tag == 'equal':
-            html_output += f'<span class="equal">{html_module.escape(converted[j1:j2])}</span>'
-        elif tag == 'insert':
-            html_output += f'<span class="insert">{html_module.escape(converted[j1:j2])}</span>'
-        elif tag == 'replace':
-            html_output += f'<span class="insert">{html_module.escape(converted[j1:j2])}</span>'
-        # We ignore 'delete' in the converted text
-
-    html_output += """
-            </div>
-        </div>
-    </div>
-    """
-
-    return html_output
-
-
 # Generate CSV format for comparison
 def generate_csv_row(original: str, converted: str, script_text: str = "") -> str:
     """Generate a CSV row for the comparison."""
@@ -231,7 +181,13 @@ def generate_csv_row(original: str, converted: str, script_text: str = "") -> st
 
 # Evaluation function with multiple output formats
 def evaluate_system(corpus: List[str], script: str, system: str, output_dir: str = None,
-                    output_format: str = "html", verbose: bool = False) -> Dict:
+                    output_format: str = "html", verbose: bool = False, cache=None,
+                    page_size: int = DEFAULT_PAGE_SIZE, diff_sample_size: int = None,
+                    diff_top_k: int = DEFAULT_TOP_K, line_results: bool = False, source_file: str = "",
+                    sample: StratifiedSample = None, confidence: float = DEFAULT_CONFIDENCE,
+                    target_margin: float = None, min_lines: int = DEFAULT_MIN_LINES,
+                    check_interval: int = DEFAULT_CHECK_INTERVAL, seed: int = 0, dedup: bool = False,
+                    confusion: bool = False) -> Dict:
     """
     Evaluate a transliteration system with multiple output formats.
 
@@ -242,395 +198,213 @@ def evaluate_system(corpus: List[str], script: str, system: str, output_dir: str
         output_dir: Directory to save output files
         output_format: Output format (html, csv, console, all)
         verbose: Whether to print detailed results to console
+        cache: Optional TransliterationCache holding results of earlier runs
+        page_size: Number of diffs per page of the HTML report
+        diff_sample_size: Only report a random sample of this many diffs, plus the diff_top_k
+            diffs with the largest edit distance (all diffs if None)
+        diff_top_k: Number of worst diffs reported when sampling
+        line_results: Write a columnar table with the metrics of every line to output_dir, with
+            the number of occurrences of every line when deduplicating and the file and line
+            number of every line of a sample
+        source_file: Name of the file the corpus was read from, stored in the per-line table
+        sample: StratifiedSample the corpus was drawn with, the metrics are then corpus-level
+            estimates with confidence intervals
+        confidence: Confidence level of the estimates from a sample
+        target_margin: Evaluate the lines in random order and stop once the confidence margins
+            of exact matches and char accuracy are both below this many percentage points
+        min_lines: With target_margin, number of lines evaluated before stopping is considered
+        check_interval: With target_margin, number of lines evaluated between two checks
+        seed: Random seed of the evaluation order with target_margin
+        dedup: Transliterate and score every distinct line once, weighting the metrics by how
+            often it occurs, so they equal those of a full run
+        confusion: Count the substituted, inserted and deleted characters and IAST letters of all
+            differing lines and write them as CSV to output_dir
 
     Returns:
         Dictionary with evaluation metrics
     """
-    exact_matches = 0
-    total_chars = 0
-    correct_chars = 0
-    levenshtein_sum = 0
     valid_unicode_count = 0
-    diffs = []
-
-    # Prepare CSV output if needed
-    csv_content = ""
-    if output_format in ["csv", "all"]:
-        csv_content = "Original IAST,Script Text,Back-Converted IAST\n"
-
-    # Process each line in the corpus
-    for line in corpus:
-        line = line.strip()
-        if not line:
-            continue
-
-        # Transliterate IAST to target script
-        script_text = transliterate_text(line, "IAST", script, system)
-        if script_text is None:
-            script_text = ""
-
-        # Reverse transliteration back to IAST
-        round_trip_iast = reverse_transliterate_text(script_text, script, "IAST", system)
-        if round_trip_iast is None:
-            round_trip_iast = ""
-
-        # Exact match check
-        if line == round_trip_iast:
-            exact_matches += 1
-
-        # Character-level match
-        sm = difflib.SequenceMatcher(None, line, round_trip_iast)
-        correct_chars += sum(match.size for match in sm.get_matching_blocks())
-        total_chars += max(len(line), len(round_trip_iast))
-
-        # Levenshtein distance
-        lev = levenshtein_distance(line, round_trip_iast)
-        levenshtein_sum += lev
-
-        # Unicode block validation
-        if script_text and is_valid_unicode_block(script_text, UNICODE_BLOCKS.get(script, (0, 0x10FFFF))):
-            valid_unicode_count += 1
-
-        # Add to diffs if there are differences
-        if line != round_trip_iast:
-            diffs.append((line, script_text, round_trip_iast))
-
-            # Print console diff if verbose
-            if verbose and output_format in ["console", "all"]:
-                print_console_diff(line, round_trip_iast, script_text)
-
-            # Add to CSV output
-            if output_format in ["csv", "all"]:
-                csv_content += generate_csv_row(line, round_trip_iast, script_text)
-
-    # Generate and save outputs
+    start_time = time.perf_counter()
+
+    # Estimates with confidence intervals, for a sample or while stopping early
+    estimator = None
+    order = range(len(corpus))
+    if target_margin is not None:
+        order = list(order)
+        random.Random(seed).shuffle(order)
+    if sample is not None or target_margin is not None:
+        population = sum(1 for line in corpus if line.strip())
+        estimator = StratifiedEstimator(sample if sample is not None else SimpleRandomSample(population),
+                                        confidence)
+    stopped_early = False
+
+    # Number of occurrences of every distinct line not evaluated yet
+    counts = None
+    if dedup and estimator is not None:
+        print("Warning: dedup is ignored when sampling or stopping early")
+    elif dedup:
+        counts = Counter(line.strip() for line in corpus if line.strip())
+        weights = list(counts.values())
+
+    # Reports are written to disk as the diffs are found
+    report = None
+    csv_file = None
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
-
-        # Generate HTML output
-        if output_format in ["html", "all"] and diffs:
-            html_content = generate_html_report(corpus, script, system, diffs)
-
-            html_filename = os.path.join(output_dir, f"diff_{system}_{script}.html")
-            with open(html_filename, "w", encoding="utf-8") as f:
-                f.write(html_content)
-            print(f"HTML diff report saved to {html_filename}")
-
-        # Save CSV output
+        if output_format in ["html", "all"]:
+            report = ShardedHTMLReport(os.path.join(output_dir, f"diff_{system}_{script}.html"),
+                                       f"Transliteration Report: {system} for {script}", page_size, REPORT_STYLE)
         if output_format in ["csv", "all"]:
             csv_filename = os.path.join(output_dir, f"diff_{system}_{script}.csv")
-            with open(csv_filename, "w", encoding="utf-8") as f:
-                f.write(csv_content)
-            print(f"CSV diff report saved to {csv_filename}")
+            csv_file = open(csv_filename, "w", encoding="utf-8")
+            csv_file.write("Original IAST,Script Text,Back-Converted IAST\n")
+    confusion_counter = ConfusionCounter() if confusion and output_dir else None
+    line_writer = None
+    if line_results and output_dir:
+        line_writer = LineResultsWriter(os.path.join(output_dir, f"lines_{system}_{script}"), source_file,
+                                        system, script)
+    # Sampled lines are stored in the per-line table with their place in the corpus
+    origins = sample.origins() if sample is not None and line_writer is not None else None
+    # With a sample size, only a bounded sample of the differing lines is kept until the end
+    sampler = DiffSampler(diff_sample_size, diff_top_k, seed=0) if diff_sample_size is not None else None
+
+    def write_diff(line, script_text, round_trip_iast, opcodes):
+        # Print console diff if verbose
+        if verbose and output_format in ["console", "all"]:
+            print_console_diff(line, round_trip_iast, script_text, opcodes)
+
+        if report is not None:
+            report.add(line, round_trip_iast, script_text, opcodes)
+        if csv_file is not None:
+            csv_file.write(generate_csv_row(line, round_trip_iast, script_text))
+
+    def report_chunk(scored):
+        for line_id, seconds, script_text, alignment, weight in scored:
+            if line_writer is not None:
+                row_source, row_id = origins[line_id] if origins is not None else (None, line_id)
+                line_writer.add(row_id, len(alignment.original), len(alignment.converted), alignment.exact,
+                                alignment.levenshtein, alignment.matching_chars, seconds, weight, row_source)
+            if alignment.exact:
+                continue
+            if confusion_counter is not None:
+                confusion_counter.add(alignment.original, alignment.converted, alignment.opcodes, line_id, weight)
+            if sampler is not None:
+                sampler.add(line_id, alignment.original, alignment.converted, script_text, alignment.opcodes,
+                            alignment.levenshtein, weight)
+            else:
+                write_diff(alignment.original, script_text, alignment.converted, alignment.opcodes)
+
+    # Lines are scored and reported in chunks, early stopping is checked after each one
+    chunk_size = check_interval if target_margin is not None else EVALUATION_CHUNK_SIZE
+    metrics = MetricsAccumulator()
+    chunk = []
+
+    try:
+        # Process each line in the corpus
+        for line_id in order:
+            line = corpus[line_id].strip()
+            if not line:
+                continue
+            weight = 1
+            if counts is not None:
+                # Later occurrences were counted with the first one
+                weight = counts.pop(line, 0)
+                if not weight:
+                    continue
+            line_start_time = time.perf_counter()
+
+            # Transliterate IAST to target script
+            script_text = cached_transliterate(transliterate_text, cache, line, "IAST", script, system)
+            if script_text is None:
+                script_text = ""
+
+            # Reverse transliteration back to IAST
+            round_trip_iast = cached_transliterate(reverse_transliterate_text, cache, script_text, script, "IAST",
+                                                   system)
+            if round_trip_iast is None:
+                round_trip_iast = ""
+
+            # Unicode block validation
+            if script_text and is_valid_unicode_block(script_text, UNICODE_BLOCKS.get(script, (0, 0x10FFFF))):
+                valid_unicode_count += weight
+
+            chunk.append((line_id, time.perf_counter() - line_start_time, line, script_text, round_trip_iast,
+                          weight))
+            if len(chunk) < chunk_size:
+                continue
+            report_chunk(_score_chunk(chunk, metrics, estimator))
+            chunk = []
+            if (target_margin is not None and metrics.lines >= min_lines
+                    and _margins_reached(estimator.estimates(), target_margin)):
+                stopped_early = metrics.lines < population
+                break
+        report_chunk(_score_chunk(chunk, metrics, estimator))
+        evaluation_seconds = time.perf_counter() - start_time
+
+        if sampler is not None:
+            for _, line, round_trip_iast, script_text, opcodes, _ in sampler.diffs():
+                write_diff(line, script_text, round_trip_iast, opcodes)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if line_writer is not None:
+            line_writer.close()
+
+    if confusion_counter is not None:
+        confusion_file = confusion_counter.write_csv(os.path.join(output_dir, f"confusion_{system}_{script}.csv"))
+        print(f"Edit counts saved to {confusion_file}")
+
+    if line_writer is not None:
+        print(f"Per-line results saved to {line_writer.path}")
 
     # Calculate final statistics
-    num_lines = len([line for line in corpus if line.strip()])
-    if num_lines == 0:
-        return {
-            "Script": script,
-            "System": system,
-            "Lines": 0,
-            "Exact Matches (%)": 0,
-            "Char Accuracy (%)": 0,
-            "Avg. Levenshtein": 0,
-            "Valid Unicode Lines (%)": 0,
-        }
-
-    return {
-        "Script": script,
-        "System": system,
-        "Lines": num_lines,
-        "Exact Matches (%)": (exact_matches / num_lines) * 100,
-        "Char Accuracy (%)": (correct_chars / total_chars) * 100 if total_chars > 0 else 0,
-        "Avg. Levenshtein": levenshtein_sum / num_lines,
-        "Valid Unicode Lines (%)": (valid_unicode_count / num_lines) * 100,
-    }
-
-
-# Generate a complete HTML report
-def generate_html_report(corpus: List[str], script: str, system: str, diffs: List[Tuple[str, str, str]]) -> str:
-    """Generate a complete HTML report with summary and detailed diffs."""
-    # Calculate statistics for summary
-    num_lines = len([line for line in corpus if line.strip()])
-    exact_matches = num_lines - len(diffs)
-
-    # Create the HTML document with improved styling
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Transliteration Report: {system} for {script}</title>
-    <style>
-        :root {{
-            --primary-color: #2563eb;
-            --secondary-color: #f3f4f6;
-            --success-color: #10b981;
-            --danger-color: #ef4444;
-            --warning-color: #f59e0b;
-            --text-dark: #1f2937;
-            --text-light: #6b7280;
-            --border-color: #e5e7eb;
-        }}
-
-        * {{
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif;
-            line-height: 1.6;
-            color: var(--text-dark);
-            background-color: #f9fafb;
-            padding: 2rem;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 1.5rem;
-            background-color: white;
-            border-radius: 0.5rem;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-        }}
-
-        h1, h2, h3 {{
-            color: var(--primary-color);
-            margin-bottom: 1rem;
-        }}
-
-        h1 {{
-            font-size: 1.875rem;
-            border-bottom: 2px solid var(--border-color);
-            padding-bottom: 0.75rem;
-            margin-bottom: 1.5rem;
-        }}
-
-        h2 {{
-            font-size: 1.5rem;
-            margin-top: 2rem;
-            border-bottom: 1px solid var(--border-color);
-            padding-bottom: 0.5rem;
-        }}
-
-        h3 {{
-            font-size: 1.25rem;
-            margin-top: 1.5rem;
-        }}
-
-        p {{
-            margin-bottom: 1rem;
-        }}
-
-        .summary {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }}
-
-        .stat-card {{
-            flex: 1;
-            min-width: 200px;
-            padding: 1rem;
-            background-color: white;
-            border-radius: 0.5rem;
-            box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px 0 rgba(0, 0, 0, 0.06);
-            border-left: 4px solid var(--primary-color);
-        }}
-
-        .stat-card.success {{
-            border-left-color: var(--success-color);
-        }}
-
-        .stat-card.warning {{
-            border-left-color: var(--warning-color);
-        }}
-
-        .stat-card.danger {{
-            border-left-color: var(--danger-color);
-        }}
-
-        .stat-value {{
-            font-size: 1.5rem;
-            font-weight: bold;
-            margin-bottom: 0.25rem;
-        }}
-
-        .stat-label {{
-            color: var(--text-light);
-            font-size: 0.875rem;
-        }}
-
-        .diff-container {{
-            margin-bottom: 2rem;
-            border: 1px solid var(--border-color);
-            border-radius: 0.5rem;
-            overflow: hidden;
-        }}
-
-        .diff-row {{
-            display: flex;
-            flex-wrap: wrap;
-            border-bottom: 1px solid var(--border-color);
-            background-color: white;
-        }}
-
-        .diff-row:last-child {{
-            border-bottom: none;
-        }}
-
-        .diff-cell {{
-            flex: 1;
-            min-width: 250px;
-            padding: 1rem;
-            border-right: 1px solid var(--border-color);
-        }}
-
-        .diff-cell:last-child {{
-            border-right: none;
-        }}
-
-        .diff-label {{
-            font-weight: bold;
-            margin-bottom: 0.5rem;
-            color: var(--text-light);
-            font-size: 0.875rem;
-        }}
-
-        .diff-content {{
-            font-family: 'Courier New', monospace;
-            white-space: pre-wrap;
-            word-break: break-word;
-            padding: 0.75rem;
-            background-color: #f9fafb;
-            border-radius: 0.25rem;
-            font-size: 0.875rem;
-            overflow-x: auto;
-        }}
-
-        .script-text {{
-            font-size: 1.25rem;
-            font-family: Arial, sans-serif;
-        }}
-
-        /* Highlighting for diffs */
-        .equal {{
-            color: var(--text-dark);
-        }}
-
-        .delete {{
-            background-color: #fee2e2;
-            color: var(--danger-color);
-            text-decoration: line-through;
-            padding: 0 2px;
-            border-radius: 2px;
-        }}
-
-        .insert {{
-            background-color: #d1fae5;
-            color: var(--success-color);
-            padding: 0 2px;
-            border-radius: 2px;
-        }}
-
-        .empty-result {{
-            padding: 2rem;
-            text-align: center;
-            color: var(--text-light);
-            font-style: italic;
-        }}
-
-        .navigation {{
-            display: flex;
-            justify-content: space-between;
-            margin-top: 2rem;
-            padding-top: 1rem;
-            border-top: 1px solid var(--border-color);
-        }}
-
-        .filters {{
-            margin-bottom: 1.5rem;
-            padding: 1rem;
-            background-color: var(--secondary-color);
-            border-radius: 0.5rem;
-        }}
-
-        /* Responsive adjustments */
-        @media (max-width: 768px) {{
-            .diff-row {{
-                flex-direction: column;
-            }}
-
-            .diff-cell {{
-                border-right: none;
-                border-bottom: 1px solid var(--border-color);
-            }}
-
-            .diff-cell:last-child {{
-                border-bottom: none;
-            }}
-
-            .stat-card {{
-                min-width: 100%;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Transliteration Comparison Report</h1>
-
-        <div class="filters">
-            <p><strong>System:</strong> {system}</p>
-            <p><strong>Target Script:</strong> {script}</p>
-            <p><strong>Total Samples:</strong> {num_lines}</p>
-        </div>
-
-        <div class="summary">
-            <div class="stat-card ${exact_matches == num_lines and 'success' or exact_matches == 0 and 'danger' or 'warning'}">
-                <div class="stat-value">{exact_matches / num_lines * 100:.1f}%</div>
-                <div class="stat-label">Exact Matches</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">{len(diffs)}</div>
-                <div class="stat-label">Differences Found</div>
-            </div>
-        </div>
-
-        <h2>Detailed Comparison</h2>
-
-        <p>Below are all the texts that showed differences between the original IAST and the back-converted text after transliteration.</p>
-
-        <div class="diff-container">
-"""
-
-    # Add each diff to the report
-    if diffs:
-        for i, (original, script_text, converted) in enumerate(diffs):
-            html_content += generate_html_diff(original, converted, script_text)
-    else:
-        html_content += """
-            <div class="empty-result">
-                <p>Perfect match! No differences found between original and back-converted text.</p>
-            </div>
-"""
+    result = metrics.result(script, system)
+    result["Valid Unicode Lines (%)"] = (valid_unicode_count / metrics.lines) * 100 if metrics.lines else 0
+    if estimator is not None:
+        result.update(estimator.estimates())
+    if target_margin is not None:
+        result["Stopped Early"] = stopped_early
+    if counts is not None:
+        result.update(dedup_summary(weights, evaluation_seconds))
+
+    if report is not None:
+        html_filename = report.close(dict(result, **sampler.summary()) if sampler is not None else result)
+        if html_filename:
+            print(f"HTML diff report saved to {html_filename} ({report.page_count} pages)")
+    if csv_file is not None:
+        print(f"CSV diff report saved to {csv_filename}")
+
+    return result
+
+
+def _score_chunk(chunk, metrics, estimator=None):
+    """
+    Align the round trips of a chunk of evaluated lines and add them to the metrics
+
+    Args:
+        chunk: List of (line_id, seconds, line, script_text, round_trip, weight) tuples
+        metrics: MetricsAccumulator the lines are added to, weight times each
+        estimator: Optional StratifiedEstimator the lines are added to as well
 
-    # Close the HTML document
-    html_content += """
-        </div>
+    Returns:
+        List of (line_id, seconds, script_text, alignment, weight) tuples
+    """
+    batch = compute_batch_metrics([(line, round_trip_iast) for _, _, line, _, round_trip_iast, _ in chunk],
+                                  [weight for *_, weight in chunk])
+    metrics.add_batch(batch)
+    scored = []
+    for (line_id, seconds, _, script_text, _, weight), alignment in zip(chunk, batch["alignments"]):
+        if estimator is not None:
+            estimator.add(line_id, alignment.exact, alignment.matching_chars, alignment.total_chars,
+                          alignment.levenshtein)
+        scored.append((line_id, seconds, script_text, alignment, weight))
+    return scored
 
-        <div class="navigation">
-            <p>Generated on: <script>document.write(new.txt Date().toLocaleString());</script></p>
-        </div>
-    </div>
-</body>
-</html>
-"""
 
-    return html_content
+def _margins_reached(estimates, target_margin):
+    """Whether the exact match and char accuracy margins are both within target_margin percentage points"""
+    return (estimates["Exact Matches ± (%)"] <= target_margin
+            and estimates["Char Accuracy ± (%)"] <= target_margin)
 
 
 # Read file contents into a list
@@ -682,16 +456,39 @@ def parse_input_text(text: str) -> List[str]:
 
 def main():
     parser = argparse.ArgumentParser(description="Enhanced Transliteration System Evaluator")
-    parser.add_argument("--input-file", help="Input file containing IAST text (one line per entry)")
+    parser.add_argument("--input-file", help="Input file containing IAST text (one line per entry), "
+                                             "or a directory of texts when sampling")
     parser.add_argument("--input-text", help="Direct text input containing IAST text")
     parser.add_argument("--script", default="Devanagari",
                         choices=["Devanagari", "Telugu", "Sharada"],
                         help="Target script for transliteration")
     parser.add_argument("--system", default=None,
-                        choices=["indic_transliteration", "aksharamukha", "google"],
+                        choices=["indic_transliteration", "aksharamukha", "fast", "google"],
                         help="Transliteration system to evaluate (evaluates all if not specified)")
     parser.add_argument("--max-lines", type=int, default=None,
                         help="Maximum number of lines to process")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Evaluate a stratified random sample of this many lines and estimate the "
+                             "corpus-level metrics with confidence intervals")
+    parser.add_argument("--sample-fraction", type=float, default=None,
+                        help="Evaluate a stratified random sample of this fraction of the lines")
+    parser.add_argument("--sample-seed", type=int, default=0,
+                        help="Random seed for sampling and for the evaluation order with --target-margin")
+    parser.add_argument("--sample-block-lines", type=int, default=DEFAULT_BLOCK_LINES,
+                        help="Lines per stratum when sampling a single file, a directory is stratified by text")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help="Confidence level of the intervals of sampled runs (default 0.95)")
+    parser.add_argument("--target-margin", type=float, default=None,
+                        help="Evaluate lines in random order and stop once the confidence margins of exact "
+                             "matches and char accuracy are below this many percentage points")
+    parser.add_argument("--min-lines", type=int, default=DEFAULT_MIN_LINES,
+                        help="With --target-margin, number of lines evaluated before stopping early")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Transliterate and score every distinct line once, weighting the metrics by how "
+                             "often it occurs")
+    parser.add_argument("--confusion", action="store_true",
+                        help="Count the substituted, inserted and deleted characters and IAST letters of all "
+                             "differing lines and save them as a CSV table")
     parser.add_argument("--output-dir", default="results",
                         help="Directory to save result files")
     parser.add_argument("--output-format", default="all",
@@ -699,6 +496,18 @@ def main():
                         help="Output format for comparison results")
     parser.add_argument("--verbose", action="store_true",
                         help="Print detailed results to console")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="Number of diffs per page of the HTML report")
+    parser.add_argument("--diff-sample-size", type=int, default=None,
+                        help="Only report a random sample of this many diffs (all if not specified)")
+    parser.add_argument("--diff-top-k", type=int, default=DEFAULT_TOP_K,
+                        help="With --diff-sample-size, also report this many diffs with the largest edit distance")
+    parser.add_argument("--line-results", action="store_true",
+                        help="Write the metrics of every line as a Parquet (or gzipped CSV) table")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse transliterations from earlier runs stored under the output directory")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Maximum number of lines kept in the cache")
 
     args = parser.parse_args()
 
@@ -712,13 +521,23 @@ def main():
     ]
 
     corpus = sample_corpus
+    sample = None
 
     # Use file input if provided
     if args.input_file:
         if not os.path.exists(args.input_file):
             print(f"Error: Input file {args.input_file} does not exist")
             return
-        corpus = read_file_to_list(args.input_file, args.max_lines)
+        if args.sample_size or args.sample_fraction:
+            sample = StratifiedSample(args.input_file, args.sample_size, args.sample_fraction, args.sample_seed,
+                                      args.sample_block_lines)
+            print(sample.describe())
+            corpus = [line.strip() for line in sample.iter_lines()]
+        elif os.path.isdir(args.input_file):
+            print(f"Error: {args.input_file} is a directory, which is only supported when sampling")
+            return
+        else:
+            corpus = read_file_to_list(args.input_file, args.max_lines)
         print(f"Read {len(corpus)} lines from {args.input_file}")
     # Use direct text input if provided
     elif args.input_text:
@@ -729,13 +548,17 @@ def main():
     os.makedirs(args.output_dir, exist_ok=True)
 
     # Default to testing all systems if none specified
-    systems = ["indic_transliteration", "aksharamukha", "google"]
+    systems = ["indic_transliteration", "aksharamukha", "fast", "google"]
     if args.system:
         systems = [args.system]
 
     # Default script is Devanagari
     scripts = [args.script]
 
+    cache = None
+    if args.cache:
+        cache = TransliterationCache(get_cache_path(args.output_dir), args.cache_max_entries)
+
     # Run evaluations
     results = []
     for script in scripts:
@@ -747,11 +570,29 @@ def main():
                 system,
                 output_dir=args.output_dir,
                 output_format=args.output_format,
-                verbose=args.verbose
+                verbose=args.verbose,
+                cache=cache,
+                page_size=args.page_size,
+                diff_sample_size=args.diff_sample_size,
+                diff_top_k=args.diff_top_k,
+                line_results=args.line_results,
+                source_file=args.input_file or "",
+                sample=sample,
+                confidence=args.confidence,
+                target_margin=args.target_margin,
+                min_lines=args.min_lines,
+                seed=args.sample_seed,
+                dedup=args.dedup,
+                confusion=args.confusion
             )
             results.append(result)
 
+    if cache is not None:
+        print(f"Result cache: {cache.format_stats()}")
+        cache.close()
+
     # Display comparison table
+    import pandas as pd
     results_df = pd.DataFrame(results)
     print("\n--- Comparison Table ---")
     print(results_df.to_string(index=False))
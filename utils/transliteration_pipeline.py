@@ -3,8 +3,10 @@ import argparse
 from pathlib import Path
 import time
 import datetime
-from transliterator import transliterate_file, get_available_scripts, get_available_systems
+from result_cache import TransliterationCache, get_cache_path, DEFAULT_MAX_ENTRIES
+from transliterator import transliterate_file, get_available_scripts, get_available_systems, SUPPORTED_SYSTEMS
 from compare_texts import compare_files
+from stage_timer import StageTimer
 
 def create_output_filename(input_file, source_script, target_script, system="aksharamukha", output_dir=None):
     input_path = Path(input_file)
@@ -19,12 +21,20 @@ def create_output_filename(input_file, source_script, target_script, system="aks
     
     return str(output_path / f"{base_name}_{source_script.lower()}_to_{target_script.lower()}_{system}{input_path.suffix}")
 
-def run_transliteration_pipeline(input_file, source_script, target_script, system="aksharamukha", output_dir=None, log_dir=None):
+def run_transliteration_pipeline(input_file, source_script, target_script, system="aksharamukha", output_dir=None, log_dir=None,
+                                 batch_size=1, batch_bytes=None, workers=1, word_cache_size=None,
+                                 use_cache=False, cache_max_entries=DEFAULT_MAX_ENTRIES, timing=False):
+    cache = None
+    timer = StageTimer() if timing else None
     try:
         print(f"Starting transliteration pipeline for {input_file}")
         print(f"Source script: {source_script}")
         print(f"Target script: {target_script}")
         print(f"Transliteration system: {system}")
+        if batch_size > 1:
+            print(f"Batch size: {batch_size} lines")
+        if workers > 1:
+            print(f"Workers: {workers}")
         start_time = time.time()
         
         # Set up directories
@@ -41,6 +51,10 @@ def run_transliteration_pipeline(input_file, source_script, target_script, syste
         os.makedirs(output_dir, exist_ok=True)
         os.makedirs(log_dir, exist_ok=True)
         
+        if use_cache:
+            cache = TransliterationCache(get_cache_path(output_dir), cache_max_entries)
+            print(f"Using transliteration cache {cache.path}")
+        
         # File paths
         input_base = Path(input_file).stem
         transliterated_file = create_output_filename(input_file, source_script, target_script, system, output_dir)
@@ -51,21 +65,38 @@ def run_transliteration_pipeline(input_file, source_script, target_script, syste
         
         # Source to Target script
         print(f"Step 1: Transliterating from {source_script} to {target_script} using {system}...")
-        if not transliterate_file(input_file, transliterated_file, source_script, target_script, system):
+        if not transliterate_file(input_file, transliterated_file, source_script, target_script, system,
+                                  batch_size, batch_bytes, workers,
+                                  word_cache_size=word_cache_size, cache=cache, timer=timer, stage="forward"):
             print(f"Failed to transliterate from {source_script} to {target_script}")
             return False
         
         # Target back to Source script
         print(f"Step 2: Transliterating from {target_script} back to {source_script} using {system}...")
-        if not transliterate_file(transliterated_file, back_to_source_file, target_script, source_script, system):
+        if not transliterate_file(transliterated_file, back_to_source_file, target_script, source_script, system,
+                                  batch_size, batch_bytes, workers,
+                                  word_cache_size=word_cache_size, cache=cache, timer=timer, stage="reverse"):
             print(f"Failed to transliterate from {target_script} back to {source_script}")
             return False
         
         print("Step 3: Comparing original and transliterated text...")
-        if not compare_files(input_file, back_to_source_file, log_file):
+        if timer is not None:
+            with timer.measure("compare"):
+                compared = compare_files(input_file, back_to_source_file, log_file)
+        else:
+            compared = compare_files(input_file, back_to_source_file, log_file)
+        if not compared:
             print("Failed to compare files")
             return False
         
+        if timer is not None:
+            timing_file = timer.write_json(str(Path(log_file).with_suffix("")) + "_timing.json",
+                                           source_script=source_script, target_script=target_script,
+                                           system=system, batch_size=batch_size, batch_bytes=batch_bytes,
+                                           workers=workers, word_cache_size=word_cache_size)
+            print(f"Stage timings:\n{timer.format_summary()}")
+            print(f"Stage timings written to {timing_file}")
+        
         elapsed_time = time.time() - start_time
         print(f"Transliteration pipeline completed in {elapsed_time:.2f} seconds")
         print(f"Results saved to {log_file}")
@@ -74,16 +105,33 @@ def run_transliteration_pipeline(input_file, source_script, target_script, syste
     except Exception as e:
         print(f"Error in transliteration pipeline: {e}")
         return False
+    finally:
+        if cache is not None:
+            cache.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Transliterate text between any two scripts and compare results")
     parser.add_argument("input_file", help="Input file path")
     parser.add_argument("source_script", help="Source script (e.g., IAST, Devanagari, Telugu)")
     parser.add_argument("target_script", help="Target script (e.g., IAST, Devanagari, Telugu)")
-    parser.add_argument("--system", choices=get_available_systems(), default="aksharamukha", 
+    parser.add_argument("--system", choices=SUPPORTED_SYSTEMS, default="aksharamukha", 
                        help="Transliteration system to use")
     parser.add_argument("--output-dir", help="Directory for output files")
     parser.add_argument("--log-dir", help="Directory for log files")
+    parser.add_argument("--batch-size", type=int, default=1,
+                       help="Number of lines sent to the transliteration backend in one call")
+    parser.add_argument("--batch-bytes", type=int, default=None,
+                       help="Maximum number of bytes sent to the transliteration backend in one call")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of worker processes used for transliteration")
+    parser.add_argument("--word-cache-size", type=int, default=None,
+                       help="Transliterate word by word with an LRU cache of this many words")
+    parser.add_argument("--cache", action="store_true",
+                       help="Reuse transliterations from earlier runs stored under the output directory")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                       help="Maximum number of lines kept in the cache")
+    parser.add_argument("--timing", action="store_true",
+                       help="Time every stage and write throughput and latency percentiles as JSON next to the log")
     parser.add_argument("--list-scripts", action="store_true", help="List available scripts")
     parser.add_argument("--list-systems", action="store_true", help="List available transliteration systems")
     
@@ -113,7 +161,14 @@ def main():
         args.target_script,
         args.system,
         args.output_dir,
-        args.log_dir
+        args.log_dir,
+        args.batch_size,
+        args.batch_bytes,
+        args.workers,
+        args.word_cache_size,
+        args.cache,
+        args.cache_max_entries,
+        args.timing
     )
     if not success:
         print("Transliteration pipeline failed")
@@ -1,44 +1,138 @@
 import os
+import re
+import functools
+import itertools
+import importlib.util
 import sys
 import time
 from pathlib import Path
-import requests
-from urllib.parse import quote
+from collections import deque, OrderedDict
+import fast_transliterator
 
-# Try to import all supported transliteration libraries
-try:
-    from aksharamukha import transliterate as aksharamukha_transliterate
-except ImportError:
-    print("Aksharamukha package not found. Installing...")
-    os.system("pip install aksharamukha-python==2.1.1")
+# Systems that can be requested, whether or not their library is installed
+SUPPORTED_SYSTEMS = ["aksharamukha", "indic_transliteration", "fast"]
+
+# Top-level module and pip package of each library-backed system. The
+# libraries are only imported on first use so that --help and small runs
+# start quickly, and they are never installed automatically.
+BACKEND_MODULES = {
+    "aksharamukha": "aksharamukha",
+    "indic_transliteration": "indic_transliteration",
+}
+BACKEND_PACKAGES = {
+    "aksharamukha": "aksharamukha-python==2.1.1",
+    "indic_transliteration": "indic-transliteration",
+}
+
+@functools.lru_cache(maxsize=None)
+def is_backend_available(system):
+    """Check whether the library behind a system is installed, without importing it"""
+    if system not in BACKEND_MODULES:
+        return system == "fast"
+    return importlib.util.find_spec(BACKEND_MODULES[system]) is not None
+
+@functools.lru_cache(maxsize=None)
+def _load_aksharamukha():
+    """Import the aksharamukha transliterate module"""
     from aksharamukha import transliterate as aksharamukha_transliterate
+    return aksharamukha_transliterate
 
-try:
+@functools.lru_cache(maxsize=None)
+def _load_sanscript():
+    """Import the indic-transliteration sanscript module"""
     from indic_transliteration import sanscript
-    INDIC_AVAILABLE = True
-except ImportError:
-    print("Indic-transliteration package not found. Installing...")
-    os.system("pip install indic-transliteration")
-    try:
-        from indic_transliteration import sanscript
-        INDIC_AVAILABLE = True
-    except ImportError:
-        INDIC_AVAILABLE = False
+    return sanscript
 
-def get_available_scripts():
-    """Get all available scripts across all supported libraries"""
+def _report_missing_backend(system):
+    """Tell the user how to install a missing library"""
+    print(f"{system} is not installed. Install it with: pip install {BACKEND_PACKAGES[system]}")
+
+@functools.lru_cache(maxsize=None)
+def _available_scripts():
+    """Collect the script names of all supported libraries once per process"""
     scripts = set()
     
     # Aksharamukha scripts
-    trans = aksharamukha_transliterate.Transliterator()
-    scripts.update(sorted(list(trans.db.keys())))
+    if is_backend_available("aksharamukha"):
+        trans = _load_aksharamukha().Transliterator()
+        scripts.update(trans.db.keys())
     
     # Add Indic-transliteration scripts if available
-    if INDIC_AVAILABLE:
-        for scheme_name in sanscript.SCHEMES:
+    if is_backend_available("indic_transliteration"):
+        for scheme_name in _load_sanscript().SCHEMES:
             scripts.add(scheme_name)
     
-    return sorted(list(scripts))
+    # Scripts of the fast engine
+    scripts.update(fast_transliterator.get_supported_scripts())
+    
+    return tuple(sorted(scripts))
+
+def get_available_scripts():
+    """Get all available scripts across all supported libraries"""
+    return list(_available_scripts())
+
+@functools.lru_cache(maxsize=None)
+def _indic_script_map():
+    """Map script names to Indic-transliteration scheme constants"""
+    sanscript = _load_sanscript()
+    return {
+        "IAST": sanscript.IAST,
+        "Devanagari": sanscript.DEVANAGARI,
+        "Telugu": sanscript.TELUGU,
+        "Bengali": sanscript.BENGALI,
+        "Gujarati": sanscript.GUJARATI,
+        "Kannada": sanscript.KANNADA,
+        "Malayalam": sanscript.MALAYALAM,
+        "Oriya": sanscript.ORIYA,
+        "Tamil": sanscript.TAMIL,
+        # Add more mappings as needed
+    }
+
+# Engines built so far, keyed by (system, source_script, target_script)
+_ENGINES = {}
+
+def _build_engine(system, source_script, target_script):
+    """Build a callable that transliterates text for one system and script pair"""
+    if system in BACKEND_MODULES and not is_backend_available(system):
+        _report_missing_backend(system)
+        return None
+    
+    if system == "aksharamukha":
+        return functools.partial(_load_aksharamukha().process, source_script, target_script)
+    
+    if system == "indic_transliteration":
+        sanscript = _load_sanscript()
+        script_map = _indic_script_map()
+        src = script_map.get(source_script, source_script)
+        tgt = script_map.get(target_script, target_script)
+        
+        # Build the scheme map once instead of on every call
+        if src in sanscript.SCHEMES and tgt in sanscript.SCHEMES:
+            scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[src], sanscript.SCHEMES[tgt])
+            return functools.partial(sanscript.transliterate, scheme_map=scheme_map)
+        return functools.partial(sanscript.transliterate, _from=src, _to=tgt)
+    
+    if system == "fast" and fast_transliterator.is_supported(source_script, target_script):
+        return fast_transliterator.FastTransliterator(source_script, target_script)
+    
+    return None
+
+def get_engine(system, source_script, target_script):
+    """
+    Get the shared engine for a system and script pair, building it on first use
+    
+    Args:
+        system: Transliteration system ("aksharamukha", "indic_transliteration" or "fast")
+        source_script: Source script name
+        target_script: Target script name
+        
+    Returns:
+        A callable taking the text to transliterate, or None if the system is not available
+    """
+    key = (system, source_script, target_script)
+    if key not in _ENGINES:
+        _ENGINES[key] = _build_engine(system, source_script, target_script)
+    return _ENGINES[key]
 
 def transliterate_text(text, source_script, target_script, system="aksharamukha"):
     """
@@ -48,34 +142,18 @@ def transliterate_text(text, source_script, target_script, system="aksharamukha"
         text: The text to transliterate
         source_script: Source script name
         target_script: Target script name
-        system: Transliteration system to use ("aksharamukha", "indic_transliteration", or "google")
+        system: Transliteration system to use ("aksharamukha", "indic_transliteration", "fast", or "google")
         
     Returns:
         Transliterated text or None if an error occurred
     """
     try:
-        if system == "aksharamukha":
-            return aksharamukha_transliterate.process(source_script, target_script, text)
-        
-        elif system == "indic_transliteration" and INDIC_AVAILABLE:
-            # Map script names to Indic-transliteration scheme constants
-            script_map = {
-                "IAST": sanscript.IAST,
-                "Devanagari": sanscript.DEVANAGARI,
-                "Telugu": sanscript.TELUGU,
-                "Bengali": sanscript.BENGALI,
-                "Gujarati": sanscript.GUJARATI,
-                "Kannada": sanscript.KANNADA,
-                "Malayalam": sanscript.MALAYALAM,
-                "Oriya": sanscript.ORIYA,
-                "Tamil": sanscript.TAMIL,
-                # Add more mappings as needed
-            }
-            
-            src = script_map.get(source_script, source_script)
-            tgt = script_map.get(target_script, target_script)
-            
-            return sanscript.transliterate(text, src, tgt)
+        if system in ("aksharamukha", "indic_transliteration", "fast"):
+            engine = get_engine(system, source_script, target_script)
+            if engine is None:
+                print(f"Transliteration system {system} is not available for {source_script} -> {target_script}")
+                return None
+            return engine(text)
         
         elif system == "google":
             # Map script names to Google's language codes
@@ -115,6 +193,7 @@ def transliterate_text(text, source_script, target_script, system="aksharamukha"
                     print(f"Headers: {headers}")
                     print(f"Payload: {payload}")
                     
+                    import requests
                     response = requests.post(url, json=payload, headers=headers)
                     print(f"Response status: {response.status_code}")
                     print(f"Response content: {response.text[:200]}...")
@@ -138,7 +217,422 @@ def transliterate_text(text, source_script, target_script, system="aksharamukha"
         print(f"Error during transliteration with {system}: {e}")
         return None
 
-def transliterate_file(input_file, output_file, source_script, target_script, system="aksharamukha"):
+# Splits a line into words and the runs of whitespace/punctuation between them.
+# The apostrophe (avagraha) is part of a word.
+WORD_SPLIT_PATTERN = re.compile(r'(\s+|[|.,;:!?()\[\]{}"\-\u0964\u0965]+)')
+
+# Number of lines checked before word-level transliteration is trusted for a pair
+WORD_LEVEL_SAMPLE_SIZE = 200
+
+# Result of the word-level check, keyed by (system, source_script, target_script)
+_WORD_LEVEL_VERIFIED = {}
+
+# Number of lines that matched so far for pairs checked on fewer than WORD_LEVEL_SAMPLE_SIZE lines
+_WORD_LEVEL_CHECKED = {}
+
+class WordCache:
+    """
+    Bounded LRU cache of transliterated words
+    
+    Entries are keyed by (system, source_script, target_script, token) and the
+    least recently used entry is evicted once max_size is reached.
+    """
+    
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+    
+    def transliterate_token(self, token, source_script, target_script, system):
+        """Transliterate a single token, serving repeated tokens from the cache"""
+        key = (system, source_script, target_script, token)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        
+        self.misses += 1
+        result = transliterate_text(token, source_script, target_script, system)
+        if result is None:
+            return None
+        
+        self._entries[key] = result
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+    
+    def transliterate_line(self, line, source_script, target_script, system):
+        """Transliterate a line word by word, returns None if an error occurred"""
+        parts = []
+        for token in WORD_SPLIT_PATTERN.split(line):
+            if not token or token.isspace():
+                parts.append(token)
+                continue
+            result = self.transliterate_token(token, source_script, target_script, system)
+            if result is None:
+                return None
+            parts.append(result)
+        return "".join(parts)
+    
+    def stats(self):
+        """Return the hit/miss/eviction counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+def format_cache_stats(stats):
+    """Format word cache counters for printing"""
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = (stats["hits"] / lookups) * 100 if lookups else 0
+    return (f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions "
+            f"({hit_rate:.1f}% hit rate)")
+
+def verify_word_level(lines, source_script, target_script, system="aksharamukha"):
+    """
+    Check that word-by-word output equals whole-line output for a system and script pair
+    
+    The non-empty lines are checked until WORD_LEVEL_SAMPLE_SIZE lines of the pair have
+    matched, over one or more calls, or one line differs. The result is then remembered
+    for the rest of the process. Before that, True means that every non-empty line given
+    was checked. Without any non-empty line nothing is checked and False is returned.
+    
+    Args:
+        lines: Sample lines to check
+        source_script: Source script name
+        target_script: Target script name
+        system: Transliteration system to use
+        
+    Returns:
+        True if word-level transliteration can be used for these lines
+    """
+    key = (system, source_script, target_script)
+    if key in _WORD_LEVEL_VERIFIED:
+        return _WORD_LEVEL_VERIFIED[key]
+    
+    checked = _WORD_LEVEL_CHECKED.get(key, 0)
+    sample = list(itertools.islice((line for line in lines if line.strip()), WORD_LEVEL_SAMPLE_SIZE - checked))
+    if not sample:
+        return False
+    
+    checker = WordCache()
+    for line in sample:
+        if transliterate_text(line, source_script, target_script, system) != \
+                checker.transliterate_line(line, source_script, target_script, system):
+            print(f"Word-level output differs from whole-line output for {system} "
+                  f"({source_script} -> {target_script}), using whole lines")
+            _WORD_LEVEL_VERIFIED[key] = False
+            _WORD_LEVEL_CHECKED.pop(key, None)
+            return False
+    
+    checked += len(sample)
+    if checked >= WORD_LEVEL_SAMPLE_SIZE:
+        _WORD_LEVEL_VERIFIED[key] = True
+        _WORD_LEVEL_CHECKED.pop(key, None)
+    else:
+        _WORD_LEVEL_CHECKED[key] = checked
+    return True
+
+# Lines are joined with this separator when several of them are sent to the
+# backend in one call. A newline is never touched by any of the backends, so
+# it survives transliteration and can be used to split the result back out.
+BATCH_SEPARATOR = "\n"
+
+def _split_line_ending(line):
+    """Split a line into its content and its trailing line ending"""
+    if line.endswith("\r\n"):
+        return line[:-2], "\r\n"
+    if line.endswith("\n"):
+        return line[:-1], "\n"
+    return line, ""
+
+def iter_batches(lines, batch_size, batch_bytes=None):
+    """
+    Group lines into batches of at most batch_size lines
+    
+    Args:
+        lines: Iterable of lines
+        batch_size: Maximum number of lines per batch
+        batch_bytes: Optional maximum number of UTF-8 bytes per batch
+        
+    Yields:
+        Lists of lines
+    """
+    batch = []
+    batch_len = 0
+    for line in lines:
+        line_len = len(line.encode('utf-8')) if batch_bytes else 0
+        if batch and (len(batch) >= batch_size or (batch_bytes and batch_len + line_len > batch_bytes)):
+            yield batch
+            batch = []
+            batch_len = 0
+        batch.append(line)
+        batch_len += line_len
+    if batch:
+        yield batch
+
+def transliterate_lines(lines, source_script, target_script, system="aksharamukha", batch_size=1, batch_bytes=None,
+                        word_cache=None):
+    """
+    Transliterate a list of lines, sending up to batch_size lines to the backend in one call
+    
+    Line endings are kept as they are in the input. If a batched call does not
+    give back the same number of lines it was sent, the batch is redone line by line.
+    
+    Args:
+        lines: List of lines (with or without line endings)
+        source_script: Source script name
+        target_script: Target script name
+        system: Transliteration system to use
+        batch_size: Maximum number of lines per backend call
+        batch_bytes: Optional maximum number of UTF-8 bytes per backend call
+        word_cache: Optional WordCache, used once word-level output has been verified for the pair
+        
+    Returns:
+        List of transliterated lines or None if an error occurred
+    """
+    # The Google API handles a single string at a time
+    if system == "google":
+        batch_size = 1
+    
+    if word_cache is not None and verify_word_level(lines, source_script, target_script, system):
+        results = []
+        for line in lines:
+            transliterated_line = word_cache.transliterate_line(line, source_script, target_script, system)
+            if transliterated_line is None:
+                print(f"Error transliterating line: {line.strip()}")
+                return None
+            results.append(transliterated_line)
+        return results
+    
+    results = []
+    for batch in iter_batches(lines, max(1, batch_size or 1), batch_bytes):
+        if len(batch) > 1:
+            parts = [_split_line_ending(line) for line in batch]
+            joined = BATCH_SEPARATOR.join(content for content, _ in parts)
+            transliterated = transliterate_text(joined, source_script, target_script, system)
+            if transliterated is not None:
+                transliterated_parts = transliterated.split(BATCH_SEPARATOR)
+                if len(transliterated_parts) == len(parts):
+                    results.extend(content + ending for content, (_, ending) in zip(transliterated_parts, parts))
+                    continue
+                print(f"Batch of {len(batch)} lines came back as {len(transliterated_parts)} lines, "
+                      f"retrying line by line")
+        
+        for line in batch:
+            transliterated_line = transliterate_text(line, source_script, target_script, system)
+            if transliterated_line is None:
+                print(f"Error transliterating line: {line.strip()}")
+                return None
+            results.append(transliterated_line)
+    
+    return results
+
+# Word cache of a worker process, created by _init_worker
+_worker_word_cache = None
+
+def _init_worker(source_script, target_script, system, word_cache_size=None):
+    """Load the transliteration backend once when a worker process starts"""
+    global _worker_word_cache
+    transliterate_text("", source_script, target_script, system)
+    if word_cache_size:
+        _worker_word_cache = WordCache(word_cache_size)
+
+def _transliterate_chunk(lines, source_script, target_script, system, batch_size, batch_bytes, sample=None):
+    """
+    Transliterate one chunk of lines inside a worker process
+    
+    When only the lines missing from the result cache are sent, sample holds the first lines
+    of the whole chunk, so the word-level check does not depend on what was cached.
+    """
+    if _worker_word_cache is not None and sample:
+        verify_word_level(sample, source_script, target_script, system)
+    results = transliterate_lines(lines, source_script, target_script, system, batch_size, batch_bytes,
+                                  _worker_word_cache)
+    cache_stats = _worker_word_cache.stats() if _worker_word_cache is not None else None
+    return results, os.getpid(), cache_stats
+
+def _lookup_cached(lines, cache, source_script, target_script, system):
+    """
+    Look up a chunk of lines in the persistent result cache
+    
+    Returns:
+        Tuple of (line contents with their endings, cached results, contents still to transliterate)
+    """
+    parts = [_split_line_ending(line) for line in lines]
+    cached = cache.get_many([content for content, _ in parts], system, source_script, target_script)
+    missing = [content for (content, _), result in zip(parts, cached) if result is None]
+    return parts, cached, missing
+
+def _merge_cached(parts, cached, missing, transliterated, cache, source_script, target_script, system):
+    """Store newly transliterated lines in the cache and put the chunk back together in input order"""
+    if transliterated is None:
+        return None
+    if missing:
+        cache.put_many(missing, transliterated, system, source_script, target_script)
+    
+    fresh = iter(transliterated)
+    return [(result if result is not None else next(fresh)) + ending
+            for (_, ending), result in zip(parts, cached)]
+
+def _iter_transliterated_chunks(lines, source_script, target_script, system, batch_size=1, batch_bytes=None,
+                                workers=1, chunk_size=None, word_cache=None, word_cache_size=None,
+                                worker_cache_stats=None, cache=None):
+    """
+    Transliterate lines chunk by chunk, in input order
+    
+    With more than one worker the chunks run on a process pool. Only a few
+    chunks per worker are in flight at a time, so memory use stays bounded.
+    Each worker keeps its own word cache; the latest counters of every worker
+    are stored in worker_cache_stats, keyed by process id. Lines found in the
+    persistent cache are never sent to the backend.
+    
+    Yields:
+        Lists of transliterated lines, or None if a chunk failed
+    """
+    batch_size = max(1, batch_size or 1)
+    if workers <= 1:
+        for batch in iter_batches(lines, max(batch_size, WORD_LEVEL_SAMPLE_SIZE) if word_cache else batch_size,
+                                  batch_bytes):
+            if cache is None:
+                yield transliterate_lines(batch, source_script, target_script, system, batch_size, batch_bytes,
+                                          word_cache)
+                continue
+            
+            if word_cache is not None:
+                # Check word-level output on the whole batch, not only the lines missing from the cache
+                verify_word_level(batch, source_script, target_script, system)
+            parts, cached, missing = _lookup_cached(batch, cache, source_script, target_script, system)
+            transliterated = transliterate_lines(missing, source_script, target_script, system, batch_size,
+                                                 batch_bytes, word_cache) if missing else []
+            yield _merge_cached(parts, cached, missing, transliterated, cache, source_script, target_script, system)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    chunk_size = chunk_size or max(batch_size, 1000)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(source_script, target_script, system, word_cache_size)) as executor:
+        pending = deque()
+        for chunk in iter_batches(lines, chunk_size):
+            lookup = None
+            sample = None
+            if cache is not None:
+                if word_cache_size:
+                    sample = chunk[:WORD_LEVEL_SAMPLE_SIZE]
+                lookup = _lookup_cached(chunk, cache, source_script, target_script, system)
+                chunk = lookup[2]
+            future = executor.submit(_transliterate_chunk, chunk, source_script, target_script,
+                                     system, batch_size, batch_bytes, sample)
+            pending.append((future, lookup))
+            if len(pending) >= workers * 2:
+                yield _collect_chunk(*pending.popleft(), worker_cache_stats, cache,
+                                     source_script, target_script, system)
+        while pending:
+            yield _collect_chunk(*pending.popleft(), worker_cache_stats, cache,
+                                 source_script, target_script, system)
+
+def _collect_chunk(future, lookup, worker_cache_stats, cache, source_script, target_script, system):
+    """Wait for a worker chunk, record its word cache counters and merge in cached lines"""
+    results, pid, cache_stats = future.result()
+    if cache_stats is not None and worker_cache_stats is not None:
+        worker_cache_stats[pid] = cache_stats
+    if lookup is not None:
+        parts, cached, missing = lookup
+        return _merge_cached(parts, cached, missing, results, cache, source_script, target_script, system)
+    return results
+
+class TransliterationError(Exception):
+    """Raised by transliterate_stream when lines cannot be transliterated"""
+
+def transliterate_stream(lines, source_script, target_script, system="aksharamukha", batch_size=1,
+                         batch_bytes=None, workers=1, chunk_size=None, word_cache_size=None, cache=None,
+                         stats=None):
+    """
+    Transliterate an iterable of lines lazily, yielding lines in input order
+    
+    Only one chunk of lines (a few per worker with a process pool) is held in
+    memory at a time, so streams can be chained, e.g. IAST -> script -> IAST,
+    without intermediate files.
+    
+    Args:
+        lines: Iterable of lines, such as an open file or sys.stdin
+        source_script: Source script name
+        target_script: Target script name
+        system: Transliteration system to use
+        batch_size: Number of lines sent to the backend in one call
+        batch_bytes: Optional maximum number of UTF-8 bytes sent to the backend in one call
+        workers: Number of worker processes (1 transliterates in this process)
+        chunk_size: Number of lines handed to a worker at a time
+        word_cache_size: Enable word-level transliteration with an LRU cache of this many words
+        cache: Optional TransliterationCache holding results of earlier runs
+        stats: Optional dict that receives the line count and word cache counters
+        
+    Yields:
+        Transliterated lines
+        
+    Raises:
+        TransliterationError: If a line could not be transliterated
+    """
+    word_cache = WordCache(word_cache_size) if word_cache_size and workers <= 1 else None
+    worker_cache_stats = {}
+    if stats is not None:
+        stats["lines"] = 0
+    
+    for transliterated_lines in _iter_transliterated_chunks(lines, source_script, target_script, system,
+                                                            batch_size, batch_bytes, workers, chunk_size,
+                                                            word_cache, word_cache_size, worker_cache_stats,
+                                                            cache):
+        if transliterated_lines is None:
+            raise TransliterationError(f"Could not transliterate from {source_script} to {target_script} "
+                                       f"using {system}")
+        
+        if stats is not None:
+            stats["lines"] += len(transliterated_lines)
+            if word_cache is not None:
+                stats["word_cache"] = word_cache.stats()
+            elif worker_cache_stats:
+                stats["word_cache"] = {name: sum(worker[name] for worker in worker_cache_stats.values())
+                                       for name in ("hits", "misses", "evictions", "size")}
+                stats["word_cache_workers"] = len(worker_cache_stats)
+        yield from transliterated_lines
+
+def round_trip_stream(lines, script, system="aksharamukha", source_script="IAST", timer=None, **options):
+    """
+    Transliterate lines to a script and back in a single streaming pass
+    
+    Args:
+        lines: Iterable of lines in source_script
+        script: Script to transliterate through
+        system: Transliteration system to use
+        source_script: Script of the input lines
+        timer: Optional StageTimer, reading and both directions are timed as the "read",
+            "forward" and "reverse" stages
+        **options: Further arguments for transliterate_stream (batch_size, workers, ...)
+        
+    Yields:
+        Tuples of (original line, script line, round-trip line)
+    """
+    if timer is not None:
+        lines = timer.timed(lines, "read")
+    originals, forward_input = itertools.tee(lines)
+    forward = transliterate_stream(forward_input, source_script, script, system, **options)
+    if timer is not None:
+        forward = timer.timed(forward, "forward")
+    forward, reverse_input = itertools.tee(forward)
+    reverse = transliterate_stream(reverse_input, script, source_script, system, **options)
+    if timer is not None:
+        reverse = timer.timed(reverse, "reverse")
+    yield from zip(originals, forward, reverse)
+
+def transliterate_file(input_file, output_file, source_script, target_script, system="aksharamukha",
+                       batch_size=1, batch_bytes=None, workers=1, chunk_size=None, word_cache_size=None,
+                       cache=None, timer=None, stage="transliterate"):
     """
     Transliterate all text in a file
     
@@ -148,6 +642,15 @@ def transliterate_file(input_file, output_file, source_script, target_script, sy
         source_script: Source script name
         target_script: Target script name
         system: Transliteration system to use
+        batch_size: Number of lines sent to the backend in one call
+        batch_bytes: Optional maximum number of UTF-8 bytes sent to the backend in one call
+        workers: Number of worker processes (1 transliterates in this process)
+        chunk_size: Number of lines handed to a worker at a time
+        word_cache_size: Enable word-level transliteration with an LRU cache of this many words
+        cache: Optional TransliterationCache holding results of earlier runs
+        timer: Optional StageTimer, reading, transliteration and writing are timed as the
+            "read", stage and "write" stages
+        stage: Name of the transliteration stage for the timer
         
     Returns:
         True if successful, False otherwise
@@ -156,21 +659,39 @@ def transliterate_file(input_file, output_file, source_script, target_script, sy
         output_path = Path(output_file).parent
         os.makedirs(output_path, exist_ok=True)
         
-        print(f"Transliterating from {source_script} to {target_script} using {system}...")
+        print(f"Transliterating from {source_script} to {target_script} using {system}"
+              f"{f' on {workers} workers' if workers > 1 else ''}...")
+        start_time = time.time()
+        stats = {}
+        cache_counts = (cache.hits, cache.misses) if cache is not None else None
         
         with open(input_file, 'r', encoding='utf-8') as input_f, \
              open(output_file, 'w', encoding='utf-8') as output_f:
-            
-            for line in input_f:
-                # Process each line
-                transliterated_line = transliterate_text(line, source_script, target_script, system)
-                
-                if transliterated_line is None:
-                    print(f"Error transliterating line: {line.strip()}")
-                    return False
-                
-                # Write the transliterated line to output file
-                output_f.write(transliterated_line)
+            if timer is None:
+                output_f.writelines(transliterate_stream(input_f, source_script, target_script, system, batch_size,
+                                                         batch_bytes, workers, chunk_size, word_cache_size, cache,
+                                                         stats))
+            else:
+                lines = transliterate_stream(timer.timed(input_f, "read"), source_script, target_script, system,
+                                             batch_size, batch_bytes, workers, chunk_size, word_cache_size, cache,
+                                             stats)
+                for line in timer.timed(lines, stage):
+                    with timer.measure("write", 1, len(line)):
+                        output_f.write(line)
+        
+        elapsed_time = time.time() - start_time
+        lines_per_sec = stats["lines"] / elapsed_time if elapsed_time > 0 else 0
+        print(f"Transliterated {stats['lines']} lines in {elapsed_time:.2f} seconds ({lines_per_sec:.1f} lines/sec)")
+        
+        if "word_cache" in stats:
+            workers_note = f" ({stats['word_cache_workers']} workers)" if "word_cache_workers" in stats else ""
+            print(f"Word cache{workers_note}: {format_cache_stats(stats['word_cache'])}")
+        
+        if cache is not None:
+            hits = cache.hits - cache_counts[0]
+            misses = cache.misses - cache_counts[1]
+            hit_rate = (hits / (hits + misses)) * 100 if hits + misses else 0
+            print(f"Result cache: {hits} hits, {misses} misses ({hit_rate:.1f}% hit rate)")
         
         return True
     except Exception as e:
@@ -179,16 +700,67 @@ def transliterate_file(input_file, output_file, source_script, target_script, sy
 
 def get_available_systems():
     """Return a list of available transliteration systems"""
-    systems = ["aksharamukha"]
-    
-    if INDIC_AVAILABLE:
-        systems.append("indic_transliteration")
+    systems = [system for system in SUPPORTED_SYSTEMS if is_backend_available(system)]
     
     # Remove Google as it's not working properly with our implementation
     # systems.append("google")
     
     return systems
 
+def main():
+    import argparse
+    from contextlib import redirect_stdout
+    
+    parser = argparse.ArgumentParser(
+        description="Transliterate text from stdin to stdout, e.g. a round trip: IAST Devanagari IAST")
+    parser.add_argument("scripts", nargs="*",
+                        help="Scripts to transliterate through in order (lists available scripts if fewer than two)")
+    parser.add_argument("--system", choices=SUPPORTED_SYSTEMS, default="aksharamukha",
+                        help="Transliteration system to use")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Number of lines sent to the transliteration backend in one call")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes used for each step")
+    parser.add_argument("--word-cache-size", type=int, default=None,
+                        help="Transliterate word by word with an LRU cache of this many words")
+    
+    args = parser.parse_args()
+    
+    if len(args.scripts) < 2:
+        print("Available scripts:", get_available_scripts()) # List available scripts
+        print("Available systems:", get_available_systems()) # List available systems
+        return
+    
+    hops = list(zip(args.scripts, args.scripts[1:]))
+    # Check every step before any input is read
+    with redirect_stdout(sys.stderr):
+        for source_script, target_script in hops:
+            if get_engine(args.system, source_script, target_script) is None:
+                print(f"Error: transliteration system {args.system} is not available for {source_script} -> "
+                      f"{target_script}")
+                sys.exit(1)
+    
+    output = sys.stdout
+    stream = sys.stdin
+    for source_script, target_script in hops:
+        stream = transliterate_stream(stream, source_script, target_script, args.system, args.batch_size,
+                                      workers=args.workers, word_cache_size=args.word_cache_size)
+    
+    # Keep progress and error messages out of the transliterated output
+    with redirect_stdout(sys.stderr):
+        try:
+            for line in stream:
+                output.write(line)
+            output.flush()
+        except TransliterationError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        except BrokenPipeError:
+            # The reader stopped early, as head does. Send what is still buffered to devnull,
+            # so flushing stdout at exit does not fail again
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, output.fileno())
+            sys.exit(1)
+
 if __name__ == "__main__":
-    print("Available scripts:", get_available_scripts()) # List available scripts
-    print("Available systems:", get_available_systems()) # List available systems
\ No newline at end of file
+    main()